@@ -0,0 +1,288 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple, Union
+import functools
+import hashlib
+import importlib.metadata
+import json
+import logging
+import os
+import threading
+import time
+
+from emba_mcp.serialize import dumps
+from emba_mcp.store import get_store
+
+log = logging.getLogger("emba-mcp")
+
+# In-process memory ceiling for cached results (bytes, JSON-encoded size)
+MAX_MEMORY_BYTES = int(os.getenv("EMBA_MCP_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# How long a computed log_dir fingerprint is trusted before re-stat'ing
+FINGERPRINT_TTL = float(os.getenv("EMBA_MCP_FINGERPRINT_TTL", "10"))
+
+
+# --------------------------------------------------
+# Input fingerprint
+# --------------------------------------------------
+
+def _stat_children(path: str) -> List[Tuple[str, int, int]]:
+    rows = []
+    try:
+        with os.scandir(path) as it:
+            for de in it:
+                try:
+                    st = de.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                rows.append((de.name, st.st_mtime_ns, st.st_size))
+    except OSError:
+        pass
+    return rows
+
+
+def log_dir_fingerprint(log_dir: Path) -> str:
+    """
+    Cheap mtime/size fingerprint of an EMBA log directory.
+    Covers every top-level artifact and the direct children of each
+    module directory, which is where EMBA writes its output.
+    """
+    h = hashlib.blake2b(digest_size=16)
+
+    top = sorted(_stat_children(str(log_dir)))
+    for name, mtime, size in top:
+        h.update(f"{name}\0{mtime}\0{size}\n".encode())
+
+        sub = os.path.join(str(log_dir), name)
+        if os.path.isdir(sub) and not os.path.islink(sub):
+            for child in sorted(_stat_children(sub)):
+                h.update(f"{name}/{child[0]}\0{child[1]}\0{child[2]}\n".encode())
+
+    return h.hexdigest()
+
+
+_FINGERPRINTS: Dict[str, Tuple[float, str]] = {}
+_FINGERPRINT_LOCK = threading.Lock()
+
+
+def current_fingerprint(log_dir: Path) -> str:
+    """
+    log_dir_fingerprint(), memoized for FINGERPRINT_TTL seconds so that
+    back-to-back tool calls do not re-stat the log tree.
+    """
+    key = str(log_dir)
+    now = time.monotonic()
+
+    with _FINGERPRINT_LOCK:
+        cached = _FINGERPRINTS.get(key)
+        if cached and now - cached[0] < FINGERPRINT_TTL:
+            return cached[1]
+
+    fingerprint = log_dir_fingerprint(log_dir)
+
+    with _FINGERPRINT_LOCK:
+        _FINGERPRINTS[key] = (now, fingerprint)
+    return fingerprint
+
+
+# --------------------------------------------------
+# Result versions (ETags)
+# --------------------------------------------------
+
+# A new release may change result shapes: part of every version
+try:
+    _RELEASE = importlib.metadata.version("emba-mcp")
+except Exception:
+    _RELEASE = "dev"
+
+
+def result_version(name: str, log_dir: Path, variant: Any = ()) -> str:
+    """
+    Version token for a tool result. Changes whenever the log_dir inputs
+    change; `variant` covers request parameters that shape the response
+    (page, filters, finding ID). Costs one fingerprint lookup.
+    """
+    h = hashlib.blake2b(digest_size=10)
+    h.update(repr((_RELEASE, name, str(log_dir), current_fingerprint(log_dir), variant)).encode())
+    return h.hexdigest()
+
+
+# --------------------------------------------------
+# In-process LRU
+# --------------------------------------------------
+
+class LRUCache:
+    """
+    Byte-bounded LRU cache with hit/miss counters.
+    Entry sizes are estimates: JSON-encoded length for results, an
+    in-memory estimate for memoized structures.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[tuple, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple) -> Tuple[bool, Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, item[0]
+
+    def put(self, key: tuple, value: Any, size: int):
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._data[key] = (value, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes and self._data:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+_MEMORY = LRUCache(MAX_MEMORY_BYTES)
+
+
+def _estimate_size(value: Any) -> int:
+    try:
+        return len(dumps(value))
+    except Exception:
+        return 0
+
+
+def cache_stats() -> Dict:
+    return _MEMORY.stats()
+
+
+# --------------------------------------------------
+# Result caching
+# --------------------------------------------------
+
+def _result_key(name: str, args: tuple) -> str:
+    if not args:
+        return name
+    return name + "(" + ",".join(str(a) for a in args) + ")"
+
+
+def cached_result(name: str) -> Callable:
+    """
+    Memoize a parser/analyzer result, keyed by (function, log_dir,
+    input fingerprint). Lookups go to the in-process LRU first, then to
+    the persistent store shared by all server processes.
+    The wrapped function must take the EMBA log_dir as first argument;
+    remaining positional arguments become part of the key.
+    Only dict results are persisted; results flagged "partial" (a
+    degraded run) are returned but never cached.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(log_dir: Path, *args):
+            key = _result_key(name, args)
+            log_key = str(log_dir)
+            fingerprint = current_fingerprint(log_dir)
+            mem_key = (key, log_key, fingerprint)
+
+            found, value = _MEMORY.get(mem_key)
+            if found:
+                return value
+
+            store = get_store()
+            try:
+                cached = store.get_result(log_key, key, fingerprint)
+            except Exception:
+                log.exception("Result store lookup failed for %s", key)
+                cached = None
+
+            if cached is not None:
+                value, size = cached
+                _MEMORY.put(mem_key, value, size)
+                return value
+
+            result = fn(log_dir, *args)
+
+            if isinstance(result, dict) and result.get("partial"):
+                return result
+
+            # The store write encodes the result anyway: reuse its size
+            size = None
+            if isinstance(result, dict):
+                try:
+                    size = store.put_result(log_key, key, fingerprint, result)
+                except Exception:
+                    log.exception("Result store write failed for %s", key)
+
+            _MEMORY.put(mem_key, result, _estimate_size(result) if size is None else size)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def memoized(
+    name: str,
+    log_dir: Path,
+    build: Callable[[], Any],
+    size: Union[int, Callable[[Any], int]] = 0,
+) -> Any:
+    """
+    In-process only memoization under the same (name, log_dir,
+    fingerprint) key as cached_result, for derived structures such as
+    indexes that are not worth persisting. `size` (bytes, or a function
+    of the built value) counts the entry against MAX_MEMORY_BYTES.
+    """
+    mem_key = (name, str(log_dir), current_fingerprint(log_dir))
+
+    found, value = _MEMORY.get(mem_key)
+    if found:
+        return value
+
+    value = build()
+    _MEMORY.put(mem_key, value, size(value) if callable(size) else size)
+    return value
+
+
+def memory_get(key: tuple) -> Tuple[bool, Any]:
+    """
+    Direct LRU lookup, for callers that key entries themselves (e.g. by
+    a directory mtime instead of a log_dir fingerprint).
+    """
+    return _MEMORY.get(key)
+
+
+def memory_put(key: tuple, value: Any, size: int):
+    _MEMORY.put(key, value, size)
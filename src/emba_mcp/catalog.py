@@ -0,0 +1,224 @@
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+import os
+import re
+import sys
+
+from emba_mcp.cache import memoized
+
+# --------------------------------------------------
+# EMBA log-directory catalog
+# --------------------------------------------------
+# The EMBA output tree is enumerated once per (log_dir, fingerprint);
+# parsers look their artifacts up here instead of globbing on their own.
+# The extracted firmware is not part of the catalog: the rootfs has its
+# own index (emba_mcp.filesystem).
+
+# Top-level directories that hold extracted firmware, not module output
+EXCLUDED_DIRS = {"firmware"}
+
+# How deep module directories are cataloged (s22_php_check/semgrep/... ).
+# Deeper directories are recorded as truncated and walked on demand by
+# recursive lookups.
+MAX_DEPTH = int(os.getenv("EMBA_MCP_CATALOG_MAX_DEPTH", "4"))
+
+# Bytes per artifact besides its path strings: the tuple, its Path and
+# the lookup-table slots (measured on CPython 3.11; for cache accounting)
+_ARTIFACT_OVERHEAD = 400
+
+# EMBA module IDs: p02, s13, s108, l10, f50, q02 ...
+_MODULE_RE = re.compile(r"^([a-z]\d+)_")
+
+
+class Artifact(NamedTuple):
+    path: Path      # absolute path
+    rel: str        # log_dir-relative ("s13_weak_func_check/s13.txt")
+    module: str     # EMBA module ID ("s13"), "" for non-module output
+    suffix: str     # lowercased (".txt", ".csv", ".json", ".html", ...)
+    size: int
+    mtime: float
+
+    @property
+    def name(self) -> str:
+        return self.rel.rpartition("/")[2]
+
+
+def _module_id(rel: str) -> str:
+    head, _, rest = rel.partition("/")
+    m = _MODULE_RE.match(head)
+    if not m and rest:
+        # Shared dirs name files after their module (csv_logs/s95_...csv)
+        m = _MODULE_RE.match(rel.rpartition("/")[2])
+    return m.group(1) if m else ""
+
+
+class LogCatalog:
+    """
+    Every file of an EMBA log directory (sorted by relative path), with
+    per-module and per-directory lookups.
+    """
+
+    def __init__(
+        self,
+        log_dir: Path,
+        artifacts: List[Artifact],
+        dirs: Set[str],
+        truncated: Set[str] = frozenset(),
+    ):
+        self.log_dir = log_dir
+        self.artifacts = artifacts
+        self._dirs = dirs
+        self.truncated = truncated      # dirs at MAX_DEPTH, contents not cataloged
+        self._by_rel = {a.rel: a for a in artifacts}
+        self._by_module: Dict[str, List[Artifact]] = {}
+        self._by_dir: Dict[str, List[Artifact]] = {}
+
+        for a in artifacts:
+            if a.module:
+                self._by_module.setdefault(a.module, []).append(a)
+            self._by_dir.setdefault(a.rel.rpartition("/")[0], []).append(a)
+
+    def __len__(self) -> int:
+        return len(self.artifacts)
+
+    def approx_bytes(self) -> int:
+        return sum(2 * sys.getsizeof(a.rel) + _ARTIFACT_OVERHEAD for a in self.artifacts)
+
+    def file(self, rel: str) -> Optional[Artifact]:
+        return self._by_rel.get(rel)
+
+    def exists(self, rel: str) -> bool:
+        """
+        True for cataloged files and directories.
+        """
+        return rel in self._by_rel or rel in self._dirs
+
+    def dirs(self) -> List[str]:
+        """
+        Top-level directory names.
+        """
+        return sorted(d for d in self._dirs if "/" not in d)
+
+    def module(self, module_id: str, *suffixes: str) -> List[Artifact]:
+        """
+        All artifacts of one EMBA module, optionally limited to suffixes.
+        """
+        found = self._by_module.get(module_id, [])
+        return [a for a in found if a.suffix in suffixes] if suffixes else list(found)
+
+    def in_dir(self, rel_dir: str, *suffixes: str, recursive: bool = False) -> List[Artifact]:
+        """
+        Files of one directory ("" = top level); with recursive, of its
+        whole subtree.
+        """
+        if recursive:
+            prefix = rel_dir.rstrip("/") + "/"
+            found = [a for a in self.artifacts if a.rel.startswith(prefix)]
+            # Beyond the catalog depth: walked now, never dropped
+            for d in self.uncataloged(rel_dir):
+                found.extend(_walk(self.log_dir / d, d)[0])
+            found.sort(key=lambda a: a.rel)
+        else:
+            found = self._by_dir.get(rel_dir, [])
+        return [a for a in found if a.suffix in suffixes] if suffixes else list(found)
+
+    def uncataloged(self, rel_dir: str) -> List[str]:
+        """
+        Truncated directories within rel_dir's subtree.
+        """
+        prefix = rel_dir.rstrip("/") + "/"
+        return sorted(d for d in self.truncated if d == rel_dir or d.startswith(prefix))
+
+    def glob(self, pattern: str) -> List[Artifact]:
+        """
+        Files matching a log_dir-relative glob; "*" never crosses "/".
+        """
+        head = pattern.rpartition("/")[0]
+        candidates = self.artifacts if any(c in head for c in "*?[") else self._by_dir.get(head, [])
+        depth = pattern.count("/")
+        return [
+            a for a in candidates
+            if a.rel.count("/") == depth and fnmatchcase(a.rel, pattern)
+        ]
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Per-module artifact counts and sizes, by suffix.
+        """
+        out: Dict[str, Dict] = {}
+        for module, artifacts in sorted(self._by_module.items()):
+            entry = out[module] = {"files": 0, "bytes": 0, "by_suffix": {}}
+            for a in artifacts:
+                entry["files"] += 1
+                entry["bytes"] += a.size
+                entry["by_suffix"][a.suffix] = entry["by_suffix"].get(a.suffix, 0) + 1
+        return out
+
+
+def _walk(
+    root: Path,
+    rel_root: str = "",
+    max_depth: Optional[int] = None,
+) -> Tuple[List[Artifact], Set[str], Set[str]]:
+    """
+    Files under root (rel paths prefixed with rel_root), directories, and
+    directories not descended into because of max_depth.
+    """
+    artifacts: List[Artifact] = []
+    dirs: Set[str] = set()
+    truncated: Set[str] = set()
+    stack = [(str(root), rel_root, 0)]
+
+    while stack:
+        path, rel, depth = stack.pop()
+        try:
+            it = os.scandir(path)
+        except OSError:
+            continue
+
+        with it:
+            for de in it:
+                child = rel + "/" + de.name if rel else de.name
+                try:
+                    if de.is_dir(follow_symlinks=False):
+                        if not rel and de.name in EXCLUDED_DIRS:
+                            continue
+                        dirs.add(child)
+                        if max_depth is None or depth + 1 < max_depth:
+                            stack.append((de.path, child, depth + 1))
+                        else:
+                            truncated.add(child)
+                        continue
+                    if not de.is_file(follow_symlinks=False):
+                        continue
+                    st = de.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+
+                artifacts.append(Artifact(
+                    path=Path(de.path),
+                    rel=child,
+                    module=_module_id(child),
+                    suffix=os.path.splitext(de.name)[1].lower(),
+                    size=st.st_size,
+                    mtime=st.st_mtime,
+                ))
+
+    return artifacts, dirs, truncated
+
+
+def build_log_catalog(log_dir: Path) -> LogCatalog:
+    artifacts, dirs, truncated = _walk(log_dir, max_depth=MAX_DEPTH)
+    artifacts.sort(key=lambda a: a.rel)
+    return LogCatalog(log_dir, artifacts, dirs, truncated)
+
+
+def get_log_catalog(log_dir: Path) -> LogCatalog:
+    """
+    The catalog of log_dir, built once per input fingerprint.
+    """
+    return memoized(
+        "log_catalog", log_dir, lambda: build_log_catalog(log_dir),
+        size=LogCatalog.approx_bytes,
+    )
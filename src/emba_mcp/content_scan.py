@@ -0,0 +1,397 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import hashlib
+import logging
+import re
+import threading
+import weakref
+
+from emba_mcp.filesystem import FileEntry, FilesystemIndex
+from emba_mcp.parallel import PROCESS_POOL_MIN_FILES, WORKERS, cpu_pool
+from emba_mcp.reader import SCAN_BYTES_BUDGET, mapped, scan_windows
+from emba_mcp.store import get_store
+
+log = logging.getLogger("emba-mcp")
+
+# --------------------------------------------------
+# Signature tables (shared by the rootfs parsers)
+# --------------------------------------------------
+
+WEAK_ALGORITHMS = ("md5", "sha1", "des", "rc4", "ecb")
+
+SECRET_KEYWORDS = (
+    "private key",
+    "secret",
+    "password",
+    "passwd",
+    "api_key",
+    "apikey",
+    "token",
+)
+
+SERVICE_SIGNATURES = {
+    "ssh": [
+        "dropbear",
+        "sshd",
+    ],
+    "telnet": [
+        "telnetd",
+    ],
+    "http": [
+        "lighttpd",
+        "uhttpd",
+        "httpd",
+    ],
+    "ftp": [
+        "ftpd",
+        "vsftpd",
+        "busybox ftpd",
+    ],
+    "tftp": [
+        "tftpd",
+    ],
+}
+
+# Which files get content-scanned, per consumer
+CRYPTO_SCAN_SUFFIXES = {".conf", ".cfg", ".ini", ".sh", ".cgi", ".php", ".lua"}
+CREDENTIAL_SCAN_SUFFIXES = {".conf", ".cfg"}
+INIT_DIRS = {"init.d", "rc.d"}
+
+
+class Signature(NamedTuple):
+    category: str     # weak_algorithm | secret | service
+    name: str         # reported name (algorithm, keyword, service)
+    literal: str
+    word: bool        # require word boundaries on both sides
+
+
+class SignatureHit(NamedTuple):
+    category: str
+    name: str
+    offset: int
+
+
+# Grouped form used for rootfs scans: "category:name" -> offsets.
+# Far cheaper to pickle and cache than one SignatureHit per match.
+Matches = Dict[str, List[int]]
+
+
+class FileScan(NamedTuple):
+    matches: Matches
+    size: int
+    truncated: bool   # only head/tail windows were scanned
+
+
+def _default_signatures() -> List[Signature]:
+    sigs = [Signature("weak_algorithm", a, a, True) for a in WEAK_ALGORITHMS]
+    sigs += [Signature("secret", k, k, False) for k in SECRET_KEYWORDS]
+    for service, keywords in SERVICE_SIGNATURES.items():
+        sigs += [Signature("service", service, kw, True) for kw in keywords]
+    return sigs
+
+
+# --------------------------------------------------
+# Multi-pattern scanner
+# --------------------------------------------------
+
+class SignatureScanner:
+    """
+    All signatures compiled into a single case-insensitive alternation
+    over bytes, so each buffer is scanned exactly once no matter how many
+    signatures are registered. Longer literals are tried first so that
+    e.g. "busybox ftpd" wins over "ftpd" at the same offset.
+    """
+
+    def __init__(self, signatures: Iterable[Signature]):
+        self.signatures = list(signatures)
+
+        order = sorted(range(len(self.signatures)), key=lambda i: -len(self.signatures[i].literal))
+        parts = []
+        for i in order:
+            sig = self.signatures[i]
+            body = re.escape(sig.literal.encode())
+            if sig.word:
+                body = rb"\b" + body + rb"\b"
+            parts.append(b"(?P<s%d>" % i + body + b")")
+
+        self._regex = re.compile(b"|".join(parts), re.IGNORECASE)
+        self._keys = {
+            f"s{i}": f"{sig.category}:{sig.name}" for i, sig in enumerate(self.signatures)
+        }
+
+        # Identifies this signature set in the content-hash cache
+        h = hashlib.blake2b(digest_size=8)
+        h.update(repr((self.signatures, SCAN_BYTES_BUDGET)).encode())
+        self.version = h.hexdigest()
+
+    def scan(self, data, start: int = 0, end: Optional[int] = None) -> List[SignatureHit]:
+        """
+        Return every hit in a bytes-like buffer (bytes or mmap), optionally
+        restricted to data[start:end] without copying. Offsets are absolute.
+        """
+        if end is None:
+            end = len(data)
+
+        sigs = self.signatures
+        hits = []
+        for m in self._regex.finditer(data, start, end):
+            sig = sigs[int(m.lastgroup[1:])]
+            hits.append(SignatureHit(sig.category, sig.name, m.start()))
+        return hits
+
+    def scan_grouped(self, data, start: int = 0, end: Optional[int] = None,
+                     into: Optional[Matches] = None) -> Matches:
+        """
+        Same as scan(), but offsets grouped by "category:name".
+        """
+        if end is None:
+            end = len(data)
+
+        keys = self._keys
+        matches: Matches = {} if into is None else into
+        for m in self._regex.finditer(data, start, end):
+            key = keys[m.lastgroup]
+            offsets = matches.get(key)
+            if offsets is None:
+                matches[key] = [m.start()]
+            else:
+                offsets.append(m.start())
+        return matches
+
+
+SCANNER = SignatureScanner(_default_signatures())
+
+
+def match_names(matches: Matches, category: str) -> List[str]:
+    """
+    Distinct names of a category, in first-seen order.
+    """
+    prefix = category + ":"
+    return [k[len(prefix):] for k in matches if k.startswith(prefix)]
+
+
+def _scan_windows(data, windows: List[Tuple[int, int]]) -> Matches:
+    matches: Matches = {}
+    for start, end in windows:
+        SCANNER.scan_grouped(data, start, end, into=matches)
+    return matches
+
+
+def scan_file(path: Path) -> FileScan:
+    """
+    Scan a file's raw bytes through a read-only mapping, honouring the
+    per-file byte budget. Unreadable files yield an empty result.
+    """
+    try:
+        with mapped(path) as data:
+            size = len(data)
+            windows, truncated = scan_windows(size)
+            return FileScan(_scan_windows(data, windows), size, truncated)
+    except Exception:
+        return FileScan({}, 0, False)
+
+
+def scan_path(path: Path) -> Matches:
+    return scan_file(path).matches
+
+
+def _content_digest(data, size: int, windows: List[Tuple[int, int]]) -> str:
+    """
+    Hash of exactly the bytes a scan would look at (plus the file size),
+    so identical files share one cached result across images.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(str(size).encode())
+    with memoryview(data) as view:
+        for start, end in windows:
+            h.update(view[start:end])
+    return h.hexdigest()
+
+
+def _to_row(scan: FileScan) -> list:
+    return [scan.matches, scan.size, scan.truncated]
+
+
+def _from_row(row: list) -> FileScan:
+    return FileScan(*row)
+
+
+def scan_file_cached(path: Path) -> Tuple[FileScan, bool, Optional[str]]:
+    """
+    Like scan_file(), but consult the content-hash cache first.
+    Returns (result, cache_hit, digest); digest is set only for fresh
+    results that still need to be written back.
+    """
+    try:
+        with mapped(path) as data:
+            size = len(data)
+            windows, truncated = scan_windows(size)
+            digest = _content_digest(data, size, windows)
+
+            try:
+                row = get_store().get_content_scan(digest, SCANNER.version)
+            except Exception:
+                log.exception("Content scan cache lookup failed")
+                row = None
+
+            if row is not None:
+                return _from_row(row), True, None
+
+            scan = FileScan(_scan_windows(data, windows), size, truncated)
+            return scan, False, digest
+    except Exception:
+        return FileScan({}, 0, False), False, None
+
+
+def _scan_chunk(paths: List[str]) -> List[Tuple[str, list, bool, Optional[str]]]:
+    """
+    Process-pool entry point: scan a batch of files, rows only
+    (NamedTuples are rebuilt on the parent side).
+    """
+    out = []
+    for p in paths:
+        scan, hit, digest = scan_file_cached(Path(p))
+        out.append((p, _to_row(scan), hit, digest))
+    return out
+
+
+def _chunk_by_directory(paths: List[str], chunk_files: int) -> List[List[str]]:
+    """
+    Split paths (already in path order) into chunks, keeping files of
+    the same directory together where possible.
+    """
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    current_dir = None
+
+    for p in paths:
+        d = p.rpartition("/")[0]
+        if current and len(current) >= chunk_files and d != current_dir:
+            chunks.append(current)
+            current = []
+        current.append(p)
+        current_dir = d
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# --------------------------------------------------
+# Rootfs content scan (once per index)
+# --------------------------------------------------
+
+# Selection is by sniffed content first: binaries are never text-scanned,
+# whatever their suffix, and extension-less text files are included.
+
+def is_crypto_candidate(e: FileEntry) -> bool:
+    return e.content == "text" and (e.suffix in CRYPTO_SCAN_SUFFIXES or not e.suffix)
+
+
+def is_credential_candidate(e: FileEntry) -> bool:
+    return e.content == "text" and (e.suffix in CREDENTIAL_SCAN_SUFFIXES or not e.suffix)
+
+
+def is_init_script(e: FileEntry) -> bool:
+    return e.content == "text" and e.parent_name in INIT_DIRS
+
+
+def wants_content_scan(e: FileEntry) -> bool:
+    return is_crypto_candidate(e) or is_credential_candidate(e) or is_init_script(e)
+
+
+class RootfsScan(NamedTuple):
+    files: Dict[str, FileScan]      # keyed by rootfs-relative path
+    cache_hits: int
+    cache_misses: int
+
+    def matches_for(self, path: str) -> Matches:
+        scan = self.files.get(path)
+        return scan.matches if scan else {}
+
+    def truncated(self, paths: Iterable[str]) -> List[str]:
+        return sorted(p for p in paths if p in self.files and self.files[p].truncated)
+
+    def cache_report(self) -> Dict:
+        total = self.cache_hits + self.cache_misses
+        return {
+            "files": total,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_ratio": round(self.cache_hits / total, 3) if total else None,
+        }
+
+
+_ROOTFS_SCANS: "weakref.WeakKeyDictionary[FilesystemIndex, RootfsScan]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# One lock per index: scans of different images run side by side
+_ROOTFS_LOCKS: "weakref.WeakKeyDictionary[FilesystemIndex, threading.Lock]" = (
+    weakref.WeakKeyDictionary()
+)
+_ROOTFS_LOCKS_GUARD = threading.Lock()
+
+
+def _index_lock(index: FilesystemIndex) -> threading.Lock:
+    with _ROOTFS_LOCKS_GUARD:
+        lock = _ROOTFS_LOCKS.get(index)
+        if lock is None:
+            lock = _ROOTFS_LOCKS[index] = threading.Lock()
+        return lock
+
+
+def scan_rootfs(index: FilesystemIndex, workers: int = WORKERS) -> RootfsScan:
+    """
+    Scan every candidate file of a rootfs once and return results per path.
+    Unchanged files (by content hash) are served from the persistent
+    cache; large trees are scanned on a process pool in directory-grouped
+    chunks. Shared by parse_weak_crypto, parse_credentials and
+    parse_network_services.
+    """
+    result = _ROOTFS_SCANS.get(index)
+    if result is not None:
+        return result
+
+    with _index_lock(index):
+        # Scanned by another thread while we waited
+        result = _ROOTFS_SCANS.get(index)
+        if result is not None:
+            return result
+
+        # Workers read absolute paths; results are keyed rootfs-relative
+        candidates = [index.abspath(e) for e in index.files() if wants_content_scan(e)]
+        rows: Dict[str, Tuple[list, bool, Optional[str]]] = {}
+
+        if workers > 1 and len(candidates) >= PROCESS_POOL_MIN_FILES:
+            chunk_files = max(16, len(candidates) // (workers * 8))
+            with cpu_pool(workers) as pool:
+                for batch in pool.map(_scan_chunk, _chunk_by_directory(candidates, chunk_files)):
+                    for path, row, hit, digest in batch:
+                        rows[path] = (row, hit, digest)
+        else:
+            for path, row, hit, digest in _scan_chunk(candidates):
+                rows[path] = (row, hit, digest)
+
+        # Merge in index order so results never depend on scheduling
+        files: Dict[str, FileScan] = {}
+        pending: List[Tuple[str, list]] = []
+        hits = 0
+        start = len(index.root_str)
+
+        for path in candidates:
+            row, hit, digest = rows[path]
+            files[path[start:]] = _from_row(row)
+            hits += hit
+            if digest:
+                pending.append((digest, row))
+
+        if pending:
+            try:
+                get_store().put_content_scans(SCANNER.version, pending)
+            except Exception:
+                log.exception("Content scan cache write failed")
+
+        result = RootfsScan(files, hits, len(files) - hits)
+        _ROOTFS_SCANS[index] = result
+        return result
@@ -1,12 +1,23 @@
 from typing import Dict
 from pathlib import Path
 
+from emba_mcp.cache import cached_result
 from emba_mcp.emba_analyzers.high_risk import get_high_risk_findings
 
+# Entry-point preference when a finding spans several services:
+# the least protected service is the most likely way in.
+REMOTE_SERVICES = ("telnet", "ftp", "tftp", "ssh", "http")
 
-def explain_attack_path(log_dir: Path, finding_index: int = 0) -> Dict:
+
+# ----------------------------
+# Batch (materialized per log_dir)
+# ----------------------------
+
+@cached_result("attack_paths")
+def explain_all_attack_paths(log_dir: Path) -> Dict:
     """
-    Explain a realistic attack path for a given high-risk finding.
+    Explain every high-risk finding in one pass, keyed by finding ID.
+    Cached per log_dir, so single-finding lookups are O(1) afterwards.
     """
 
     data = get_high_risk_findings(log_dir)
@@ -17,37 +28,76 @@ def explain_attack_path(log_dir: Path, finding_index: int = 0) -> Dict:
             "confidence": "error",
         }
 
-    findings = data.get("findings", [])
+    return {
+        "count": data.get("count", 0),
+        "attack_paths": {
+            f["id"]: explain_finding(f) for f in data.get("findings", [])
+        },
+        # Inherit the degraded state of the correlation run (not cached)
+        "partial": data.get("partial", False),
+    }
+
+
+def explain_attack_path(log_dir: Path, finding: str | int = 0) -> Dict:
+    """
+    Explain a realistic attack path for a given high-risk finding,
+    selected by finding ID or (legacy) list index.
+    """
+
+    data = explain_all_attack_paths(log_dir)
 
-    if not findings:
+    if "error" in data:
+        return data
+
+    paths = data["attack_paths"]
+
+    if not paths:
         return {
             "error": "No high-risk findings available",
             "confidence": "low",
         }
 
-    if finding_index < 0 or finding_index >= len(findings):
+    if isinstance(finding, int):
+        if finding < 0 or finding >= len(paths):
+            return {
+                "error": "Invalid finding index",
+                "available_findings": len(paths),
+            }
+        return list(paths.values())[finding]
+
+    if finding not in paths:
         return {
-            "error": "Invalid finding index",
-            "available_findings": len(findings),
+            "error": f"Unknown finding ID: {finding}",
+            "available_findings": list(paths),
         }
 
-    f = findings[finding_index]
+    return paths[finding]
+
+
+# ----------------------------
+# Single finding
+# ----------------------------
+
+def explain_finding(f: Dict) -> Dict:
+    """
+    Attack-path explanation for one finding (pure, no I/O).
+    """
 
     components = set(f.get("components", []))
     severity = f.get("severity", "unknown")
     title = f.get("title", "Unnamed finding")
+    finding_id = f.get("id")
 
     # --------------------------------------------------
     # SERVICE + CREDENTIALS (ANY NETWORK SERVICE)
     # --------------------------------------------------
     if "credentials" in components and any(
-        s in components for s in {"telnet", "ssh", "ftp", "http", "tftp"}
+        s in components for s in REMOTE_SERVICES
     ):
-        service = next(
-            s for s in components if s in {"telnet", "ssh", "ftp", "http", "tftp"}
-        )
+        service = next(s for s in REMOTE_SERVICES if s in components)
 
         return {
+            "finding_id": finding_id,
             "title": title,
             "attack_vector": "remote",
             "entry_point": f"{service} service",
@@ -71,6 +121,7 @@ def explain_attack_path(log_dir: Path, finding_index: int = 0) -> Dict:
     # --------------------------------------------------
     if "kernel" in components:
         return {
+            "finding_id": finding_id,
             "title": title,
             "attack_vector": "local or remote",
             "entry_point": "kernel attack surface",
@@ -93,6 +144,7 @@ def explain_attack_path(log_dir: Path, finding_index: int = 0) -> Dict:
     # --------------------------------------------------
     if {"binary", "privilege escalation"} <= components:
         return {
+            "finding_id": finding_id,
             "title": title,
             "attack_vector": "local",
             "entry_point": "privileged binary execution",
@@ -115,6 +167,7 @@ def explain_attack_path(log_dir: Path, finding_index: int = 0) -> Dict:
     # --------------------------------------------------
     if {"crypto", "credentials"} <= components:
         return {
+            "finding_id": finding_id,
             "title": title,
             "attack_vector": "offline",
             "entry_point": "firmware secrets",
@@ -136,6 +189,7 @@ def explain_attack_path(log_dir: Path, finding_index: int = 0) -> Dict:
     # FALLBACK (FUTURE-PROOF)
     # --------------------------------------------------
     return {
+        "finding_id": finding_id,
         "title": title,
         "attack_vector": f.get("attack_vector", "unknown"),
         "exploit_class": "context-dependent",
@@ -1,13 +1,21 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
+import hashlib
+import logging
+import os
+import time
 
+from emba_mcp.cache import cached_result
 from emba_mcp.filesystem import find_filesystem_root
+from emba_mcp.paths import rootfs_path
 from emba_mcp.emba_parsers.kernel import parse_kernel_info
 from emba_mcp.emba_parsers.network_services import parse_network_services
 from emba_mcp.emba_parsers.credentials import parse_credentials
 from emba_mcp.emba_parsers.weak_crypto import parse_weak_crypto
 from emba_mcp.emba_parsers.weak_functions import parse_weak_functions
-from emba_mcp.emba_parsers.binary_protection import parse_binary_protections
+from emba_mcp.emba_parsers.permissions import parse_permissions
 
 
 # ----------------------------
@@ -27,128 +35,556 @@ AUTHENTICATED_REMOTE_SERVICES = {
 }
 
 
+log = logging.getLogger("emba-mcp")
+
+# Upper bound for a single parser inside the correlation run (seconds)
+PARSER_TIMEOUT = float(os.getenv("EMBA_MCP_PARSER_TIMEOUT", "300"))
+
+# Evidence items inlined per reference; the rest via get_finding_evidence
+EVIDENCE_PREVIEW = int(os.getenv("EMBA_MCP_EVIDENCE_PREVIEW", "3"))
+EVIDENCE_PAGE_SIZE = 100
+
+
 # ----------------------------
-# Main analyzer
+# Parser fan-out
 # ----------------------------
 
-def get_high_risk_findings(log_dir: Path) -> Dict:
-    findings: List[Dict] = []
+def _timed(fn: Callable[[], Dict]) -> Tuple[Dict, float]:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
 
-    fs_root = find_filesystem_root(log_dir)
 
-    kernel     = parse_kernel_info(log_dir)
-    services   = parse_network_services(log_dir, fs_root)
-    creds      = parse_credentials(log_dir, fs_root)
-    crypto     = parse_weak_crypto(log_dir, fs_root)
-    weak_funcs = parse_weak_functions(log_dir)
-    bin_prot   = parse_binary_protections(log_dir)
+class ParserRun:
+    """
+    Parsers running concurrently, collected as they finish. A parser
+    that fails or exceeds the timeout contributes an empty result; its
+    status and wall time are reported in the metadata.
+    """
 
-    detected_services = set(services.get("services_detected", []))
+    def __init__(self, workers: int, timeout: float = PARSER_TIMEOUT):
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="emba-parser")
+        self._pending: Dict[Future, Tuple[str, float]] = {}
 
-    dangerous_services = detected_services & HIGH_RISK_REMOTE_SERVICES
-    auth_services      = detected_services & AUTHENTICATED_REMOTE_SERVICES
+    def __bool__(self) -> bool:
+        return bool(self._pending)
 
-    # --------------------------------------------------
-    # Rule A: Remote service + credentials (GENERALIZED)
-    # --------------------------------------------------
-    if creds.get("found") and (dangerous_services or auth_services):
-        findings.append({
-            "title": "Remote service exposed with embedded credentials",
-            "severity": "critical" if dangerous_services else "high",
-            "confidence": "high",
-            "attack_vector": "remote",
-            "components": sorted(dangerous_services | auth_services | {"credentials"}),
-            "evidence": {
-                "services": services,
-                "credentials": creds,
-            },
-            "reasoning": (
-                "One or more remotely accessible services were detected together "
-                "with embedded credentials. This enables authenticated or "
-                "unauthenticated remote compromise depending on service behavior."
-            ),
-        })
+    def start(self, name: str, fn: Callable[[], Dict]):
+        self._pending[self._pool.submit(_timed, fn)] = (name, time.perf_counter())
 
-    # --------------------------------------------------
-    # Rule B: Insecure remote services (even without creds)
-    # --------------------------------------------------
-    if dangerous_services:
-        findings.append({
-            "title": "Insecure remote services exposed",
-            "severity": "high",
-            "confidence": "medium",
-            "attack_vector": "remote",
-            "components": sorted(dangerous_services),
-            "evidence": services,
-            "reasoning": (
-                "Legacy or insecure remote services were detected. These services "
-                "frequently lack authentication or use weak default configurations."
-            ),
-        })
+    def collect(self) -> List[Tuple[str, Dict, Dict]]:
+        """
+        Block until at least one parser finishes or times out; returns
+        (name, result, meta) for each.
+        """
+        deadline = min(t for _, t in self._pending.values()) + self.timeout
+        done, _ = wait(
+            self._pending,
+            timeout=max(0.0, deadline - time.perf_counter()),
+            return_when=FIRST_COMPLETED,
+        )
 
-    # --------------------------------------------------
-    # Rule C: Old kernel + weak hardening
-    # --------------------------------------------------
-    if kernel.get("kernel_version"):
-        try:
-            major = int(kernel["kernel_version"].split(".")[0])
-            if major < 4 and kernel.get("hardening", {}).get("nx") is False:
-                findings.append({
-                    "title": "Outdated kernel with NX disabled",
-                    "severity": "high",
-                    "confidence": "medium",
-                    "attack_vector": "local/remote",
-                    "components": ["kernel"],
-                    "evidence": kernel,
-                    "reasoning": (
-                        "Outdated kernel combined with missing NX protection "
-                        "significantly reduces exploit complexity."
-                    ),
-                })
-        except Exception:
-            pass
-
-    # --------------------------------------------------
-    # Rule D: Weak crypto + credentials
-    # --------------------------------------------------
-    if crypto.get("summary", {}).get("weak_algorithms") and creds.get("found"):
-        findings.append({
-            "title": "Weak cryptography used for credential storage",
-            "severity": "high",
-            "confidence": "medium",
-            "attack_vector": "offline",
-            "components": ["crypto", "credentials"],
-            "evidence": {
-                "crypto": crypto,
-                "credentials": creds,
-            },
-            "reasoning": (
-                "Weak cryptographic primitives were detected alongside stored "
-                "credentials, enabling offline attacks."
+        out = []
+        now = time.perf_counter()
+        for fut, (name, started) in list(self._pending.items()):
+            if fut in done:
+                del self._pending[fut]
+                try:
+                    result, seconds = fut.result()
+                    out.append((
+                        name,
+                        result if isinstance(result, dict) else {},
+                        {"status": "ok", "seconds": round(seconds, 3)},
+                    ))
+                except Exception as e:
+                    log.exception("Parser %s failed during correlation", name)
+                    out.append((name, {}, {"status": "error", "error": str(e)}))
+            elif now - started >= self.timeout:
+                del self._pending[fut]
+                log.warning("Parser %s timed out after %.0fs", name, self.timeout)
+                out.append((name, {}, {"status": "timeout", "seconds": round(now - started, 3)}))
+        return out
+
+    def close(self):
+        # Never block on a timed-out parser
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_parsers(
+    jobs: Dict[str, Callable[[], Dict]],
+    timeout: float = PARSER_TIMEOUT,
+) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    """
+    Run independent parsers concurrently (see ParserRun).
+    """
+    results: Dict[str, Dict] = {}
+    meta: Dict[str, Dict] = {}
+
+    run = ParserRun(len(jobs), timeout)
+    try:
+        for name, fn in jobs.items():
+            run.start(name, fn)
+        while run:
+            for name, result, info in run.collect():
+                results[name] = result
+                meta[name] = info
+    finally:
+        run.close()
+
+    return results, meta
+
+
+# ----------------------------
+# Rule inputs
+# ----------------------------
+# Every input is a parser called as fn(log_dir, fs_root). Parsers are only
+# run when a rule that is still live needs them.
+
+INPUTS: Dict[str, Callable[[Path, Optional[Path]], Dict]] = {
+    "kernel":      lambda log_dir, fs_root: parse_kernel_info(log_dir),
+    "services":    parse_network_services,
+    "creds":       parse_credentials,
+    "crypto":      parse_weak_crypto,
+    "permissions": parse_permissions,
+    "weak_funcs":  lambda log_dir, fs_root: parse_weak_functions(log_dir),
+}
+
+
+def _detected(services: Dict, group: set) -> set:
+    return set(services.get("services_detected", [])) & group
+
+
+def _kernel_major(kernel: Dict) -> Optional[int]:
+    try:
+        return int(kernel["kernel_version"].split(".")[0])
+    except Exception:
+        return None
+
+
+def _kernel_before(kernel: Dict, major: int) -> bool:
+    # An unparsable version is not evidence of an old kernel
+    found = _kernel_major(kernel)
+    return found is not None and found < major
+
+
+def _suid_binaries(perms: Dict) -> List[str]:
+    return perms.get("summary", {}).get("suid_binaries", [])
+
+
+def _weak_calls(weak_funcs: Dict) -> List[Dict]:
+    return weak_funcs.get("intense", []) + weak_funcs.get("radare", [])
+
+
+# Evidence items: only what a rule actually matched, per input
+
+def _service_items(services: Dict, names: set) -> List[Dict]:
+    sources = services.get("evidence", {})
+    return [{"service": s, "sources": sources.get(s, [])} for s in sorted(names)]
+
+
+def _has_credentials(creds: Dict) -> bool:
+    # "found" only means a rootfs was searched
+    summary = creds.get("summary", {})
+    return any(summary.get(k) for k in ("users", "config_files", "ssh_keys"))
+
+
+def _credential_items(creds: Dict) -> List[str]:
+    return creds.get("sources", [])
+
+
+def _weak_algorithm_items(crypto: Dict) -> List[Dict]:
+    weak = crypto.get("summary", {}).get("weak_algorithms", {})
+    return [{"path": p, "algorithms": algs} for p, algs in weak.items()]
+
+
+# ----------------------------
+# Correlation rules
+# ----------------------------
+# Rules build findings whose "evidence" maps input name -> matched items.
+# The engine keeps those items aside and puts compact references into
+# the finding (see get_finding_evidence).
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    A correlation rule.
+    `requires` lists its inputs, cheapest / most selective first; the
+    engine resolves them in that order. `gates` are cheap preconditions
+    per input: once an input is available and its gate fails, the rule
+    is dropped and its remaining inputs are never computed.
+    """
+    name: str
+    requires: Tuple[str, ...]
+    build: Callable[[Dict[str, Dict]], Optional[Dict]]
+    gates: Dict[str, Callable[[Dict], bool]] = field(default_factory=dict)
+
+    def failed_gate(self, inputs: Dict[str, Dict]) -> Optional[str]:
+        for name, gate in self.gates.items():
+            if name in inputs and not gate(inputs[name]):
+                return name
+        return None
+
+
+# --------------------------------------------------
+# Rule A: Remote service + credentials (GENERALIZED)
+# --------------------------------------------------
+def _rule_remote_creds(inputs: Dict[str, Dict]) -> Optional[Dict]:
+    services, creds = inputs["services"], inputs["creds"]
+    dangerous_services = _detected(services, HIGH_RISK_REMOTE_SERVICES)
+    auth_services = _detected(services, AUTHENTICATED_REMOTE_SERVICES)
+
+    return {
+        "title": "Remote service exposed with embedded credentials",
+        "severity": "critical" if dangerous_services else "high",
+        "confidence": "high",
+        "attack_vector": "remote",
+        "components": sorted(dangerous_services | auth_services | {"credentials"}),
+        "evidence": {
+            "services": _service_items(services, dangerous_services | auth_services),
+            "creds": _credential_items(creds),
+        },
+        "reasoning": (
+            "One or more remotely accessible services were detected together "
+            "with embedded credentials. This enables authenticated or "
+            "unauthenticated remote compromise depending on service behavior."
+        ),
+    }
+
+
+# --------------------------------------------------
+# Rule B: Insecure remote services (even without creds)
+# --------------------------------------------------
+def _rule_insecure_services(inputs: Dict[str, Dict]) -> Optional[Dict]:
+    services = inputs["services"]
+    dangerous_services = _detected(services, HIGH_RISK_REMOTE_SERVICES)
+
+    return {
+        "title": "Insecure remote services exposed",
+        "severity": "high",
+        "confidence": "medium",
+        "attack_vector": "remote",
+        "components": sorted(dangerous_services),
+        "evidence": {
+            "services": _service_items(services, dangerous_services),
+        },
+        "reasoning": (
+            "Legacy or insecure remote services were detected. These services "
+            "frequently lack authentication or use weak default configurations."
+        ),
+    }
+
+
+# --------------------------------------------------
+# Rule C: Old kernel + weak hardening
+# --------------------------------------------------
+def _rule_old_kernel(inputs: Dict[str, Dict]) -> Optional[Dict]:
+    kernel = inputs["kernel"]
+
+    return {
+        "title": "Outdated kernel with NX disabled",
+        "severity": "high",
+        "confidence": "medium",
+        "attack_vector": "local/remote",
+        "components": ["kernel"],
+        "evidence": {
+            "kernel": [{
+                "kernel_version": kernel.get("kernel_version"),
+                "hardening": kernel.get("hardening", {}),
+                "sources": kernel.get("sources", []),
+                "provenance": kernel.get("provenance", {}),
+            }],
+        },
+        "reasoning": (
+            "Outdated kernel combined with missing NX protection "
+            "significantly reduces exploit complexity."
+        ),
+    }
+
+
+# --------------------------------------------------
+# Rule D: Weak crypto + credentials
+# --------------------------------------------------
+def _rule_weak_crypto_creds(inputs: Dict[str, Dict]) -> Optional[Dict]:
+    return {
+        "title": "Weak cryptography used for credential storage",
+        "severity": "high",
+        "confidence": "medium",
+        "attack_vector": "offline",
+        "components": ["crypto", "credentials"],
+        "evidence": {
+            "crypto": _weak_algorithm_items(inputs["crypto"]),
+            "creds": _credential_items(inputs["creds"]),
+        },
+        "reasoning": (
+            "Weak cryptographic primitives were detected alongside stored "
+            "credentials, enabling offline attacks."
+        ),
+    }
+
+
+# --------------------------------------------------
+# Rule E: Dangerous functions + privileged binaries
+# --------------------------------------------------
+def _rule_suid_weak_funcs(inputs: Dict[str, Dict]) -> Optional[Dict]:
+    perms = inputs["permissions"]
+    suid = set(_suid_binaries(perms))
+    fs_root = perms.get("filesystem_root")
+
+    # SUID paths are rootfs paths ("/bin/busybox"); EMBA may report a
+    # binary under the extraction root instead. Compared exactly only:
+    # /usr/bin/busybox is not /bin/busybox.
+    def privileged(binary: str) -> List[str]:
+        path = rootfs_path(binary, fs_root)
+        return [path] if path in suid else []
+
+    calls = [c for c in _weak_calls(inputs["weak_funcs"]) if privileged(c["binary"])]
+    if not calls:
+        return None
+
+    return {
+        "title": "Dangerous functions in privileged binaries",
+        "severity": "critical",
+        "confidence": "high",
+        "attack_vector": "local",
+        "components": ["binary", "privilege escalation"],
+        "evidence": {
+            "weak_funcs": calls,
+            "permissions": sorted({p for c in calls for p in privileged(c["binary"])}),
+        },
+        "reasoning": (
+            "Unsafe C library functions were detected inside privileged "
+            "binaries, enabling reliable local privilege escalation."
+        ),
+    }
+
+
+RULES: List[Rule] = [
+    Rule(
+        name="remote_service_credentials",
+        requires=("services", "creds"),
+        gates={
+            "services": lambda s: bool(
+                _detected(s, HIGH_RISK_REMOTE_SERVICES | AUTHENTICATED_REMOTE_SERVICES)
             ),
-        })
+            "creds": _has_credentials,
+        },
+        build=_rule_remote_creds,
+    ),
+    Rule(
+        name="insecure_remote_services",
+        requires=("services",),
+        gates={"services": lambda s: bool(_detected(s, HIGH_RISK_REMOTE_SERVICES))},
+        build=_rule_insecure_services,
+    ),
+    Rule(
+        name="outdated_kernel_no_nx",
+        requires=("kernel",),
+        gates={
+            "kernel": lambda k: (
+                _kernel_before(k, 4)
+                and k.get("hardening", {}).get("nx") is False
+            ),
+        },
+        build=_rule_old_kernel,
+    ),
+    Rule(
+        name="weak_crypto_credentials",
+        requires=("creds", "crypto"),
+        gates={
+            "creds": _has_credentials,
+            "crypto": lambda c: bool(c.get("summary", {}).get("weak_algorithms")),
+        },
+        build=_rule_weak_crypto_creds,
+    ),
+    Rule(
+        name="dangerous_functions_suid",
+        requires=("permissions", "weak_funcs"),
+        gates={
+            "permissions": lambda p: bool(_suid_binaries(p)),
+            "weak_funcs": lambda w: bool(w.get("count")),
+        },
+        build=_rule_suid_weak_funcs,
+    ),
+]
+
+
+# ----------------------------
+# Rule engine
+# ----------------------------
+
+def finding_id(rule_name: str, finding: Dict) -> str:
+    """
+    Stable, content-derived ID: the same rule firing on the same
+    components always yields the same ID, across runs and processes.
+    """
+    h = hashlib.blake2b(digest_size=6)
+    h.update(rule_name.encode())
+    for component in finding.get("components", []):
+        h.update(b"\0" + component.encode())
+    return f"HR-{h.hexdigest()}"
+
+
+def _evidence_refs(fid: str, evidence: Dict[str, List]) -> List[Dict]:
+    return [
+        {
+            "finding_id": fid,
+            "parser": parser,
+            "count": len(items),
+            "items": items[:EVIDENCE_PREVIEW],
+        }
+        for parser, items in evidence.items()
+    ]
+
+
+def evaluate_rules(log_dir: Path, rules: List[Rule] = RULES) -> Dict:
+    """
+    Resolve rule inputs lazily and concurrently. The first input of
+    every rule starts at once; a rule's next input starts as soon as the
+    previous one arrives and passes its gate, without waiting for other
+    rules' parsers. Rules whose gates fail are dropped, so parsers no
+    rule can use any more are never run.
+    """
+    fs_root = find_filesystem_root(log_dir)
+    started = time.perf_counter()
+
+    inputs: Dict[str, Dict] = {}
+    parser_meta: Dict[str, Dict] = {}
+    rule_status: Dict[str, str] = {}
+    waves: List[List[str]] = []
+    live = list(rules)
+    requested: set = set()
+
+    run = ParserRun(len(INPUTS))
+    try:
+        while True:
+            wave: List[str] = []
+            for rule in live:
+                missing = next((r for r in rule.requires if r not in inputs), None)
+                if missing and missing not in requested:
+                    requested.add(missing)
+                    wave.append(missing)
+                    run.start(missing, lambda fn=INPUTS[missing]: fn(log_dir, fs_root))
+            if wave:
+                waves.append(wave)
+            if not run:
+                break
+
+            for name, result, meta in run.collect():
+                inputs[name] = result
+                parser_meta[name] = meta
 
-    # --------------------------------------------------
-    # Rule E: Dangerous functions + privileged binaries
-    # --------------------------------------------------
-    if weak_funcs.get("dangerous_calls") and bin_prot.get("suid_binaries"):
+            still_live = []
+            for rule in live:
+                failed = rule.failed_gate(inputs)
+                if failed:
+                    rule_status[rule.name] = f"skipped: {failed} precondition not met"
+                else:
+                    still_live.append(rule)
+            live = still_live
+    finally:
+        run.close()
+
+    findings: List[Dict] = []
+    evidence: Dict[str, Dict[str, List]] = {}
+    for rule in live:
+        finding = rule.build(inputs)
+        rule_status[rule.name] = "fired" if finding else "no match"
+        if not finding:
+            continue
+
+        fid = finding_id(rule.name, finding)
+        evidence[fid] = finding["evidence"]
         findings.append({
-            "title": "Dangerous functions in privileged binaries",
-            "severity": "critical",
-            "confidence": "high",
-            "attack_vector": "local",
-            "components": ["binary", "privilege escalation"],
-            "evidence": {
-                "functions": weak_funcs,
-                "suid_binaries": bin_prot.get("suid_binaries"),
-            },
-            "reasoning": (
-                "Unsafe C library functions were detected inside privileged "
-                "binaries, enabling reliable local privilege escalation."
-            ),
+            "id": fid,
+            "rule": rule.name,
+            **finding,
+            "evidence": _evidence_refs(fid, finding["evidence"]),
         })
 
+    degraded = [n for n, m in parser_meta.items() if m["status"] != "ok"]
+
     return {
-        "count": len(findings),
         "findings": findings,
+        "evidence": evidence,
+        "meta": {
+            "parsers": parser_meta,
+            "waves": waves,
+            "parsers_skipped": [n for n in INPUTS if n not in inputs],
+            "rules": {r.name: rule_status[r.name] for r in rules},
+            "wall_seconds": round(time.perf_counter() - started, 3),
+        },
+        "partial": bool(degraded),
+    }
+
+
+# ----------------------------
+# Main analyzer
+# ----------------------------
+
+@cached_result("correlation")
+def correlate(log_dir: Path) -> Dict:
+    """
+    One correlation run per log_dir: findings with evidence references,
+    plus the full evidence keyed by finding ID.
+    """
+    return evaluate_rules(log_dir)
+
+
+def get_high_risk_findings(log_dir: Path) -> Dict:
+    result = correlate(log_dir)
+
+    return {
+        "count": len(result["findings"]),
+        "findings": result["findings"],
+        "meta": result["meta"],
+        # Incomplete correlation (a parser failed or timed out): not cached
+        "partial": result["partial"],
+    }
+
+
+def get_finding_evidence(
+    log_dir: Path,
+    finding_id: str,
+    parser: str = "",
+    offset: int = 0,
+    limit: int = EVIDENCE_PAGE_SIZE,
+) -> Dict:
+    """
+    Full evidence of one finding, one page at a time.
+    Entries are {"parser", "item"}; `parser` restricts to one input.
+    """
+    evidence = correlate(log_dir)["evidence"]
+
+    if finding_id not in evidence:
+        return {
+            "error": f"Unknown finding ID: {finding_id}",
+            "available_findings": list(evidence),
+        }
+
+    by_parser = evidence[finding_id]
+    if parser and parser not in by_parser:
+        return {
+            "error": f"No {parser} evidence for {finding_id}",
+            "available_parsers": list(by_parser),
+        }
+
+    entries = [
+        {"parser": name, "item": item}
+        for name, items in by_parser.items()
+        if not parser or name == parser
+        for item in items
+    ]
+
+    offset = max(0, offset)
+    limit = max(1, limit)
+    end = offset + limit
+
+    return {
+        "finding_id": finding_id,
+        "parser": parser or None,
+        "total": len(entries),
+        "offset": offset,
+        "items": entries[offset:end],
+        "next_offset": end if end < len(entries) else None,
     }
@@ -1,63 +1,60 @@
 import re
 from pathlib import Path
-from typing import Dict,List
+from typing import Dict, List, Optional
 
+from emba_mcp.cache import cached_result
+from emba_mcp.catalog import get_log_catalog
+from emba_mcp.models import BinaryProtection
+from emba_mcp.reader import collect, extract_files
 
 
-def parse_binary_protections(log_dir: Path) -> Dict:
-    sources = []
-    binaries = []
-
-    # EMBA truth source
-    txt_files = list(log_dir.glob("s12_binary_protection*.txt"))
+def _parse_protection_line(line: str) -> Optional[BinaryProtection]:
+    if "/" not in line:
+        return None
 
-    for txt in txt_files:
-        text = txt.read_text(errors="ignore")
-        sources.append(str(txt))
+    # Binary path
+    m = re.search(r"(/[\w/\.\-]+)", line)
+    if not m:
+        return None
+    entry = BinaryProtection(binary=m.group(1))
 
-        for line in text.splitlines():
-            if "/" not in line:
-                continue
+    # RELRO
+    if "Full RELRO" in line:
+        entry.relro = "full"
+    elif "No RELRO" in line:
+        entry.relro = "none"
 
-            entry = {
-                "binary": None,
-                "nx": "unknown",
-                "pie": "unknown",
-                "relro": "unknown",
-                "stack_canary": "unknown",
-            }
+    # Canary
+    if "No Canary found" in line:
+        entry.stack_canary = False
+    elif "Canary found" in line:
+        entry.stack_canary = True
 
-            # Binary path
-            m = re.search(r"(/[\w/\.\-]+)", line)
-            if not m:
-                continue
-            entry["binary"] = m.group(1)
+    # NX
+    if "NX disabled" in line:
+        entry.nx = False
+    elif "NX enabled" in line:
+        entry.nx = True
 
-            # RELRO
-            if "Full RELRO" in line:
-                entry["relro"] = "full"
-            elif "No RELRO" in line:
-                entry["relro"] = "none"
+    # PIE
+    if "No PIE" in line:
+        entry.pie = False
+    elif "PIE" in line:
+        entry.pie = True
 
-            # Canary
-            if "No Canary found" in line:
-                entry["stack_canary"] = False
-            elif "Canary found" in line:
-                entry["stack_canary"] = True
+    return entry
 
-            # NX
-            if "NX disabled" in line:
-                entry["nx"] = False
-            elif "NX enabled" in line:
-                entry["nx"] = True
 
-            # PIE
-            if "No PIE" in line:
-                entry["pie"] = False
-            elif "PIE" in line:
-                entry["pie"] = True
+@cached_result("binary_protections")
+def parse_binary_protections(log_dir: Path) -> Dict:
+    sources = []
+    binaries: List[BinaryProtection] = []
 
-            binaries.append(entry)
+    # EMBA truth source
+    for txt in get_log_catalog(log_dir).glob("s12_binary_protection*.txt"):
+        sources.append(txt.rel)
+        (found,) = extract_files([txt.path], collect(_parse_protection_line))
+        binaries.extend(found)
 
     confidence = "high" if binaries else "low"
 
@@ -1,88 +1,60 @@
 from pathlib import Path
 import re
-from typing import Dict, List, Optional
+from typing import Dict, List
+
+from emba_mcp.cache import cached_result
+from emba_mcp.catalog import get_log_catalog
+from emba_mcp.reader import best_match, extract_files
 
 
 # -------------------------
-# Helpers
+# Detection patterns
 # -------------------------
+# Ranked: the earliest-listed match anywhere in the logs wins, so the
+# scan stops as soon as the top-ranked pattern is seen.
 
-def _read_text_files(paths: List[Path]) -> List[str]:
-    contents = []
-    for p in paths:
-        try:
-            if p.exists() and p.is_file():
-                contents.append(p.read_text(errors="ignore"))
-        except Exception:
-            continue
-    return contents
-
-
-def _detect_bootloader(text: str) -> Optional[str]:
-    bootloader_patterns = {
-        "u-boot": r"\bU-Boot\b",
-        "redboot": r"\bRedBoot\b",
-        "cfe": r"\bCFE\b",
-        "barebox": r"\bbarebox\b",
-        "uboot-env": r"bootcmd=|bootargs=",
-    }
-
-    for name, pattern in bootloader_patterns.items():
-        if re.search(pattern, text, re.IGNORECASE):
-            return name
+BOOTLOADER_PATTERNS = [
+    ("u-boot", re.compile(r"\bU-Boot\b", re.IGNORECASE)),
+    ("redboot", re.compile(r"\bRedBoot\b", re.IGNORECASE)),
+    ("cfe", re.compile(r"\bCFE\b", re.IGNORECASE)),
+    ("barebox", re.compile(r"\bbarebox\b", re.IGNORECASE)),
+    ("uboot-env", re.compile(r"bootcmd=|bootargs=", re.IGNORECASE)),
+]
 
-    return None
-
-
-def _detect_startup_system(text: str) -> Optional[str]:
-    if re.search(r"/etc/inittab", text):
-        return "sysvinit"
-    if re.search(r"/etc/init\.d/", text):
-        return "sysvinit"
-    if re.search(r"rcS|rc\.d", text):
-        return "sysvinit"
-    if re.search(r"procd", text):
-        return "openwrt-procd"
-    return None
+STARTUP_PATTERNS = [
+    ("sysvinit", re.compile(r"/etc/inittab|/etc/init\.d/|rcS|rc\.d")),
+    ("openwrt-procd", re.compile(r"procd")),
+]
 
 
 # -------------------------
 # Main parser
 # -------------------------
 
+@cached_result("bootloader_info")
 def parse_bootloader_info(log_dir: Path) -> Dict:
     """
     Parse bootloader and system startup information from EMBA output.
     """
 
-    sources: List[str] = []
-    text_blobs: List[str] = []
+    catalog = get_log_catalog(log_dir)
 
-    candidate_dirs = [
-        log_dir / "s07_bootloader_check",
-        log_dir / "s06_distribution_identification",
+    files = [
+        f for d in ("s07_bootloader_check", "s06_distribution_identification")
+        for f in catalog.in_dir(d, ".txt")
     ]
+    sources: List[str] = [f.rel for f in files]
 
-    for d in candidate_dirs:
-        if d.exists() and d.is_dir():
-            files = list(d.glob("*.txt"))
-            sources.extend(str(f) for f in files)
-            text_blobs.extend(_read_text_files(files))
-
-    combined_text = "\n".join(text_blobs)
+    bootloader, startup_system = extract_files(
+        [f.path for f in files],
+        best_match(BOOTLOADER_PATTERNS),
+        best_match(STARTUP_PATTERNS),
+    )
 
-    bootloader = _detect_bootloader(combined_text)
-    startup_system = _detect_startup_system(combined_text)
-
-    startup_files = []
-    for p in [
-        log_dir / "etc" / "inittab",
-        log_dir / "etc" / "rcS",
-        log_dir / "etc" / "init.d",
-        log_dir / "etc" / "rc.d",
-    ]:
-        if p.exists():
-            startup_files.append(str(p))
+    startup_files = [
+        p for p in ("etc/inittab", "etc/rcS", "etc/init.d", "etc/rc.d")
+        if catalog.exists(p)
+    ]
 
     confidence = "low"
     if bootloader and startup_system:
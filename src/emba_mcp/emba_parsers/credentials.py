@@ -2,6 +2,15 @@ from pathlib import Path
 from typing import Dict, List
 import re
 
+from emba_mcp.cache import cached_result
+from emba_mcp.content_scan import (
+    Matches,
+    is_credential_candidate,
+    scan_rootfs,
+)
+from emba_mcp.filesystem import get_filesystem_index
+from emba_mcp.reader import read_text_capped
+
 
 PASSWD_FILES = {
     "passwd": "etc/passwd",
@@ -21,11 +30,8 @@ KEY_FILES = (
 )
 
 
-def _safe_read(path: Path) -> str:
-    try:
-        return path.read_text(errors="ignore")
-    except Exception:
-        return ""
+def _mentions_password(matches: Matches) -> bool:
+    return "secret:password" in matches
 
 
 def _parse_passwd(text: str) -> List[Dict]:
@@ -43,6 +49,7 @@ def _parse_passwd(text: str) -> List[Dict]:
     return users
 
 
+@cached_result("credentials")
 def parse_credentials(log_dir: Path, fs_root: Path | None) -> Dict:
     findings = {
         "users": [],
@@ -61,37 +68,42 @@ def parse_credentials(log_dir: Path, fs_root: Path | None) -> Dict:
             "confidence": "low",
         }
 
+    index = get_filesystem_index(fs_root)
+    scans = scan_rootfs(index)
+    scanned: List[str] = []
+
     # ---- passwd / shadow ----
-    passwd_path = fs_root / "etc" / "passwd"
-    shadow_path = fs_root / "etc" / "shadow"
+    passwd = index.get(PASSWD_FILES["passwd"])
+    shadow = index.get(PASSWD_FILES["shadow"])
 
-    if passwd_path.exists():
-        text = _safe_read(passwd_path)
+    if passwd and passwd.kind == "file":
+        text = read_text_capped(Path(index.abspath(passwd)))
         findings["users"] = _parse_passwd(text)
-        sources.append(str(passwd_path))
+        sources.append(passwd.path)
 
-    if shadow_path.exists():
+    if shadow and shadow.kind == "file":
         findings["shadow_present"] = True
-        sources.append(str(shadow_path))
+        sources.append(shadow.path)
 
     # ---- SSH keys ----
-    for p in fs_root.rglob("*"):
-        if not p.is_file():
-            continue
-
-        name = p.name.lower()
+    for e in index.files():
+        name = e.name.lower()
 
         if name in KEY_FILES:
-            findings["ssh_keys"].append(str(p))
-            sources.append(str(p))
+            findings["ssh_keys"].append(e.path)
+            sources.append(e.path)
+
+        if e.suffix in SECRET_EXTENSIONS:
+            findings["backup_files"].append(e.path)
+            sources.append(e.path)
 
-        if p.suffix in SECRET_EXTENSIONS:
-            findings["backup_files"].append(str(p))
-            sources.append(str(p))
+        if not is_credential_candidate(e):
+            continue
 
-        if p.suffix in {".conf", ".cfg"} and "password" in _safe_read(p).lower():
-            findings["config_files"].append(str(p))
-            sources.append(str(p))
+        scanned.append(e.path)
+        if _mentions_password(scans.matches_for(e.path)):
+            findings["config_files"].append(e.path)
+            sources.append(e.path)
 
     confidence = "low"
     if findings["users"] or findings["ssh_keys"]:
@@ -101,7 +113,10 @@ def parse_credentials(log_dir: Path, fs_root: Path | None) -> Dict:
 
     return {
         "found": True,
+        "filesystem_root": index.root_str,
         "summary": findings,
         "confidence": confidence,
         "sources": sorted(set(sources)),
+        "truncated_scans": scans.truncated(scanned),
+        "scan_cache": scans.cache_report(),
     }
@@ -1,14 +1,17 @@
 from pathlib import Path
 from typing import Optional
+from emba_mcp.cache import cached_result
+from emba_mcp.catalog import get_log_catalog
 from emba_mcp.models import DistributionInfo
 
+@cached_result("distribution")
 def parse_distribution(log_dir: Path) -> DistributionInfo:
     """
     Parse EMBA s06_distribution_identification.txt
     """
-    path = log_dir / "s06_distribution_identification.txt"
+    artifact = get_log_catalog(log_dir).file("s06_distribution_identification.txt")
 
-    if not path.exists():
+    if not artifact:
         return DistributionInfo(
             name=None,
             version=None,
@@ -16,7 +19,7 @@ def parse_distribution(log_dir: Path) -> DistributionInfo:
             raw=""
         )
 
-    raw = path.read_text(errors="ignore")
+    raw = artifact.path.read_text(errors="ignore")
 
     name: Optional[str] = None
     version: Optional[str] = None
@@ -1,47 +1,59 @@
 
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, List, Optional
 import csv
 
+from emba_mcp.cache import cached_result
+from emba_mcp.catalog import get_log_catalog
+from emba_mcp.models import InterestingFile
+from emba_mcp.reader import collect, extract_files
+
+
+def _parse_s95_line(line: str) -> Optional[InterestingFile]:
+    line = line.strip()
+    if not line.startswith("/"):
+        return None
+
+    return InterestingFile(
+        file=line.split()[0],
+        reason="Interesting file (EMBA s95)",
+        confidence="high",
+    )
+
+
+@cached_result("interesting_files")
 def parse_interesting_files(log_dir: Path) -> Dict:
-    findings: List[Dict] = []
+    findings: List[InterestingFile] = []
     sources = []
+    catalog = get_log_catalog(log_dir)
 
     # ---- CSV (best-effort) ----
-    csv_path = log_dir / "csv_logs" / "s95_interesting_files_check.csv"
-    if csv_path.exists():
-        sources.append(str(csv_path))
-        with open(csv_path, newline="", encoding="utf-8", errors="ignore") as f:
+    csv_file = catalog.file("csv_logs/s95_interesting_files_check.csv")
+    if csv_file:
+        sources.append(csv_file.rel)
+        with open(csv_file.path, newline="", encoding="utf-8", errors="ignore") as f:
             reader = csv.DictReader(f)
             for row in reader:
                 if row.get("FILE"):
-                    findings.append({
-                        "file": row.get("FILE"),
-                        "reason": row.get("REASON", "interesting file"),
-                        "confidence": row.get("CONFIDENCE", "medium"),
-                    })
+                    findings.append(InterestingFile(
+                        file=row.get("FILE"),
+                        reason=row.get("REASON", "interesting file"),
+                        confidence=row.get("CONFIDENCE", "medium"),
+                    ))
 
     # ---- TXT (authoritative) ----
-    txt_path = log_dir / "s95_interesting_files_check.txt"
-    if txt_path.exists():
-        sources.append(str(txt_path))
-        for line in txt_path.read_text(errors="ignore").splitlines():
-            line = line.strip()
-            if not line.startswith("/"):
-                continue
-
-            findings.append({
-                "file": line.split()[0],
-                "reason": "Interesting file (EMBA s95)",
-                "confidence": "high",
-            })
+    txt_file = catalog.file("s95_interesting_files_check.txt")
+    if txt_file:
+        sources.append(txt_file.rel)
+        (found,) = extract_files([txt_file.path], collect(_parse_s95_line))
+        findings.extend(found)
 
     # ---- Dedup ----
     seen = set()
     unique = []
     for f in findings:
-        if f["file"] not in seen:
-            seen.add(f["file"])
+        if f.file not in seen:
+            seen.add(f.file)
             unique.append(f)
 
     return {
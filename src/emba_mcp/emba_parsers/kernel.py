@@ -1,156 +1,138 @@
 from pathlib import Path
 import re
-from typing import Dict, List, Optional
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+from emba_mcp.cache import cached_result
+from emba_mcp.catalog import Artifact, get_log_catalog
+from emba_mcp.reader import Extractor, best_match, extract_files, first
 
 
 # ----------------------------
-# Helpers
+# Sources, most authoritative first
 # ----------------------------
+# Each field is taken from the first source that yields it and is not
+# searched any further. Ranked fields (architecture, hardening flags)
+# read their whole source unless the top rank turns up. The HTML report
+# is a fallback: it is only read while the kernel version or
+# architecture is still unknown.
+
+KERNEL_MODULES = ("s24", "s25", "s26", "s02")
+KERNEL_SUFFIXES = (".txt", ".log", ".out", ".csv")
+HTML_REPORT = "html-report/index.html"
 
-def _read_text_files(paths: List[Path]) -> List[str]:
-    """Safely read multiple text files"""
-    contents = []
-    for p in paths:
-        try:
-            if p.exists() and p.is_file():
-                contents.append(p.read_text(errors="ignore"))
-        except Exception:
-            continue
-    return contents
+# Fields the fallback source is consulted for
+PRIMARY_FIELDS = ("kernel_version", "architecture")
 
 
 # ----------------------------
-# Extractors
+# Line extractors
 # ----------------------------
 
-def _extract_kernel_version(text: str) -> Optional[str]:
-    """
-    Extract kernel version from strings like:
-      Linux version 2.6.36 (gcc version 4.3.6)
-    """
-    match = re.search(
-        r"Linux version\s+([0-9]+\.[0-9]+\.[0-9]+[^\s]*)",
-        text,
-        re.IGNORECASE,
-    )
-    return match.group(1) if match else None
-
+VERSION_RE = re.compile(r"Linux version\s+([0-9]+\.[0-9]+\.[0-9]+[^\s]*)", re.IGNORECASE)
 
-def _extract_architecture(text: str) -> Optional[str]:
-    """
-    Detect architecture from EMBA outputs.
-    Order matters (mipsel before mips).
-    """
-    arch_patterns = [
-        ("mipsel", r"\bmipsel\b"),
-        ("mips", r"\bmips\b"),
-        ("aarch64", r"\baarch64\b|\barm64\b"),
-        ("arm", r"\barm\b|\barmv[0-9]+\b|\barmhf\b|\barmel\b"),
-        ("x86", r"\bx86\b|\bi[3-6]86\b"),
-    ]
+# Ranked: within a source, the highest-ranked architecture mentioned
+# anywhere wins (mipsel over mips, and any of them over x86)
+ARCH_PATTERNS = [
+    ("mipsel", re.compile(r"\bmipsel\b", re.IGNORECASE)),
+    ("mips", re.compile(r"\bmips\b", re.IGNORECASE)),
+    ("aarch64", re.compile(r"\baarch64\b|\barm64\b", re.IGNORECASE)),
+    ("arm", re.compile(r"\barm\b|\barmv[0-9]+\b|\barmhf\b|\barmel\b", re.IGNORECASE)),
+    ("x86", re.compile(r"\bx86\b|\bi[3-6]86\b", re.IGNORECASE)),
+]
 
-    for arch, pattern in arch_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            return arch
-    return None
+COMPILER_RE = re.compile(r"gcc version\s+([0-9]+\.[0-9]+(\.[0-9]+)?)", re.IGNORECASE)
 
+BUILD_DATE_RE = re.compile(
+    r"(Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s+"
+    r"(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+"
+    r"\d+\s+\d+:\d+:\d+\s+\d{4}"
+)
 
-def _extract_compiler(text: str) -> Optional[str]:
-    """
-    Extract compiler version if present.
-    """
-    match = re.search(
-        r"gcc version\s+([0-9]+\.[0-9]+(\.[0-9]+)?)",
-        text,
-        re.IGNORECASE,
-    )
-    return match.group(1) if match else None
+NX_ON_RE = re.compile(r"\bNX enabled\b", re.IGNORECASE)
+NX_OFF_RE = re.compile(r"\bNX disabled\b|\bno nx\b", re.IGNORECASE)
+ASLR_ON_RE = re.compile(r"\bASLR enabled\b", re.IGNORECASE)
+ASLR_OFF_RE = re.compile(r"\bASLR disabled\b", re.IGNORECASE)
+CANARY_RE = re.compile(r"\bstack protector\b|\bcanary\b", re.IGNORECASE)
 
 
-def _extract_build_date(text: str) -> Optional[str]:
-    """
-    Extract kernel build date if present.
-    """
-    match = re.search(
-        r"(Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s+"
-        r"(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+"
-        r"\d+\s+\d+:\d+:\d+\s+\d{4}",
-        text,
-    )
-    return match.group(0) if match else None
+def _group(pattern: re.Pattern, group: int) -> Callable[[str], Optional[str]]:
+    def parse(line: str) -> Optional[str]:
+        m = pattern.search(line)
+        return m.group(group) if m else None
+    return parse
 
 
-def _detect_hardening(text: str) -> Dict[str, str | bool]:
+def _switch(on: re.Pattern, off: Optional[re.Pattern]) -> Callable[[], Extractor]:
     """
-    Very conservative hardening detection.
-    Never guess.
+    Conservative hardening flag: True/False when a source says so, and
+    "enabled" anywhere in the source outranks "disabled". Never guess.
     """
-    hardening = {
-        "nx": "unknown",
-        "aslr": "unknown",
-        "stack_canary": "unknown",
-    }
-
-    if re.search(r"\bNX enabled\b", text, re.IGNORECASE):
-        hardening["nx"] = True
-    elif re.search(r"\bNX disabled\b|\bno nx\b", text, re.IGNORECASE):
-        hardening["nx"] = False
-
-    if re.search(r"\bASLR enabled\b", text, re.IGNORECASE):
-        hardening["aslr"] = True
-    elif re.search(r"\bASLR disabled\b", text, re.IGNORECASE):
-        hardening["aslr"] = False
+    ranked = [(True, on)] + ([(False, off)] if off is not None else [])
+    return partial(best_match, ranked)
 
-    if re.search(r"\bstack protector\b|\bcanary\b", text, re.IGNORECASE):
-        hardening["stack_canary"] = True
 
-    return hardening
+# field -> extractor factory (one fresh extractor per source);
+# hardening fields are dotted
+FIELDS: List[Tuple[str, Callable[[], Extractor]]] = [
+    ("kernel_version", partial(first, _group(VERSION_RE, 1))),
+    ("architecture", partial(best_match, ARCH_PATTERNS)),
+    ("compiler", partial(first, _group(COMPILER_RE, 1))),
+    ("build_date", partial(first, _group(BUILD_DATE_RE, 0))),
+    ("hardening.nx", _switch(NX_ON_RE, NX_OFF_RE)),
+    ("hardening.aslr", _switch(ASLR_ON_RE, ASLR_OFF_RE)),
+    ("hardening.stack_canary", _switch(CANARY_RE, None)),
+]
 
 
 # ----------------------------
 # Main parser
 # ----------------------------
 
+def _kernel_sources(log_dir: Path) -> List[Tuple[Artifact, bool]]:
+    """
+    (artifact, is_fallback) in priority order.
+    """
+    catalog = get_log_catalog(log_dir)
+    ordered = [
+        (a, False)
+        for module in KERNEL_MODULES
+        for a in catalog.module(module, *KERNEL_SUFFIXES)
+    ]
+    html_report = catalog.file(HTML_REPORT)
+    if html_report:
+        ordered.append((html_report, True))
+    return ordered
+
+
+@cached_result("kernel_info")
 def parse_kernel_info(log_dir: Path) -> Dict:
     """
-    Parse kernel metadata from EMBA output directories.
+    Parse kernel metadata from EMBA output, scanning the most
+    authoritative sources first and stopping per field once resolved.
     """
 
+    found: Dict[str, object] = {}
+    provenance: Dict[str, str] = {}
     sources: List[str] = []
-    text_blobs: List[str] = []
-
-    candidate_dirs = [
-        log_dir / "s24_kernel_bin_identifier",
-        log_dir / "s25_kernel_check",
-        log_dir / "s26_kernel_vuln_verifier",
-        log_dir / "s02_firmware_bin_base_analyzer",
-        log_dir / "csv_logs",
-    ]
 
-    # Read text-like artifacts
-    for d in candidate_dirs:
-        if d.exists() and d.is_dir():
-            for ext in ("*.txt", "*.log", "*.out", "*.csv"):
-                files = list(d.glob(ext))
-                sources.extend(str(f) for f in files)
-                text_blobs.extend(_read_text_files(files))
-
-    # HTML report fallback (IMPORTANT)
-    html_report = log_dir / "html-report" / "index.html"
-    if html_report.exists():
-        sources.append(str(html_report))
-        try:
-            text_blobs.append(html_report.read_text(errors="ignore"))
-        except Exception:
-            pass
-
-    combined_text = "\n".join(text_blobs)
-
-    kernel_version = _extract_kernel_version(combined_text)
-    architecture = _extract_architecture(combined_text)
-    compiler = _extract_compiler(combined_text)
-    build_date = _extract_build_date(combined_text)
-    hardening = _detect_hardening(combined_text)
+    for artifact, fallback in _kernel_sources(log_dir):
+        pending = [(name, make) for name, make in FIELDS if name not in found]
+        if not pending:
+            break
+        if fallback and all(f in found for f in PRIMARY_FIELDS):
+            break
+
+        sources.append(artifact.rel)
+        values = extract_files([artifact.path], *(make() for _, make in pending))
+
+        for (name, _), value in zip(pending, values):
+            if value is not None:
+                found[name] = value
+                provenance[name] = artifact.rel
+
+    kernel_version = found.get("kernel_version")
+    architecture = found.get("architecture")
 
     confidence = "low"
     if kernel_version and architecture:
@@ -161,9 +143,13 @@ def parse_kernel_info(log_dir: Path) -> Dict:
     return {
         "kernel_version": kernel_version,
         "architecture": architecture,
-        "compiler": compiler,
-        "build_date": build_date,
-        "hardening": hardening,
+        "compiler": found.get("compiler"),
+        "build_date": found.get("build_date"),
+        "hardening": {
+            key: found.get(f"hardening.{key}", "unknown")
+            for key in ("nx", "aslr", "stack_canary")
+        },
         "confidence": confidence,
         "sources": sources,
+        "provenance": provenance,
     }
@@ -1,48 +1,19 @@
 from pathlib import Path
 from typing import Dict, List
-import re
 
-
-SERVICE_SIGNATURES = {
-    "ssh": [
-        "dropbear",
-        "sshd",
-    ],
-    "telnet": [
-        "telnetd",
-    ],
-    "http": [
-        "lighttpd",
-        "uhttpd",
-        "httpd",
-    ],
-    "ftp": [
-        "ftpd",
-        "vsftpd",
-        "busybox ftpd",
-    ],
-    "tftp": [
-        "tftpd",
-    ],
-}
-
-
-def _scan_text_for_services(text: str) -> List[str]:
-    found = set()
-    for service, keywords in SERVICE_SIGNATURES.items():
-        for kw in keywords:
-            if re.search(rf"\b{re.escape(kw)}\b", text, re.IGNORECASE):
-                found.add(service)
-    return list(found)
-
-
-def _read_text(path: Path) -> str:
-    try:
-        return path.read_text(errors="ignore")
-    except Exception:
-        return ""
+from emba_mcp.cache import cached_result
+from emba_mcp.catalog import get_log_catalog
+from emba_mcp.content_scan import (
+    SERVICE_SIGNATURES,
+    match_names,
+    is_init_script,
+    scan_path,
+    scan_rootfs,
+)
+from emba_mcp.filesystem import get_filesystem_index
 
 
+@cached_result("network_services")
 def parse_network_services(log_dir: Path, fs_root: Path | None = None) -> Dict:
     """
     Identify network services present in firmware.
@@ -51,46 +22,52 @@ def parse_network_services(log_dir: Path, fs_root: Path | None = None) -> Dict:
 
     services_found = set()
     evidence: Dict[str, List[str]] = {}
+    truncated: List[str] = []
+    scan_cache = None
+    filesystem_root = None
 
     # ---- EMBA logs ----
-    for d in log_dir.iterdir():
-        if not d.is_dir():
-            continue
+    catalog = get_log_catalog(log_dir)
 
-        if "ssh" in d.name or "telnet" in d.name or "http" in d.name:
-            for f in d.glob("*.txt"):
-                text = _read_text(f)
-                found = _scan_text_for_services(text)
+    for d in catalog.dirs():
+        if "ssh" in d or "telnet" in d or "http" in d:
+            for f in catalog.in_dir(d, ".txt"):
+                found = match_names(scan_path(f.path), "service")
                 for s in found:
                     services_found.add(s)
-                    evidence.setdefault(s, []).append(str(f))
+                    evidence.setdefault(s, []).append(f.rel)
 
     # ---- Filesystem scan ----
     if fs_root:
-        for p in fs_root.rglob("*"):
-            try:
-                if not p.is_file():
-                    continue
+        index = get_filesystem_index(fs_root)
+        filesystem_root = index.root_str
+        scans = scan_rootfs(index)
+        scanned: List[str] = []
 
-                name = p.name.lower()
+        for e in index.files():
+            try:
+                name = e.name.lower()
 
                 for service, keywords in SERVICE_SIGNATURES.items():
                     for kw in keywords:
                         if kw in name:
                             services_found.add(service)
-                            evidence.setdefault(service, []).append(str(p))
+                            evidence.setdefault(service, []).append(e.path)
 
                 # Init scripts
-                if p.parent.name in {"init.d", "rc.d"}:
-                    text = _read_text(p)
-                    found = _scan_text_for_services(text)
+                if is_init_script(e):
+                    scanned.append(e.path)
+                    found = match_names(scans.matches_for(e.path), "service")
                     for s in found:
                         services_found.add(s)
-                        evidence.setdefault(s, []).append(str(p))
+                        evidence.setdefault(s, []).append(e.path)
 
             except Exception:
                 continue
 
+        truncated = scans.truncated(scanned)
+        scan_cache = scans.cache_report()
+
     confidence = "low"
     if len(services_found) >= 2:
         confidence = "high"
@@ -100,5 +77,8 @@ def parse_network_services(log_dir: Path, fs_root: Path | None = None) -> Dict:
     return {
         "services_detected": sorted(services_found),
         "evidence": evidence,
+        "filesystem_root": filesystem_root,
         "confidence": confidence,
+        "truncated_scans": truncated,
+        "scan_cache": scan_cache,
     }
@@ -1,32 +1,41 @@
 from pathlib import Path
-from typing import Dict, List
-import re
+from typing import Dict, List, Optional
 
+from emba_mcp.cache import cached_result
+from emba_mcp.catalog import get_log_catalog
+from emba_mcp.line_rules import LineRule, LineRules
+from emba_mcp.models import PasswordFileHit
+from emba_mcp.reader import collect, extract_files
 
-def _parse_password_lines(text: str) -> List[Dict]:
-    findings = []
 
-    for line in text.splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
+# s108/s50 line rules. Typical EMBA output lines:
+#   /etc/shadow
+#   Found password file: /etc/passwd
+PASSWORD_RULES = LineRules("s108", [
+    LineRule(
+        "password_file",
+        r"(?P<file>/[\w/\.-]*(?:passwd|shadow|credentials|password)[\w/\.-]*)",
+    ),
+])
 
-        # Typical EMBA output lines:
-        # /etc/shadow
-        # Found password file: /etc/passwd
-        match = re.search(r"(/[\w/\.-]*(passwd|shadow|credentials|password)[\w/\.-]*)", line, re.IGNORECASE)
-        if not match:
-            continue
 
-        findings.append({
-            "file": match.group(1),
-            "reason": "Potential password or credential file",
-            "source": line,
-        })
+def _parse_password_line(line: str) -> Optional[PasswordFileHit]:
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
 
-    return findings
+    m = PASSWORD_RULES.match(line)
+    if m is None:
+        return None
 
+    return PasswordFileHit(
+        file=m.fields["file"],
+        reason="Potential password or credential file",
+        source=m.line,
+    )
 
+
+@cached_result("password_files")
 def parse_password_files(log_dir: Path) -> Dict:
     """
     Parse password / credential file findings from EMBA output.
@@ -38,19 +47,13 @@ def parse_password_files(log_dir: Path) -> Dict:
         "sources": [],
     }
 
-    candidate_dirs = [
-        log_dir / "s108_stacs_password_search",
-        log_dir / "s50_authentication_check",
-    ]
-
-    for d in candidate_dirs:
-        if not d.exists():
-            continue
+    catalog = get_log_catalog(log_dir)
 
-        for f in d.glob("*.txt"):
-            text = f.read_text(errors="ignore")
-            results["sources"].append(str(f))
-            results["files"].extend(_parse_password_lines(text))
+    for d in ("s108_stacs_password_search", "s50_authentication_check"):
+        for f in catalog.in_dir(d, ".txt"):
+            results["sources"].append(f.rel)
+            (found,) = extract_files([f.path], collect(_parse_password_line))
+            results["files"].extend(found)
 
     count = len(results["files"])
 
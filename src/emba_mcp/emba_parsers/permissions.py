@@ -2,6 +2,9 @@ from pathlib import Path
 from typing import Dict, List
 import stat
 
+from emba_mcp.cache import cached_result
+from emba_mcp.filesystem import get_filesystem_index
+
 
 def _is_world_writable(mode: int) -> bool:
     return bool(mode & stat.S_IWOTH)
@@ -15,6 +18,7 @@ def _is_sgid(mode: int) -> bool:
     return bool(mode & stat.S_ISGID)
 
 
+@cached_result("permissions")
 def parse_permissions(log_dir: Path, fs_root: Path | None) -> Dict:
     """
     Inventory permission-related risks from extracted filesystem.
@@ -35,29 +39,23 @@ def parse_permissions(log_dir: Path, fs_root: Path | None) -> Dict:
 
     scanned = 0
 
-    for p in fs_root.rglob("*"):
-        try:
-            if not p.exists():
-                continue
-
-            st = p.stat()
-            mode = st.st_mode
-            scanned += 1
+    index = get_filesystem_index(fs_root)
 
-            if p.is_file():
-                if _is_suid(mode):
-                    suid_binaries.append(str(p))
-                if _is_sgid(mode):
-                    sgid_binaries.append(str(p))
-                if _is_world_writable(mode):
-                    world_writable_files.append(str(p))
+    for e in index.entries:
+        mode = e.mode
+        scanned += 1
 
-            elif p.is_dir():
-                if _is_world_writable(mode):
-                    world_writable_dirs.append(str(p))
+        if e.kind == "file":
+            if _is_suid(mode):
+                suid_binaries.append(e.path)
+            if _is_sgid(mode):
+                sgid_binaries.append(e.path)
+            if _is_world_writable(mode):
+                world_writable_files.append(e.path)
 
-        except Exception:
-            continue
+        elif e.kind == "dir":
+            if _is_world_writable(mode):
+                world_writable_dirs.append(e.path)
 
     # Confidence logic (transparent)
     confidence = "low"
@@ -68,6 +66,7 @@ def parse_permissions(log_dir: Path, fs_root: Path | None) -> Dict:
 
     return {
         "found": True,
+        "filesystem_root": index.root_str,
         "summary": {
             "scanned_paths": scanned,
             "suid_binaries": sorted(suid_binaries),
@@ -1,12 +1,64 @@
 from pathlib import Path
-import re
-from typing import List, Dict
+from typing import Dict, List, Optional
+
+from emba_mcp.cache import cached_result
+from emba_mcp.catalog import get_log_catalog
+from emba_mcp.line_rules import LineRule, LineRules
+from emba_mcp.models import PHPFinding
+from emba_mcp.reader import collect, extract_files
+
+
+# ----------------------------
+# s22 line rules, one per section
+# ----------------------------
+# attrs: finding type, severity, and which field keeps the raw line.
+# Listed by priority: a line matching several rules is classified by the
+# first (semgrep > progpilot > php_ini > phpinfo).
+
+S22_RULES = LineRules("s22", first_listed=True, rules=[
+    LineRule(
+        "semgrep",
+        r"Found possible PHP vulnerability\s+(?P<rule>.*?)\s+in\s+(?P<file>.*)",
+        {"type": "code_vulnerability", "severity": "high", "line_field": "evidence"},
+    ),
+    LineRule(
+        "progpilot",
+        r"Possible vulnerability detected.*?file:\s*(?P<file>.*)",
+        {"type": "code_vulnerability", "severity": "high", "line_field": "evidence"},
+    ),
+    LineRule(
+        "php_ini",
+        r"(?:register_globals|allow_url_include|display_errors)\s*=\s*On",
+        {"type": "configuration_issue", "severity": "medium", "line_field": "setting"},
+    ),
+    LineRule(
+        "phpinfo",
+        r"phpinfo\(\)",
+        {"type": "information_disclosure", "severity": "medium", "line_field": "evidence"},
+    ),
+])
+
+
+def _parse_php_line(line: str) -> Optional[PHPFinding]:
+    m = S22_RULES.match(line)
+    if m is None:
+        return None
+
+    attrs = m.rule.attrs
+    return PHPFinding(
+        type=attrs["type"],
+        engine=m.rule.name,
+        severity=attrs["severity"],
+        **m.fields,
+        **{attrs["line_field"]: m.line.strip()},
+    )
 
 
+@cached_result("php_vulnerabilities")
 def parse_php_vulnerabilities(log_dir: Path) -> Dict:
-    php_dir = log_dir / "s22_php_check"
+    catalog = get_log_catalog(log_dir)
 
-    if not php_dir.exists():
+    if not catalog.exists("s22_php_check"):
         return {
             "count": 0,
             "findings": [],
@@ -14,103 +66,37 @@ def parse_php_vulnerabilities(log_dir: Path) -> Dict:
             "error": "s22_php_check not found",
         }
 
-    findings: List[Dict] = []
+    findings: List[PHPFinding] = []
     sources: List[str] = []
 
     # ----------------------------
-    # Regex patterns per section
+    # Stream all text / log files
     # ----------------------------
 
-    SEMGREP_RE = re.compile(
-        r"Found possible PHP vulnerability\s+(.*?)\s+in\s+(.*)",
-        re.IGNORECASE,
-    )
-
-    PROGPILOT_RE = re.compile(
-        r"Possible vulnerability detected.*?file:\s*(.*)",
-        re.IGNORECASE,
-    )
-
-    PHPINI_BAD_RE = re.compile(
-        r"(register_globals|allow_url_include|display_errors)\s*=\s*On",
-        re.IGNORECASE,
-    )
-
-    PHPINFO_RE = re.compile(
-        r"phpinfo\(\)",
-        re.IGNORECASE,
-    )
-
-    # ----------------------------
-    # Scan all text / log files
-    # ----------------------------
-
-    for f in php_dir.rglob("*"):
-        if not f.is_file():
-            continue
-
-        text = f.read_text(errors="ignore")
-        sources.append(str(f))
-
-        for line in text.splitlines():
-
-            # ---- Semgrep ----
-            m = SEMGREP_RE.search(line)
-            if m:
-                findings.append({
-                    "type": "code_vulnerability",
-                    "engine": "semgrep",
-                    "rule": m.group(1),
-                    "file": m.group(2),
-                    "evidence": line.strip(),
-                    "severity": "high",
-                })
-                continue
-
-            # ---- Progpilot ----
-            m = PROGPILOT_RE.search(line)
-            if m:
-                findings.append({
-                    "type": "code_vulnerability",
-                    "engine": "progpilot",
-                    "file": m.group(1),
-                    "evidence": line.strip(),
-                    "severity": "high",
-                })
-                continue
-
-            # ---- php.ini misconfig ----
-            if PHPINI_BAD_RE.search(line):
-                findings.append({
-                    "type": "configuration_issue",
-                    "engine": "php_ini",
-                    "setting": line.strip(),
-                    "severity": "medium",
-                })
-                continue
-
-            # ---- phpinfo exposure ----
-            if PHPINFO_RE.search(line):
-                findings.append({
-                    "type": "information_disclosure",
-                    "engine": "phpinfo",
-                    "evidence": line.strip(),
-                    "severity": "medium",
-                })
+    for f in catalog.in_dir("s22_php_check", recursive=True):
+        sources.append(f.rel)
+        (found,) = extract_files([f.path], collect(_parse_php_line))
+        findings.extend(found)
 
     # ----------------------------
     # Confidence scoring
     # ----------------------------
 
     confidence = "low"
-    if any(f["severity"] == "high" for f in findings):
+    if any(f.severity == "high" for f in findings):
         confidence = "high"
     elif findings:
         confidence = "medium"
 
-    return {
+    result = {
         "count": len(findings),
         "findings": findings,
         "confidence": confidence,
         "sources": sorted(set(sources)),
     }
+
+    # Read beyond the catalog depth (see emba_mcp.catalog.MAX_DEPTH)
+    deep = catalog.uncataloged("s22_php_check")
+    if deep:
+        result["uncataloged_dirs"] = deep
+    return result
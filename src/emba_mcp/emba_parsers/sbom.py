@@ -1,41 +1,36 @@
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 import json
 import re
 
-
-def _read_text(path: Path) -> str:
-    try:
-        return path.read_text(errors="ignore")
-    except Exception:
-        return ""
+from emba_mcp.cache import cached_result
+from emba_mcp.catalog import get_log_catalog
+from emba_mcp.models import SBOMPackage
+from emba_mcp.reader import collect, extract_files
 
 
-def _parse_package_lines(text: str) -> List[Dict]:
+def _parse_package_line(line: str) -> Optional[SBOMPackage]:
     """
     Parse loose package listings like:
       busybox 1.27.2
       openssl-1.0.2k
     """
-    packages = []
-
-    for line in text.splitlines():
-        line = line.strip()
-        if not line or len(line) > 120:
-            continue
+    line = line.strip()
+    if not line or len(line) > 120:
+        return None
 
-        match = re.match(r"([a-zA-Z0-9_.+-]+)[\s:-]+([0-9][^\s]*)", line)
-        if match:
-            packages.append({
-                "name": match.group(1),
-                "version": match.group(2),
-                "source": "text"
-            })
+    match = re.match(r"([a-zA-Z0-9_.+-]+)[\s:-]+([0-9][^\s]*)", line)
+    if not match:
+        return None
 
-    return packages
+    return SBOMPackage(
+        name=match.group(1),
+        version=match.group(2),
+        source="text",
+    )
 
 
-def _parse_json_sbom(path: Path) -> List[Dict]:
+def _parse_json_sbom(path: Path) -> List[SBOMPackage]:
     packages = []
 
     try:
@@ -68,48 +63,48 @@ def _parse_json_sbom(path: Path) -> List[Dict]:
         )
 
         if name:
-            packages.append({
-                "name": name,
-                "version": version,
-                "source": "json",
-            })
+            packages.append(SBOMPackage(
+                name=name,
+                version=version,
+                source="json",
+            ))
 
     return packages
 
 
 
+@cached_result("sbom")
 def parse_sbom(log_dir: Path) -> Dict:
     """
     Extract SBOM / component information from EMBA output.
     """
     sbom_dirs = [
-        log_dir / "SBOM",
-        log_dir / "s08_main_package_sbom",
-        log_dir / "s09_firmware_base_sbom",
-        log_dir / "json_logs",
+        "SBOM",
+        "s08_main_package_sbom",
+        "s09_firmware_base_sbom",
+        "json_logs",
     ]
 
-    packages: List[Dict] = []
+    packages: List[SBOMPackage] = []
     sources: List[str] = []
 
-    for d in sbom_dirs:
-        if not d.exists() or not d.is_dir():
-            continue
+    catalog = get_log_catalog(log_dir)
 
-        for f in d.iterdir():
-            sources.append(str(f))
+    for d in sbom_dirs:
+        for f in catalog.in_dir(d):
+            sources.append(f.rel)
 
             if f.suffix == ".json":
-                packages.extend(_parse_json_sbom(f))
+                packages.extend(_parse_json_sbom(f.path))
             elif f.suffix in {".txt", ".log"}:
-                text = _read_text(f)
-                packages.extend(_parse_package_lines(text))
+                (found,) = extract_files([f.path], collect(_parse_package_line))
+                packages.extend(found)
 
     # De-duplicate
     seen = set()
     unique_packages = []
     for p in packages:
-        key = (p.get("name"), p.get("version"))
+        key = (p.name, p.version)
         if key not in seen:
             seen.add(key)
             unique_packages.append(p)
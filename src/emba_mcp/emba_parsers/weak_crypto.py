@@ -1,6 +1,15 @@
 from pathlib import Path
 from typing import Dict, List
-import re
+
+from emba_mcp.cache import cached_result
+from emba_mcp.content_scan import (
+    SECRET_KEYWORDS,
+    WEAK_ALGORITHMS,
+    match_names,
+    is_crypto_candidate,
+    scan_rootfs,
+)
+from emba_mcp.filesystem import get_filesystem_index
 
 
 CRYPTO_FILES = {
@@ -8,40 +17,11 @@ CRYPTO_FILES = {
     "certificates": (".crt", ".cer", ".pem", ".der", ".p12"),
 }
 
-WEAK_ALGO_KEYWORDS = {
-    "md5": r"\bmd5\b",
-    "sha1": r"\bsha1\b",
-    "des": r"\bdes\b",
-    "rc4": r"\brc4\b",
-    "ecb": r"\becb\b",
-}
-
-SECRET_KEYWORDS = (
-    "private key",
-    "secret",
-    "password",
-    "passwd",
-    "api_key",
-    "apikey",
-    "token",
-)
-
-
-def _safe_read(path: Path) -> str:
-    try:
-        return path.read_text(errors="ignore")
-    except Exception:
-        return ""
-
-
-def _scan_for_weak_algos(text: str) -> List[str]:
-    found = []
-    for name, pattern in WEAK_ALGO_KEYWORDS.items():
-        if re.search(pattern, text, re.IGNORECASE):
-            found.append(name)
-    return found
+# Weak algorithms and secret keywords live in emba_mcp.content_scan,
+# compiled into the shared signature scanner.
 
 
+@cached_result("weak_crypto")
 def parse_weak_crypto(log_dir: Path, fs_root: Path | None) -> Dict:
     """
     Inventory weak crypto indicators and embedded keys/certs.
@@ -64,33 +44,36 @@ def parse_weak_crypto(log_dir: Path, fs_root: Path | None) -> Dict:
 
     sources: List[str] = []
 
-    for p in fs_root.rglob("*"):
-        try:
-            if not p.is_file():
-                continue
+    index = get_filesystem_index(fs_root)
+    scans = scan_rootfs(index)
+    scanned: List[str] = []
 
-            lower_name = p.name.lower()
+    for e in index.files():
+        try:
+            lower_name = e.name.lower()
 
             # ---- Keys / certs ----
             for category, exts in CRYPTO_FILES.items():
                 if any(lower_name.endswith(ext) for ext in exts):
-                    findings[category].append(str(p))
-                    sources.append(str(p))
+                    findings[category].append(e.path)
+                    sources.append(e.path)
 
             # ---- Config / script scanning ----
-            if p.suffix in {".conf", ".cfg", ".ini", ".sh", ".cgi", ".php", ".lua"}:
-                text = _safe_read(p)
+            if is_crypto_candidate(e):
+                scanned.append(e.path)
+                matches = scans.matches_for(e.path)
 
                 # Weak algorithms
-                algos = _scan_for_weak_algos(text)
+                found = set(match_names(matches, "weak_algorithm"))
+                algos = [a for a in WEAK_ALGORITHMS if a in found]
                 if algos:
-                    findings["weak_algorithms"][str(p)] = algos
-                    sources.append(str(p))
+                    findings["weak_algorithms"][e.path] = algos
+                    sources.append(e.path)
 
                 # Hardcoded secrets (keyword-based, not values)
-                if any(k in text.lower() for k in SECRET_KEYWORDS):
-                    findings["hardcoded_secrets"].append(str(p))
-                    sources.append(str(p))
+                if match_names(matches, "secret"):
+                    findings["hardcoded_secrets"].append(e.path)
+                    sources.append(e.path)
 
         except Exception:
             continue
@@ -107,7 +90,10 @@ def parse_weak_crypto(log_dir: Path, fs_root: Path | None) -> Dict:
 
     return {
         "found": True,
+        "filesystem_root": index.root_str,
         "summary": findings,
         "confidence": confidence,
         "sources": sorted(set(sources)),
+        "truncated_scans": scans.truncated(scanned),
+        "scan_cache": scans.cache_report(),
     }
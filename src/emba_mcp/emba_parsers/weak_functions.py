@@ -1,34 +1,62 @@
+from functools import partial
 from pathlib import Path
+from typing import Dict, List, Optional
 import re
-from typing import Dict, List
 
+from emba_mcp.cache import cached_result
+from emba_mcp.catalog import get_log_catalog
+from emba_mcp.line_rules import LineRule, LineRules
+from emba_mcp.models import WeakFunctionFinding
+from emba_mcp.reader import collect, extract_files
 
-def _parse_weak_function_lines(text: str, mode: str) -> List[Dict]:
-    findings = []
 
-    for line in text.splitlines():
-        # Example patterns EMBA usually emits
-        # strcpy in /bin/httpd
-        match = re.search(
-            r"(strcpy|sprintf|gets|scanf|strcat|vsprintf|memcpy|system).*?(/[\w/\.-]+)",
-            line,
-            re.IGNORECASE,
-        )
+# s13/s14 line rules. Example line EMBA usually emits:
+#   strcpy in /bin/httpd
+# The rule only finds the function; the binary is the first path after
+# it, searched on the whole line (a plain character class: linear, and
+# not limited by the rule line cap).
+# As in the original unanchored search, names inside symbol identifiers
+# count (__strcpy_chk, imp_strcpy, _system); unlike it, names inside
+# plain words do not ("filesystem", "targets").
+WEAK_FUNCTION_RULE = LineRule(
+    "weak_function",
+    r"(?<![a-z0-9])(?:\w*_)?"
+    r"(?P<function>strcpy|sprintf|gets|scanf|strcat|vsprintf|memcpy|system)"
+    r"(?:_\w*)?\b",
+)
 
-        if not match:
-            continue
+RULES_BY_MODE = {
+    "intense": LineRules("s13", [WEAK_FUNCTION_RULE]),
+    "radare": LineRules("s14", [WEAK_FUNCTION_RULE]),
+}
 
-        findings.append({
-            "function": match.group(1),
-            "binary": match.group(2),
-            "mode": mode,
-            "confidence": "raw",   # keep EMBA confidence unmodified
-            "source": line.strip(),
-        })
+BINARY_PATH_RE = re.compile(r"/[\w/.-]+")
 
-    return findings
 
+def _parse_weak_function_line(line: str, mode: str) -> Optional[WeakFunctionFinding]:
+    m = RULES_BY_MODE[mode].match(line)
+    if m is None:
+        return None
 
+    binary = BINARY_PATH_RE.search(line, m.end)
+    if binary is None:
+        return None
+
+    return WeakFunctionFinding(
+        function=m.fields["function"],
+        binary=binary.group(0),
+        mode=mode,
+        source=m.line.strip(),
+        truncated=True if m.truncated else None,
+    )
+
+
+def _stream_weak_functions(path: Path, mode: str) -> List[WeakFunctionFinding]:
+    (found,) = extract_files([path], collect(partial(_parse_weak_function_line, mode=mode)))
+    return found
+
+
+@cached_result("weak_functions")
 def parse_weak_functions(log_dir: Path) -> Dict:
     """
     Parse weak function findings from EMBA output.
@@ -44,26 +72,17 @@ def parse_weak_functions(log_dir: Path) -> Dict:
         "sources": [],
     }
 
-    intense_dir = log_dir / "s13_weak_func_check"
-    radare_dir = log_dir / "s14_weak_func_radare_check"
+    catalog = get_log_catalog(log_dir)
 
     # ---- Intense mode ----
-    if intense_dir.exists():
-        for f in intense_dir.glob("*.txt"):
-            text = f.read_text(errors="ignore")
-            results["sources"].append(str(f))
-            results["intense"].extend(
-                _parse_weak_function_lines(text, mode="intense")
-            )
+    for f in catalog.in_dir("s13_weak_func_check", ".txt"):
+        results["sources"].append(f.rel)
+        results["intense"].extend(_stream_weak_functions(f.path, "intense"))
 
     # ---- Radare mode ----
-    if radare_dir.exists():
-        for f in radare_dir.glob("*.txt"):
-            text = f.read_text(errors="ignore")
-            results["sources"].append(str(f))
-            results["radare"].extend(
-                _parse_weak_function_lines(text, mode="radare")
-            )
+    for f in catalog.in_dir("s14_weak_func_radare_check", ".txt"):
+        results["sources"].append(f.rel)
+        results["radare"].extend(_stream_weak_functions(f.path, "radare"))
 
     total = len(results["intense"]) + len(results["radare"])
 
@@ -2,6 +2,11 @@
 from pathlib import Path
 import os
 
+# Shared on-disk state (scan registry, parse-result store)
+STATE_DIR = Path(
+    os.getenv("EMBA_MCP_STATE_DIR", Path(__file__).resolve().parent.parent / "state")
+)
+
 def get_emba_binary() -> Path:
     emba_home = os.getenv("EMBA_HOME")
     if not emba_home:
@@ -0,0 +1,199 @@
+from collections import OrderedDict, deque
+from itertools import islice
+from pathlib import Path
+from typing import IO, Deque, Dict, List, Optional
+import os
+import threading
+
+from .config import STATE_DIR
+
+# --------------------------------------------------
+# Scan output capture
+# --------------------------------------------------
+# EMBA's stdout/stderr are pumped line by line by reader threads into one
+# log file per scan (stderr lines prefixed), and into a ring buffer of the
+# last OUTPUT_BUFFER_LINES lines that tail requests are served from.
+# Offsets are absolute line numbers in the log file, so a client can read
+# incrementally by passing back next_offset.
+
+OUTPUT_DIR = STATE_DIR / "scan_output"
+
+OUTPUT_BUFFER_LINES = int(os.getenv("EMBA_MCP_OUTPUT_BUFFER_LINES", "2000"))
+
+# Buffers kept for scans that are no longer running
+MAX_IDLE_BUFFERS = int(os.getenv("EMBA_MCP_OUTPUT_BUFFERS", "16"))
+
+# Longer lines are split (pipes are read in chunks of at most this size)
+MAX_LINE_BYTES = 64 * 1024
+
+STDERR_PREFIX = "[stderr] "
+
+
+def output_log_path(scan_id: str) -> Path:
+    return OUTPUT_DIR / f"{scan_id}.log"
+
+
+class ScanOutput:
+    """
+    Log file writer plus bounded in-memory tail for one scan.
+    """
+
+    def __init__(self, path: Path, max_lines: int = OUTPUT_BUFFER_LINES):
+        self.path = path
+        self._ring: Deque[str] = deque(maxlen=max_lines)
+        self._count = 0                 # lines so far = offset of the next line
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+        self._synced: Optional[int] = None  # bytes of the log read (snapshots only)
+
+    @property
+    def live(self) -> bool:
+        return self._file is not None
+
+    @classmethod
+    def from_file(cls, path: Path) -> "ScanOutput":
+        """
+        Snapshot of a log file written by another (or an earlier) server
+        process; sync() catches it up.
+        """
+        output = cls(path)
+        output._synced = 0
+        output.sync()
+        return output
+
+    def sync(self):
+        """
+        Read the complete lines appended to the log file since the last
+        sync. A file that shrank is re-read. No-op for buffers this
+        process writes itself.
+        """
+        with self._lock:
+            if self._synced is None:
+                return
+            try:
+                f = open(self.path, "rb")
+            except OSError:
+                return
+
+            with f:
+                size = os.fstat(f.fileno()).st_size
+                if size < self._synced:
+                    self._ring.clear()
+                    self._count = self._synced = 0
+                if size == self._synced:
+                    return
+
+                f.seek(self._synced)
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break       # still being written
+                    self._ring.append(raw.decode(errors="replace").rstrip("\n"))
+                    self._count += 1
+                    self._synced += len(raw)
+
+    def open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8", buffering=1)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def write(self, text: str, stream: str = "stdout"):
+        line = text if stream == "stdout" else STDERR_PREFIX + text
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+            self._ring.append(line)
+            self._count += 1
+
+    def pump(self, pipe: IO[bytes], stream: str):
+        """
+        Reader thread body: copy a process pipe until EOF.
+        """
+        with pipe:
+            for raw in iter(lambda: pipe.readline(MAX_LINE_BYTES), b""):
+                self.write(raw.decode(errors="replace").rstrip("\r\n"), stream)
+
+    def tail(self, offset: Optional[int] = None, limit: int = 200) -> Dict:
+        """
+        Up to `limit` lines from `offset`; without an offset, the last
+        `limit` lines. Lines already dropped from the buffer are counted
+        in "missed" (they remain in the log file).
+        """
+        with self._lock:
+            first = self._count - len(self._ring)
+            if offset is None or offset < 0:
+                start = max(first, self._count - limit)
+            else:
+                start = min(max(offset, first), self._count)
+            lines = list(islice(self._ring, start - first, start - first + limit))
+            total = self._count
+
+        return {
+            "offset": start,
+            "next_offset": start + len(lines),
+            "total_lines": total,
+            "missed": max(0, start - offset) if offset is not None and offset >= 0 else 0,
+            "lines": lines,
+            "log_file": str(self.path),
+        }
+
+    def last_stderr(self, n: int) -> List[str]:
+        with self._lock:
+            found = [l[len(STDERR_PREFIX):] for l in self._ring if l.startswith(STDERR_PREFIX)]
+        return found[-n:]
+
+
+# --------------------------------------------------
+# Per-scan buffers
+# --------------------------------------------------
+
+_OUTPUTS: "OrderedDict[str, ScanOutput]" = OrderedDict()
+_OUTPUTS_LOCK = threading.Lock()
+
+
+def _evict_idle():
+    idle = [k for k, v in _OUTPUTS.items() if not v.live]
+    for scan_id in idle[:max(0, len(idle) - MAX_IDLE_BUFFERS)]:
+        del _OUTPUTS[scan_id]
+
+
+def open_output(scan_id: str) -> ScanOutput:
+    """
+    Start capturing a scan's output (truncates an earlier log).
+    """
+    output = ScanOutput(output_log_path(scan_id))
+    output.open()
+    with _OUTPUTS_LOCK:
+        _OUTPUTS[scan_id] = output
+        _evict_idle()
+    return output
+
+
+def get_output(scan_id: str) -> Optional[ScanOutput]:
+    """
+    The scan's output buffer. Scans run by another server process (or an
+    earlier one) are served from a snapshot of their log file, synced
+    with the file on every call.
+    """
+    with _OUTPUTS_LOCK:
+        output = _OUTPUTS.get(scan_id)
+        if output is not None:
+            _OUTPUTS.move_to_end(scan_id)
+
+    if output is not None:
+        output.sync()
+        return output
+
+    path = output_log_path(scan_id)
+    if not path.exists():
+        return None
+
+    output = ScanOutput.from_file(path)
+    with _OUTPUTS_LOCK:
+        output = _OUTPUTS.setdefault(scan_id, output)
+        _evict_idle()
+    return output
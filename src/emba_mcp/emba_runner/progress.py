@@ -0,0 +1,256 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+
+from emba_mcp.line_rules import LineRule, LineRules
+from emba_mcp.reader import LINE_LIMIT
+
+from .config import STATE_DIR
+from .output import output_log_path
+
+# --------------------------------------------------
+# Live scan progress
+# --------------------------------------------------
+# While EMBA runs, the runner polls the log directory every
+# PROGRESS_INTERVAL seconds: a module has started once its output
+# (sNN_name.txt / sNN_name/) appears or the main log announces it, and
+# has finished once the main log says so. Only new bytes of the main log
+# are read on each poll. Durations of successful scans are averaged into
+# module_timings.json, which weights percent complete and drives the ETA.
+
+PROGRESS_INTERVAL = float(os.getenv("EMBA_MCP_PROGRESS_INTERVAL", "10"))
+
+# Module duration assumed until a module has a timing history
+DEFAULT_MODULE_SECONDS = float(os.getenv("EMBA_MCP_MODULE_ESTIMATE_SECONDS", "120"))
+
+TIMINGS_FILE = STATE_DIR / "module_timings.json"
+TIMINGS_LOCK_FILE = STATE_DIR / "module_timings.lock"
+
+# EMBA's main log, mirrored from its console output
+MAIN_LOG = "emba.log"
+
+# Pre-checking, firmware-testing and final-aggregation modules
+_MODULE_RE = re.compile(r"^([psf]\d+_\w+?)(?:\.\w+)?$", re.IGNORECASE)
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+_BLACKLIST_RE = re.compile(r"MODULE_BLACKLIST\+?=\(([^)]*)\)")
+
+# EMBA's own module markers, e.g.
+#   [*] Tue Oct 15 10:02:11 UTC 2024 - s06_distribution_identification starting
+#   [*] Tue Oct 15 10:04:37 UTC 2024 - s06_distribution_identification finished
+# Anchored at the line start and on the exact wording, so module output
+# that merely quotes another module's name is never taken for a marker.
+PROGRESS_RULES = LineRules("progress", [
+    LineRule("started", r"^\[\*\]\s.*?\s-\s(?P<module>[psf]\d+_\w+)\s+starting$"),
+    LineRule("finished", r"^\[\*\]\s.*?\s-\s(?P<module>[psf]\d+_\w+)\s+finished(?:\s+\([^()]*\))?$"),
+])
+
+
+def expected_modules(emba_home: Path, profile: Path) -> List[str]:
+    """
+    p/s/f modules shipped with EMBA, minus the profile's MODULE_BLACKLIST.
+    Empty if the module directory cannot be read.
+    """
+    try:
+        names = [
+            m.group(1).lower()
+            for m in map(_MODULE_RE.match, os.listdir(emba_home / "modules"))
+            if m
+        ]
+    except OSError:
+        return []
+
+    try:
+        blacklist = {
+            name.lower()
+            for entries in _BLACKLIST_RE.findall(profile.read_text(errors="replace"))
+            for name in re.findall(r"[\w.-]+", entries)
+        }
+    except OSError:
+        blacklist = set()
+
+    return sorted(n for n in set(names) if n not in blacklist)
+
+
+# --------------------------------------------------
+# Module timing history
+# --------------------------------------------------
+
+_TIMINGS_LOCK = threading.Lock()
+
+
+def load_timings() -> Dict[str, Tuple[float, int]]:
+    """
+    module -> (mean seconds, number of runs).
+    """
+    try:
+        data = json.loads(TIMINGS_FILE.read_text())
+        return {k: (float(v[0]), int(v[1])) for k, v in data.items()}
+    except Exception:
+        return {}
+
+
+def record_timings(durations: Dict[str, float]):
+    """
+    Fold one successful scan's module durations into the history.
+    Server processes share the file: the update runs under an flock and
+    the file is replaced atomically, so readers never see partial JSON.
+    """
+    with _TIMINGS_LOCK, open(TIMINGS_LOCK_FILE, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        timings = load_timings()
+        for module, seconds in durations.items():
+            mean, runs = timings.get(module, (0.0, 0))
+            timings[module] = ((mean * runs + seconds) / (runs + 1), runs + 1)
+
+        tmp = TIMINGS_FILE.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(
+            {k: [round(mean, 2), runs] for k, (mean, runs) in sorted(timings.items())},
+            indent=2,
+        ))
+        os.replace(tmp, TIMINGS_FILE)
+
+
+# --------------------------------------------------
+# Tracker
+# --------------------------------------------------
+
+class ProgressTracker:
+    """
+    Module start/finish times of one running scan.
+    """
+
+    def __init__(self, scan_id: str, log_dir: Path, expected: List[str]):
+        self.log_dir = log_dir
+        self.logs = [log_dir / MAIN_LOG, output_log_path(scan_id)]
+        self.timings = load_timings()
+
+        # Without a module list, expect what earlier scans ran
+        self.expected = set(expected or self.timings)
+
+        self.started: Dict[str, float] = {}
+        self.finished: Dict[str, float] = {}
+        self._offsets: Dict[Path, int] = {}
+
+    def _estimate(self, module: str) -> float:
+        if module in self.timings:
+            return self.timings[module][0]
+        if self.timings:
+            return sum(mean for mean, _ in self.timings.values()) / len(self.timings)
+        return DEFAULT_MODULE_SECONDS
+
+    def _start(self, module: str, now: float):
+        self.started.setdefault(module, now)
+
+    def _finish(self, module: str, now: float):
+        self._start(module, now)
+        self.finished.setdefault(module, now)
+
+    def _scan_outputs(self, now: float):
+        try:
+            names = os.listdir(self.log_dir)
+        except OSError:
+            return
+        for name in names:
+            m = _MODULE_RE.match(name)
+            if m:
+                self._start(m.group(1).lower(), now)
+
+    def _read_logs(self, now: float):
+        """
+        New complete lines of the main logs since the last poll.
+        """
+        for path in self.logs:
+            try:
+                f = open(path, "rb")
+            except OSError:
+                continue
+
+            with f:
+                f.seek(self._offsets.get(path, 0))
+                while True:
+                    raw = f.readline(LINE_LIMIT)
+                    if not raw:
+                        break
+                    if not raw.endswith(b"\n") and len(raw) < LINE_LIMIT:
+                        break       # still being written: re-read next poll
+                    self._offsets[path] = f.tell()
+
+                    line = _ANSI_RE.sub("", raw.decode(errors="replace")).strip()
+                    match = PROGRESS_RULES.match(line)
+                    if match is None:
+                        continue
+                    module = match.fields["module"].lower()
+                    if match.rule.name == "finished":
+                        self._finish(module, now)
+                    else:
+                        self._start(module, now)
+
+    def durations(self) -> Dict[str, float]:
+        return {
+            m: round(self.finished[m] - self.started[m], 1)
+            for m in sorted(self.finished)
+        }
+
+    def snapshot(self, now: float) -> Dict:
+        expected = self.expected | set(self.started)
+        running = sorted(
+            (m for m in self.started if m not in self.finished),
+            key=lambda m: self.started[m],
+        )
+
+        percent = eta = None
+        if expected:
+            total = sum(self._estimate(m) for m in expected)
+            done = sum(self._estimate(m) for m in self.finished)
+            remaining = sum(
+                self._estimate(m) for m in expected if m not in self.started
+            ) + sum(
+                max(0.0, self._estimate(m) - (now - self.started[m])) for m in running
+            )
+            percent = round(100.0 * done / total, 1) if total else None
+            eta = round(now + remaining, 1)
+
+        return {
+            "percent": percent,
+            "modules_total": len(expected) or None,
+            "modules_finished": len(self.finished),
+            "current_module": running[-1] if running else None,
+            "running_modules": running,
+            "module_seconds": self.durations(),
+            "estimated_finish_at": eta,
+            "updated_at": round(now, 1),
+        }
+
+    def poll(self) -> Dict:
+        now = time.time()
+        self._scan_outputs(now)
+        self._read_logs(now)
+        return self.snapshot(now)
+
+    def complete(self, success: bool) -> Dict:
+        """
+        Final snapshot. A successful scan closes its open modules and
+        adds its durations to the timing history.
+        """
+        now = time.time()
+        self._scan_outputs(now)
+        self._read_logs(now)
+
+        if not success:
+            return self.snapshot(now)
+
+        for module in list(self.started):
+            self._finish(module, now)
+        record_timings(self.durations())
+
+        progress = self.snapshot(now)
+        progress.update(percent=100.0, estimated_finish_at=None)
+        return progress
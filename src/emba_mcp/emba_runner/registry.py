@@ -1,5 +1,7 @@
-from typing import Dict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
+import fcntl
 import time
 import uuid
 import threading
@@ -7,14 +9,20 @@ import os
 import signal
 import json
 
+from .config import STATE_DIR
+
 # --------------------------------------------------
 # Registry persistence config
 # --------------------------------------------------
+# Every stdio MCP client runs its own server process, all sharing one
+# registry file. Each access takes an flock on REGISTRY_LOCK_FILE and
+# re-reads the file if another process changed it, so read-modify-write
+# cycles never lose another process's update.
 
-STATE_DIR = Path(__file__).resolve().parent.parent / "state"
 STATE_DIR.mkdir(parents=True, exist_ok=True)
 
 REGISTRY_FILE = STATE_DIR / "scan_registry.json"
+REGISTRY_LOCK_FILE = STATE_DIR / "scan_registry.lock"
 
 # --------------------------------------------------
 # In-memory registry
@@ -23,43 +31,128 @@ REGISTRY_FILE = STATE_DIR / "scan_registry.json"
 _SCAN_REGISTRY: Dict[str, dict] = {}
 _REGISTRY_LOCK = threading.Lock()
 
+# (inode, mtime, size) of the registry file as last read or written
+_LOADED_STAT: Optional[Tuple[int, int, int]] = None
+
+# Runtime-only: EMBA processes started by this server process
+_PROCESSES: Dict[str, Any] = {}
+
+# Signalled on every scan state or progress change (see wait_for_scan)
+_REGISTRY_CHANGED = threading.Condition(_REGISTRY_LOCK)
+
+ACTIVE_STATUSES = ("running", "stopping")
+TERMINAL_STATUSES = ("finished", "failed", "cancelled")
+
+# Upper bound for one wait_for_scan call (seconds)
+MAX_WAIT_SECONDS = float(os.getenv("EMBA_MCP_MAX_WAIT_SECONDS", "300"))
+
+# How often a waiter re-reads the file for other processes' changes
+WAIT_POLL_SECONDS = float(os.getenv("EMBA_MCP_WAIT_POLL_SECONDS", "2"))
+
 # --------------------------------------------------
 # Persistence helpers
 # --------------------------------------------------
 
-def _load_registry():
+def _file_stat() -> Optional[Tuple[int, int, int]]:
+    try:
+        st = REGISTRY_FILE.stat()
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _refresh():
     """
-    Load registry state from disk on MCP startup.
-    Never crash MCP if state is corrupted.
+    Re-load registry state if the file changed since we last saw it
+    (callers hold both locks). Never crash MCP if state is corrupted.
     """
-    if not REGISTRY_FILE.exists():
+    global _LOADED_STAT
+
+    stat = _file_stat()
+    if stat is None or stat == _LOADED_STAT:
         return
 
     try:
         data = json.loads(REGISTRY_FILE.read_text())
-        if isinstance(data, dict):
-            _SCAN_REGISTRY.update(data)
     except Exception:
-        pass  # fail safe
+        return  # fail safe
+
+    if isinstance(data, dict):
+        _SCAN_REGISTRY.clear()
+        _SCAN_REGISTRY.update(data)
+        _LOADED_STAT = stat
+        _REGISTRY_CHANGED.notify_all()
 
 
 def _save_registry():
     """
-    Persist registry to disk.
-    Runtime-only fields are stripped.
+    Persist registry to disk (atomically) and wake waiters. Callers
+    hold both locks.
+    """
+    global _LOADED_STAT
+
+    tmp = REGISTRY_FILE.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(_SCAN_REGISTRY, indent=2))
+    os.replace(tmp, REGISTRY_FILE)
+
+    _LOADED_STAT = _file_stat()
+    _REGISTRY_CHANGED.notify_all()
+
+
+@contextmanager
+def _file_lock(shared: bool = False) -> Iterator[None]:
+    with open(REGISTRY_LOCK_FILE, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield       # closing the file releases the lock
+
+
+@contextmanager
+def _registry(shared: bool = False) -> Iterator[None]:
+    """
+    Up-to-date registry under the thread lock and the file lock.
     """
-    serializable = {}
+    with _REGISTRY_LOCK, _file_lock(shared):
+        _refresh()
+        yield
+
+
+# --------------------------------------------------
+# Scan ownership
+# --------------------------------------------------
+# A running scan records the server process that runs it. PIDs are
+# reused (in containers every server may be PID 1), so the process
+# start time from /proc is part of the identity.
+
+def _process_token(pid: int) -> Optional[str]:
+    """
+    Identity of a live process, None if it does not exist.
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            started = f.read().rpartition(")")[2].split()[19]
+        return f"{pid}:{started}"
+    except (OSError, IndexError):
+        pass
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return None
+    except OSError:
+        pass
+    return str(pid)
 
-    for scan_id, scan in _SCAN_REGISTRY.items():
-        clean = dict(scan)
-        clean.pop("process", None)  # not serializable
-        serializable[scan_id] = clean
 
-    REGISTRY_FILE.write_text(json.dumps(serializable, indent=2))
+_OWNER = {"pid": os.getpid(), "token": _process_token(os.getpid())}
 
 
-# Load persisted state at import time
-_load_registry()
+def _orphaned(scan: dict) -> bool:
+    owner = scan.get("owner") or {}
+    if owner.get("token") == _OWNER["token"]:
+        return False
+    pid = owner.get("pid")
+    return pid is None or _process_token(pid) != owner.get("token")
+
 
 # --------------------------------------------------
 # Public API
@@ -69,32 +162,44 @@ def attach_process(scan_id: str, process):
     """
     Attach a running subprocess to a scan entry.
     """
-    with _REGISTRY_LOCK:
+    with _registry():
         scan = _SCAN_REGISTRY.get(scan_id)
         if not scan:
             return
 
+        _PROCESSES[scan_id] = process
         scan["pid"] = process.pid
-        scan["process"] = process
         _save_registry()
 
 
-def create_scan(firmware: Path, log_dir: Path) -> str:
+def create_scan(
+    firmware: Path,
+    log_dir: Path,
+    priority: int = 0,
+    force_overwrite: bool = False,
+) -> str:
     """
-    Create and register a new scan.
+    Create and register a new scan. It starts out queued; the scheduler
+    moves it to running (claim_next).
     """
     scan_id = f"emba-{uuid.uuid4().hex[:10]}"
 
-    with _REGISTRY_LOCK:
+    with _registry():
         _SCAN_REGISTRY[scan_id] = {
             "scan_id": scan_id,
             "firmware": str(firmware),
             "log_dir": str(log_dir),
-            "status": "running",      # running | stopping | finished | failed
-            "started_at": time.time(),
+            "status": "queued",       # queued | running | stopping | finished | failed | cancelled
+            "priority": priority,
+            "force_overwrite": force_overwrite,
+            "queued_at": time.time(),
+            "started_at": None,
             "finished_at": None,
+            "waiting_for": None,      # why a queued scan is not admitted yet
+            "progress": None,         # see emba_runner.progress
             "error": None,
             "pid": None,
+            "owner": None,            # server process running the scan
             "meta": {},
         }
         _save_registry()
@@ -102,11 +207,82 @@ def create_scan(firmware: Path, log_dir: Path) -> str:
     return scan_id
 
 
+def claim_next(
+    admit: Callable[[dict, int], Optional[str]],
+    order: Callable[[dict], Any],
+) -> Optional[dict]:
+    """
+    Atomically (across server processes) move the head of the queue to
+    running, owned by this process. `admit(scan, running)` returns why
+    it cannot start yet, with `running` counted over all processes; the
+    reason is then recorded on every queued scan and None returned.
+    """
+    with _registry():
+        queued = sorted(
+            (s for s in _SCAN_REGISTRY.values() if s["status"] == "queued"),
+            key=order,
+        )
+        if not queued:
+            return None
+
+        running = sum(1 for s in _SCAN_REGISTRY.values() if s["status"] in ACTIVE_STATUSES)
+        reason = admit(queued[0], running)
+
+        if reason is not None:
+            if any(s.get("waiting_for") != reason for s in queued):
+                for s in queued:
+                    s["waiting_for"] = reason
+                _save_registry()
+            return None
+
+        scan = queued[0]
+        scan["status"] = "running"
+        scan["started_at"] = time.time()
+        scan["waiting_for"] = None
+        scan["owner"] = dict(_OWNER)
+        _save_registry()
+        return dict(scan)
+
+
+def reconcile_orphans() -> List[str]:
+    """
+    Fail running scans whose server process is gone (crashed or killed
+    before it could record the outcome), so they stop holding a slot.
+    """
+    with _registry():
+        orphans = [
+            s for s in _SCAN_REGISTRY.values()
+            if s["status"] in ACTIVE_STATUSES and _orphaned(s)
+        ]
+        for scan in orphans:
+            owner = (scan.get("owner") or {}).get("pid")
+            scan["error"] = f"server process {owner} exited while the scan was {scan['status']}"
+            scan["status"] = "failed"
+            scan["finished_at"] = time.time()
+        if orphans:
+            _save_registry()
+        return [s["scan_id"] for s in orphans]
+
+
+def set_progress(scan_id: str, progress: dict):
+    """
+    Record the latest progress snapshot of a running scan.
+    """
+    with _registry():
+        scan = _SCAN_REGISTRY.get(scan_id)
+        if not scan or scan.get("progress") == progress:
+            return
+
+        scan["progress"] = progress
+        _save_registry()
+
+
 def mark_finished(scan_id: str):
     """
     Mark scan as successfully finished.
     """
-    with _REGISTRY_LOCK:
+    with _registry():
+        _PROCESSES.pop(scan_id, None)
         scan = _SCAN_REGISTRY.get(scan_id)
         if not scan:
             return
@@ -120,7 +296,8 @@ def mark_failed(scan_id: str, error: str):
     """
     Mark scan as failed.
     """
-    with _REGISTRY_LOCK:
+    with _registry():
+        _PROCESSES.pop(scan_id, None)
         scan = _SCAN_REGISTRY.get(scan_id)
         if not scan:
             return
@@ -135,7 +312,7 @@ def get_scan(scan_id: str) -> dict:
     """
     Retrieve a single scan (defensive copy).
     """
-    with _REGISTRY_LOCK:
+    with _registry(shared=True):
         scan = _SCAN_REGISTRY.get(scan_id)
         if not scan:
             return {"error": "unknown scan_id"}
@@ -147,29 +324,96 @@ def list_scans() -> Dict[str, dict]:
     """
     List all scans (defensive copies).
     """
-    with _REGISTRY_LOCK:
+    with _registry(shared=True):
         return {k: dict(v) for k, v in _SCAN_REGISTRY.items()}
 
 
+def _observed(scan: dict) -> tuple:
+    # Refreshed timestamps and ETAs alone are not a change
+    progress = scan.get("progress") or {}
+    return (
+        scan["status"],
+        scan.get("waiting_for"),
+        progress.get("modules_finished"),
+        progress.get("current_module"),
+    )
+
+
+def wait_for_scan(
+    scan_id: str,
+    timeout: float = 60.0,
+    until_status: str | None = None,
+) -> dict:
+    """
+    Block until the scan changes (status, queue wait reason or
+    progress), reaches one of the comma-separated until_status values,
+    or the timeout expires. With until_status, only those statuses (or
+    the scan ending) return early. Returns the scan plus "changed" and
+    "timed_out".
+    Changes made by this process wake the waiter at once; those of other
+    server processes are seen within WAIT_POLL_SECONDS.
+    """
+    wanted = {s.strip() for s in until_status.split(",") if s.strip()} if until_status else None
+    deadline = time.monotonic() + max(0.0, min(timeout, MAX_WAIT_SECONDS))
+    start = None
+
+    with _REGISTRY_CHANGED:
+        while True:
+            with _file_lock(shared=True):
+                _refresh()
+
+            scan = _SCAN_REGISTRY.get(scan_id)
+            if not scan:
+                return {"error": "unknown scan_id"}
+            if start is None:
+                start = _observed(scan)
+
+            status = scan["status"]
+            if wanted is not None:
+                done = status in wanted or status in TERMINAL_STATUSES
+            else:
+                done = status in TERMINAL_STATUSES or _observed(scan) != start
+
+            remaining = deadline - time.monotonic()
+            if done or remaining <= 0:
+                return {
+                    **scan,
+                    "changed": _observed(scan) != start,
+                    "timed_out": not done,
+                }
+
+            _REGISTRY_CHANGED.wait(min(remaining, WAIT_POLL_SECONDS))
+
+
 def stop_scan(scan_id: str) -> dict:
     """
     Gracefully stop a running EMBA scan.
-    Uses process-group termination (SIGTERM).
+    Uses process-group termination (SIGTERM), also for scans run by
+    another server process. Queued scans are cancelled before they start.
     """
-    with _REGISTRY_LOCK:
+    with _registry():
         scan = _SCAN_REGISTRY.get(scan_id)
         if not scan:
             return {"error": "unknown scan_id"}
 
-        proc = scan.get("process")
-        if not proc:
-            return {"error": "no process attached"}
+        if scan["status"] == "queued":
+            scan["status"] = "cancelled"
+            scan["finished_at"] = time.time()
+            scan["waiting_for"] = None
+            _save_registry()
+            return {"status": "cancelled"}
 
         if scan["status"] != "running":
             return {"status": scan["status"]}
 
+        proc = _PROCESSES.get(scan_id)
+        pid = proc.pid if proc else scan.get("pid")
+        if not pid or _orphaned(scan):
+            return {"error": "no process attached"}
+
         try:
-            pgid = os.getpgid(proc.pid)
+            # EMBA runs in its own session: its PGID is its PID
+            pgid = os.getpgid(pid) if proc else pid
             os.killpg(pgid, signal.SIGTERM)
 
             scan["status"] = "stopping"
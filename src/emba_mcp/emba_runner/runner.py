@@ -1,17 +1,23 @@
 # runner.py
 import os
 import subprocess
-import threading
 from pathlib import Path
 import logging
+import threading
 import time
 import uuid
 
-from .registry import create_scan, mark_finished, mark_failed, attach_process
+from .registry import create_scan, mark_finished, mark_failed, attach_process, set_progress
 from .config import get_emba_binary
+from .output import open_output
+from .progress import PROGRESS_INTERVAL, ProgressTracker, expected_modules
+from .scheduler import ScanScheduler
 
 log = logging.getLogger("emba-mcp")
 
+# stderr lines quoted in the failure message of a scan
+STDERR_TAIL_LINES = 20
+
 
 def _run_emba_process(
     scan_id: str,
@@ -56,20 +62,49 @@ def _run_emba_process(
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
             start_new_session=True,       # allows kill later
         )
 
         # Attach PID for stop support
         attach_process(scan_id, proc)
 
-        # Only answer prompt if overwrite is allowed
-        input_data = "y\n" if force_overwrite else None
-        stdout, stderr = proc.communicate(input=input_data)
-
-        if proc.returncode != 0:
+        # Output goes to disk as it arrives, never accumulated in memory
+        output = open_output(scan_id)
+        readers = [
+            threading.Thread(
+                target=output.pump, args=(pipe, stream), daemon=True,
+                name=f"emba-{stream}-{scan_id}",
+            )
+            for pipe, stream in ((proc.stdout, "stdout"), (proc.stderr, "stderr"))
+        ]
+        for reader in readers:
+            reader.start()
+
+        try:
+            # Only answer prompt if overwrite is allowed
+            with proc.stdin:
+                if force_overwrite:
+                    proc.stdin.write(b"y\n")
+        except BrokenPipeError:
+            pass
+
+        tracker = ProgressTracker(scan_id, output_dir, expected_modules(emba_home, profile))
+        while True:
+            try:
+                returncode = proc.wait(timeout=PROGRESS_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                set_progress(scan_id, tracker.poll())
+
+        for reader in readers:
+            reader.join()
+        output.close()
+        set_progress(scan_id, tracker.complete(returncode == 0))
+
+        if returncode != 0:
+            stderr = "\n".join(output.last_stderr(STDERR_TAIL_LINES))
             raise RuntimeError(
-                f"EMBA exited with code {proc.returncode}\nSTDERR:\n{stderr.strip()}"
+                f"EMBA exited with code {returncode}\nSTDERR:\n{stderr.strip()}"
             )
 
         mark_finished(scan_id)
@@ -80,13 +115,27 @@ def _run_emba_process(
         mark_failed(scan_id, str(e))
 
 
+def _launch(scan: dict):
+    _run_emba_process(
+        scan["scan_id"],
+        Path(scan["firmware"]),
+        Path(scan["log_dir"]),
+        bool(scan.get("force_overwrite")),
+    )
+
+
+SCHEDULER = ScanScheduler(_launch)
+
+
 def start_emba_scan(
     firmware_path: Path,
     base_log_dir: Path,
     force_overwrite: bool = False,
+    priority: int = 0,
 ) -> dict:
     """
-    Start a single EMBA scan for one firmware image.
+    Queue a single EMBA scan for one firmware image. It starts as soon
+    as the scheduler admits it.
     """
     firmware_path = firmware_path.expanduser().resolve()
 
@@ -108,21 +157,15 @@ def start_emba_scan(
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    scan_id = create_scan(firmware_path, output_dir)
-
-    thread = threading.Thread(
-        target=_run_emba_process,
-        args=(scan_id, firmware_path, output_dir, force_overwrite),
-        daemon=True,
-        name=f"emba-scan-{scan_id}",
-    )
-    thread.start()
+    scan_id = create_scan(firmware_path, output_dir, priority, force_overwrite)
+    placement = SCHEDULER.submit(scan_id)
 
     return {
+        **placement,
         "scan_id": scan_id,
-        "status": "running",
         "firmware": str(firmware_path),
         "log_dir": str(output_dir),
         "force_overwrite": force_overwrite,
-        "started_at": time.time(),
+        "priority": priority,
+        "queued_at": time.time(),
     }
@@ -0,0 +1,255 @@
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import heapq
+import logging
+import os
+import shutil
+import threading
+import time
+
+from .registry import claim_next, get_scan, list_scans, reconcile_orphans
+
+log = logging.getLogger("emba-mcp")
+
+# --------------------------------------------------
+# Scan scheduler
+# --------------------------------------------------
+# Scans are queued in the registry (so the queue survives restarts and is
+# shared by all server processes) and started by a dispatcher thread in
+# each process: highest priority first, FIFO within a priority, never
+# more than max_concurrent_scans() running across all processes. The
+# head of the queue also waits until the host has room for another EMBA
+# run. Claiming a scan is atomic in the registry, so no two processes
+# launch the same one.
+
+MAX_CONCURRENT_SCANS = int(os.getenv("EMBA_MCP_MAX_SCANS", "2"))
+
+# EMBA runs many tools in parallel: CPUs budgeted per concurrent scan
+CPUS_PER_SCAN = int(os.getenv("EMBA_MCP_CPUS_PER_SCAN", "4"))
+
+# Admission thresholds
+MAX_LOAD_PER_CPU = float(os.getenv("EMBA_MCP_MAX_LOAD_PER_CPU", "1.0"))
+MIN_FREE_DISK_BYTES = int(float(os.getenv("EMBA_MCP_MIN_FREE_DISK_GB", "20")) * 1024 ** 3)
+MIN_FREE_MEMORY_BYTES = int(float(os.getenv("EMBA_MCP_MIN_FREE_MEMORY_GB", "4")) * 1024 ** 3)
+
+# How often a blocked queue re-checks admission (seconds)
+ADMISSION_INTERVAL = float(os.getenv("EMBA_MCP_ADMISSION_INTERVAL", "30"))
+
+# Scan duration assumed for ETAs until finished scans give a history
+DEFAULT_SCAN_SECONDS = float(os.getenv("EMBA_MCP_SCAN_ESTIMATE_SECONDS", str(2 * 3600)))
+
+
+def _cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def max_concurrent_scans() -> int:
+    return max(1, min(MAX_CONCURRENT_SCANS, _cpu_count() // CPUS_PER_SCAN))
+
+
+# --------------------------------------------------
+# Host resources
+# --------------------------------------------------
+
+def _available_memory() -> Optional[int]:
+    """
+    MemAvailable from /proc/meminfo (Linux); None if unknown.
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _free_disk(path: Path) -> Optional[int]:
+    # The log dir may not exist yet: check its nearest existing parent
+    for p in (path, *path.parents):
+        try:
+            return shutil.disk_usage(p).free
+        except OSError:
+            continue
+    return None
+
+
+def _load_per_cpu() -> Optional[float]:
+    try:
+        return os.getloadavg()[0] / _cpu_count()
+    except OSError:
+        return None
+
+
+def admission(log_dir: Path, running: int) -> Optional[str]:
+    """
+    Why another scan cannot start right now (None = it can).
+    Load is only held against a scan while others are running, so a
+    busy host delays the queue but cannot starve it.
+    """
+    slots = max_concurrent_scans()
+    if running >= slots:
+        return f"concurrency limit ({running}/{slots} scans running)"
+
+    disk = _free_disk(log_dir)
+    if disk is not None and disk < MIN_FREE_DISK_BYTES:
+        return f"low disk space ({disk // 1024 ** 2} MiB free)"
+
+    memory = _available_memory()
+    if memory is not None and memory < MIN_FREE_MEMORY_BYTES:
+        return f"low memory ({memory // 1024 ** 2} MiB available)"
+
+    load = _load_per_cpu()
+    if running and load is not None and load > MAX_LOAD_PER_CPU:
+        return f"high load ({load:.2f} per CPU)"
+
+    return None
+
+
+# --------------------------------------------------
+# Queue estimates
+# --------------------------------------------------
+
+def _queue_order(scan: dict) -> Tuple[int, float]:
+    return (-int(scan.get("priority") or 0), scan.get("queued_at") or 0.0)
+
+
+def _average_duration(scans: List[dict]) -> float:
+    durations = [
+        s["finished_at"] - s["started_at"]
+        for s in scans
+        if s.get("status") == "finished" and s.get("started_at") and s.get("finished_at")
+    ]
+    return sum(durations) / len(durations) if durations else DEFAULT_SCAN_SECONDS
+
+
+def queue_snapshot() -> Dict:
+    """
+    Queued scans in start order with position and estimated start time.
+    ETAs assume every scan takes the average duration of finished ones.
+    """
+    scans = list(list_scans().values())
+    now = time.time()
+    duration = _average_duration(scans)
+    slots = max_concurrent_scans()
+
+    running = [s for s in scans if s.get("status") in ("running", "stopping")]
+    queued = sorted((s for s in scans if s.get("status") == "queued"), key=_queue_order)
+
+    # When each slot frees up
+    free_at = [max(now, (s.get("started_at") or now) + duration) for s in running][:slots]
+    free_at += [now] * (slots - len(free_at))
+    heapq.heapify(free_at)
+
+    entries = []
+    for position, scan in enumerate(queued, start=1):
+        start = heapq.heappop(free_at)
+        heapq.heappush(free_at, start + duration)
+        entries.append({
+            "scan_id": scan["scan_id"],
+            "priority": scan.get("priority", 0),
+            "queue_position": position,
+            "estimated_start_at": round(start, 1),
+            "waiting_for": scan.get("waiting_for"),
+        })
+
+    return {
+        "max_concurrent_scans": slots,
+        "running": len(running),
+        "queued": len(entries),
+        "estimated_scan_seconds": round(duration, 1),
+        "queue": entries,
+    }
+
+
+# --------------------------------------------------
+# Dispatcher
+# --------------------------------------------------
+
+class ScanScheduler:
+    """
+    Starts queued scans through `launch(scan)`, which runs one scan to
+    completion on its own thread.
+    """
+
+    def __init__(self, launch: Callable[[dict], None]):
+        self._launch = launch
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """
+        Start the dispatcher (idempotent). Scans left running by a dead
+        server process are failed; scans left queued are picked up.
+        """
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._reconcile()
+            self._thread = threading.Thread(
+                target=self._loop, daemon=True, name="emba-scan-scheduler",
+            )
+            self._thread.start()
+
+    def submit(self, scan_id: str) -> Dict:
+        """
+        Dispatch right away if the scan can start, and report where it
+        stands: running, or its queue position and estimated start.
+        """
+        self.start()
+        with self._cond:
+            self._dispatch()
+            self._cond.notify_all()
+        return self.position(scan_id)
+
+    def position(self, scan_id: str) -> Dict:
+        snapshot = queue_snapshot()
+        for entry in snapshot["queue"]:
+            if entry["scan_id"] == scan_id:
+                return {"status": "queued", **entry}
+        return {"scan_id": scan_id, "status": get_scan(scan_id).get("status", "unknown")}
+
+    def _reconcile(self):
+        for scan_id in reconcile_orphans():
+            log.warning("EMBA scan %s lost its server process; marked failed", scan_id)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                try:
+                    # Another server process may have died meanwhile
+                    self._reconcile()
+                    self._dispatch()
+                except Exception:
+                    log.exception("Scan dispatch failed")
+                self._cond.wait(ADMISSION_INTERVAL)
+
+    def _dispatch(self):
+        """
+        Start queued scans in order while admission allows. Strict
+        priority: a blocked head of queue holds back the rest.
+        """
+        while True:
+            scan = claim_next(
+                lambda head, running: admission(Path(head["log_dir"]), running),
+                _queue_order,
+            )
+            if scan is None:
+                return
+
+            scan_id = scan["scan_id"]
+            log.info("Admitted EMBA scan %s (priority %s)", scan_id, scan.get("priority", 0))
+            threading.Thread(
+                target=self._run, args=(scan,), daemon=True, name=f"emba-scan-{scan_id}",
+            ).start()
+
+    def _run(self, scan: dict):
+        try:
+            self._launch(scan)
+        finally:
+            with self._cond:
+                self._cond.notify_all()
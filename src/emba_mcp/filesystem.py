@@ -1,6 +1,19 @@
+from bisect import bisect_left
+from concurrent.futures import FIRST_COMPLETED, wait
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+import logging
+import os
 import stat
+import sys
+import threading
+
+from emba_mcp.cache import cached_result, memoized, memory_get, memory_put
+from emba_mcp.parallel import WORKERS, io_pool
+from emba_mcp.reader import sniff_file
+from emba_mcp.store import get_store
+
+log = logging.getLogger("emba-mcp")
 
 COMMON_ROOT_NAMES = [
     "squashfs-root",
@@ -8,7 +21,10 @@ COMMON_ROOT_NAMES = [
     "filesystem",
 ]
 
-def find_filesystem_root(log_dir: Path) -> Optional[Path]:
+SCRIPT_SUFFIXES = {".sh", ".cgi", ".py", ".lua", ".php", ".pl"}
+
+
+def _search_filesystem_root(log_dir: Path) -> Optional[Path]:
     firmware_dir = log_dir / "firmware"
     if not firmware_dir.exists():
         return None
@@ -20,17 +36,255 @@ def find_filesystem_root(log_dir: Path) -> Optional[Path]:
     return None
 
 
-def walk_filesystem(root: Path) -> List[Path]:
-    files = []
-    for p in root.rglob("*"):
+def find_filesystem_root(log_dir: Path) -> Optional[Path]:
+    """
+    Extracted rootfs under log_dir/firmware. The search walks the whole
+    extraction, so its answer is memoized per log_dir fingerprint.
+    """
+    return memoized(
+        "filesystem_root", log_dir, lambda: _search_filesystem_root(log_dir),
+        size=lambda root: 100 + len(str(root)),
+    )
+
+
+# --------------------------------------------------
+# Filesystem index (one walk per rootfs)
+# --------------------------------------------------
+
+# Paths are rootfs-relative in EMBA's own notation ("/etc/passwd"), with
+# the root stored once on the index. Directory strings are interned, so
+# all entries of a directory share one copy.
+
+class FileEntry(NamedTuple):
+    dir: str        # rootfs-relative parent ("" at the root, else "/etc", ...)
+    name: str
+    kind: str       # file | dir | symlink | other
+    mode: int       # lstat st_mode
+    size: int
+    suffix: str     # same semantics as Path.suffix
+    content: str    # sniffed type for regular files (text, elf, gzip, ...), else ""
+
+    @property
+    def path(self) -> str:
+        return self.dir + "/" + self.name
+
+    @property
+    def parent_name(self) -> str:
+        return self.dir.rpartition("/")[2]
+
+
+def _suffix(name: str) -> str:
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[i:]
+    return ""
+
+
+def _kind(mode: int) -> str:
+    if stat.S_ISREG(mode):
+        return "file"
+    if stat.S_ISDIR(mode):
+        return "dir"
+    if stat.S_ISLNK(mode):
+        return "symlink"
+    return "other"
+
+
+# Bytes per entry besides its name: the tuple, list slot and per-entry
+# fields (measured on CPython 3.11; for cache accounting)
+_ENTRY_OVERHEAD = 280
+
+
+class FilesystemIndex:
+    """
+    Inventory of an extracted rootfs, built with a single scandir walk.
+    Symlinks are recorded but never followed. Regular files are sniffed
+    once (magic numbers / text heuristic) so content scanners can skip
+    binaries regardless of their suffix.
+    """
+
+    def __init__(self, root: Path, entries: List[FileEntry]):
+        self.root = root
+        self.entries = entries      # sorted by (dir, name)
+        self.root_str = str(root).rstrip("/")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def approx_bytes(self) -> int:
+        return sum(_ENTRY_OVERHEAD + len(e.name) for e in self.entries)
+
+    def files(self) -> Iterator[FileEntry]:
+        return (e for e in self.entries if e.kind == "file")
+
+    def dirs(self) -> Iterator[FileEntry]:
+        return (e for e in self.entries if e.kind == "dir")
+
+    def get(self, relpath: str) -> Optional[FileEntry]:
+        """
+        Look up an entry by its rootfs-relative path (e.g. "etc/passwd").
+        """
+        d, _, name = ("/" + relpath.strip("/")).rpartition("/")
+        i = bisect_left(self.entries, (d, name))
+        if i < len(self.entries) and self.entries[i][:2] == (d, name):
+            return self.entries[i]
+        return None
+
+    def abspath(self, e: FileEntry) -> str:
+        return self.root_str + e.dir + "/" + e.name
+
+
+def _scan_dir(path: str, rel: str) -> Tuple[List[FileEntry], List[Tuple[str, str]]]:
+    """
+    List one directory (absolute path, rootfs-relative path): its entries
+    (one lstat each, regular files sniffed) and the subdirectories still
+    to walk.
+    """
+    entries: List[FileEntry] = []
+    subdirs: List[Tuple[str, str]] = []
+    rel = sys.intern(rel)
+
+    try:
+        it = os.scandir(path)
+    except OSError:
+        return entries, subdirs
+
+    with it:
+        for de in it:
+            try:
+                st = de.stat(follow_symlinks=False)
+            except OSError:
+                continue
+
+            kind = _kind(st.st_mode)
+            content = ""
+            if kind == "file":
+                content = sniff_file(de.path) if st.st_size else "empty"
+
+            entries.append(FileEntry(
+                dir=rel,
+                name=de.name,
+                kind=kind,
+                mode=st.st_mode,
+                size=st.st_size,
+                suffix=_suffix(de.name),
+                content=content,
+            ))
+
+            if kind == "dir":
+                subdirs.append((de.path, rel + "/" + de.name))
+
+    return entries, subdirs
+
+
+def build_filesystem_index(root: Path, workers: int = WORKERS) -> FilesystemIndex:
+    """
+    Walk a rootfs with one task per directory on an I/O thread pool.
+    Results are merged in path order, so the index does not depend on
+    scheduling.
+    """
+    entries: List[FileEntry] = []
+
+    if workers <= 1:
+        stack = [(str(root), "")]
+        while stack:
+            found, subdirs = _scan_dir(*stack.pop())
+            entries.extend(found)
+            stack.extend(subdirs)
+    else:
+        with io_pool(workers) as pool:
+            pending = {pool.submit(_scan_dir, str(root), "")}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    found, subdirs = fut.result()
+                    entries.extend(found)
+                    pending.update(pool.submit(_scan_dir, *d) for d in subdirs)
+
+    entries.sort()
+    return FilesystemIndex(root, entries)
+
+
+def _index_to_rows(index: FilesystemIndex) -> List[list]:
+    return [list(e) for e in index.entries]
+
+
+def _index_from_rows(root: Path, rows: List[list]) -> FilesystemIndex:
+    intern = sys.intern
+    return FilesystemIndex(root, [
+        FileEntry(intern(row[0]), *row[1:]) for row in rows
+    ])
+
+
+# Bump when FileEntry changes so persisted inventories are rebuilt
+INDEX_VERSION = 3
+
+
+# Indexes live in the shared in-process LRU (keyed by root and root
+# mtime), so they count against EMBA_MCP_CACHE_MAX_BYTES and are evicted
+# like any other result; rootfs content scans keyed by an index go with it.
+
+# One build lock per root: a walk of one rootfs never blocks lookups or
+# builds of another
+_INDEX_LOCKS: Dict[str, threading.Lock] = {}
+_INDEX_LOCKS_GUARD = threading.Lock()
+
+
+def _root_lock(key: str) -> threading.Lock:
+    with _INDEX_LOCKS_GUARD:
+        return _INDEX_LOCKS.setdefault(key, threading.Lock())
+
+
+def get_filesystem_index(root: Path) -> FilesystemIndex:
+    """
+    Return the shared index for a rootfs, building it on first use.
+    Falls back to the persistent store before walking the tree, and is
+    rebuilt if the root directory itself was modified since.
+    """
+    key = str(root)
+    try:
+        root_mtime = os.stat(key).st_mtime_ns
+    except OSError:
+        root_mtime = 0
+
+    mem_key = ("filesystem_index", key, root_mtime)
+    found, index = memory_get(mem_key)
+    if found:
+        return index
+
+    with _root_lock(key):
+        # Built by another thread while we waited
+        found, index = memory_get(mem_key)
+        if found:
+            return index
+
+        index = None
+        fingerprint = f"v{INDEX_VERSION}:{root_mtime}"
+
         try:
-            if p.is_file():
-                files.append(p)
+            rows = get_store().get_inventory(key, fingerprint)
+            if rows is not None:
+                index = _index_from_rows(root, rows)
         except Exception:
-            continue
-    return files
+            log.exception("Inventory lookup failed for %s", key)
+
+        if index is None:
+            index = build_filesystem_index(root)
+            try:
+                get_store().put_inventory(key, fingerprint, _index_to_rows(index))
+            except Exception:
+                log.exception("Inventory write failed for %s", key)
+
+        memory_put(mem_key, index, index.approx_bytes())
+        return index
+
+
+def walk_filesystem(root: Path) -> List[Path]:
+    index = get_filesystem_index(root)
+    return [Path(index.abspath(e)) for e in index.files()]
 
 
+@cached_result("filesystem_summary")
 def basic_filesystem_summary(log_dir: Path) -> Dict:
     root = find_filesystem_root(log_dir)
 
@@ -41,27 +295,25 @@ def basic_filesystem_summary(log_dir: Path) -> Dict:
             "confidence": "low",
         }
 
-    files = walk_filesystem(root)
+    files = list(get_filesystem_index(root).files())
 
     summary = {
         "total_files": len(files),
         "config_files": 0,
         "binaries": 0,
         "scripts": 0,
+        "content_types": {},
     }
 
     for f in files:
         name = f.name.lower()
-        try:
-            mode = f.stat().st_mode
-        except Exception:
-            continue
+        summary["content_types"][f.content] = summary["content_types"].get(f.content, 0) + 1
 
         if name.endswith((".conf", ".cfg", ".ini")):
             summary["config_files"] += 1
-        elif f.suffix in {".sh", ".cgi", ".py", ".lua", ".php", ".pl"}:
+        elif f.suffix in SCRIPT_SUFFIXES:
             summary["scripts"] += 1
-        elif (f.suffix in {"", ".bin"}) and (mode & stat.S_IXUSR):
+        elif (f.suffix in {"", ".bin"}) and (f.mode & stat.S_IXUSR):
             summary["binaries"] += 1
 
     return {
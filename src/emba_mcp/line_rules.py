@@ -0,0 +1,96 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import os
+import re
+
+# --------------------------------------------------
+# Declarative line rules for EMBA text logs
+# --------------------------------------------------
+# Each EMBA module's line patterns are declared as data (LineRule) and
+# compiled into one alternation per module, so every line is matched in
+# a single regex call however many rules there are. Lines are cut to
+# MAX_LINE_CHARS first: a pathological line costs at most that much.
+
+MAX_LINE_CHARS = int(os.getenv("EMBA_MCP_RULE_MAX_LINE", "4096"))
+
+_NAMED_GROUP = re.compile(r"\(\?P<(\w+)>")
+_NAMED_BACKREF = re.compile(r"\(\?P=(\w+)\)")
+
+
+class LineRule(NamedTuple):
+    name: str                           # rule ID
+    pattern: str                        # named groups become RuleMatch.fields
+    attrs: Optional[Dict[str, Any]] = None   # constant data carried by the rule
+
+
+class RuleMatch(NamedTuple):
+    rule: LineRule
+    fields: Dict[str, Optional[str]]
+    line: str                           # the (length-capped) line
+    end: int = 0                        # offset just past the match
+    truncated: bool = False             # the line was longer than the cap
+
+
+class LineRules:
+    """
+    The rules of one EMBA module as a single compiled matcher.
+    A line yields at most one match: the leftmost, and among rules
+    matching at the same offset the first listed. With first_listed,
+    the first-listed rule matching anywhere on the line wins instead
+    (an if/elif chain); the combined regex still rejects non-matching
+    lines in one pass. Rule patterns may use named groups and named
+    backreferences, not numbered ones.
+    """
+
+    def __init__(self, module: str, rules: Iterable[LineRule],
+                 flags: int = re.IGNORECASE, max_line: int = MAX_LINE_CHARS,
+                 first_listed: bool = False):
+        self.module = module
+        self.rules = list(rules)
+        self.max_line = max_line
+        self.first_listed = first_listed
+        self._single = [re.compile(rule.pattern, flags) for rule in self.rules]
+
+        parts = []
+        self._groups: List[List[Tuple[str, str]]] = []
+        for i, rule in enumerate(self.rules):
+            prefix = f"r{i}_"
+            body = _NAMED_GROUP.sub(lambda m: f"(?P<{prefix}{m.group(1)}>", rule.pattern)
+            body = _NAMED_BACKREF.sub(lambda m: f"(?P={prefix}{m.group(1)})", body)
+            parts.append(f"(?P<r{i}>{body})")
+            self._groups.append([
+                (name, prefix + name) for name in re.compile(rule.pattern).groupindex
+            ])
+
+        self._regex = re.compile("|".join(parts), flags)
+
+    def match(self, line: str) -> Optional[RuleMatch]:
+        truncated = len(line) > self.max_line
+        if truncated:
+            line = line[:self.max_line]
+
+        m = self._regex.search(line)
+        if m is None:
+            return None
+
+        i = int(m.lastgroup[1:])
+
+        if self.first_listed and i:
+            # Only lines some rule matches get here: try the higher ones
+            for j in range(i):
+                single = self._single[j].search(line)
+                if single:
+                    return RuleMatch(
+                        rule=self.rules[j],
+                        fields={name: single.group(name) for name, _ in self._groups[j]},
+                        line=line,
+                        end=single.end(),
+                        truncated=truncated,
+                    )
+
+        return RuleMatch(
+            rule=self.rules[i],
+            fields={name: m.group(group) for name, group in self._groups[i]},
+            line=line,
+            end=m.end(f"r{i}"),
+            truncated=truncated,
+        )
@@ -25,25 +25,40 @@ from emba_mcp.filesystem import basic_filesystem_summary, find_filesystem_root
 # -------------------------
 # Analyzers
 # -------------------------
-from emba_mcp.emba_analyzers.high_risk import get_high_risk_findings
-from emba_mcp.emba_analyzers.attack_path import explain_attack_path
+from emba_mcp.emba_analyzers.high_risk import get_finding_evidence, get_high_risk_findings
+from emba_mcp.emba_analyzers.attack_path import explain_attack_path, explain_all_attack_paths
+
+# -------------------------
+# Result cache + list views
+# -------------------------
+from emba_mcp.cache import cache_stats, result_version
+from emba_mcp.serialize import to_plain
+from emba_mcp.views import apply_view, make_query
 
 # -------------------------
 # EMBA runner + registry
 # -------------------------
-from emba_mcp.emba_runner.runner import start_emba_scan
+from emba_mcp.emba_runner.runner import SCHEDULER, start_emba_scan
+from emba_mcp.emba_runner.scheduler import queue_snapshot
+from emba_mcp.emba_runner.output import get_output
 from emba_mcp.emba_runner.registry import (
     get_scan,
     list_scans,
     stop_scan,
+    wait_for_scan,
 )
 
 # -------------------------
 # Stdlib
 # -------------------------
+import asyncio
+import functools
+import os
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict
 
 # --------------------------------------------------
 # Logging (stderr only – MCP requirement)
@@ -77,77 +92,212 @@ def _safe(fn, *args):
         log.exception("Tool execution failed")
         return {"error": str(e), "confidence": "error"}
 
+
+def _with_fs_root(fn, log_path: Path):
+    return fn(log_path, find_filesystem_root(log_path))
+
+
+def _paged(tool: str, query, fn, log_path: Path, *args):
+    """
+    Run a list tool's parser (cached) and serve the requested page.
+    """
+    return apply_view(tool, log_path, fn(log_path, *args), query)
+
+
+def _rooted(fn):
+    return functools.partial(_with_fs_root, fn)
+
+# --------------------------------------------------
+# Blocking work executor
+# --------------------------------------------------
+# Parsers walk the rootfs and read large logs; they run on a bounded
+# thread pool so the event loop keeps serving cheap registry queries.
+# Each analysis tool additionally has its own concurrency limit.
+
+ANALYSIS_WORKERS = int(os.getenv("EMBA_MCP_ANALYSIS_WORKERS", "4"))
+TOOL_CONCURRENCY = int(os.getenv("EMBA_MCP_TOOL_CONCURRENCY", "2"))
+
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=ANALYSIS_WORKERS,
+    thread_name_prefix="emba-tool",
+)
+_TOOL_LIMITS: Dict[str, asyncio.Semaphore] = {}
+
+
+async def _offload(tool: str, fn, *args):
+    limit = _TOOL_LIMITS.get(tool)
+    if limit is None:
+        limit = _TOOL_LIMITS[tool] = asyncio.Semaphore(TOOL_CONCURRENCY)
+
+    async with limit:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_EXECUTOR, functools.partial(fn, *args))
+
+# --------------------------------------------------
+# Conditional fetch
+# --------------------------------------------------
+# Every analysis result carries a "version" token. A client passing it
+# back as if_changed_since gets {"unchanged": true} while the log_dir is
+# unchanged, without the result being loaded or encoded.
+
+def _versioned(tool: str, log_path: Path, since: str, variant, call):
+    version = result_version(tool, log_path, variant)
+    if since and since == version:
+        return {"unchanged": True, "version": version}
+
+    # The one encode step at the tool boundary: records -> JSON types
+    result = to_plain(call())
+
+    # Errors and degraded runs get no token: they must be re-fetched
+    if isinstance(result, dict) and "error" not in result and not result.get("partial"):
+        result = {**result, "version": version}
+    return result
+
+
+async def _offload_versioned(tool: str, log_path: Path, since: str, variant, fn, *args):
+    return await _offload(
+        tool, _versioned, tool, log_path, since, variant, functools.partial(fn, *args),
+    )
+
 # --------------------------------------------------
 # Parsing tools (scan_id OR log_dir)
 # --------------------------------------------------
 
 @mcp.tool(name="get_kernel_info")
-def get_kernel_info(ctx: Context, log_dir: str) -> dict:
+async def get_kernel_info(ctx: Context, log_dir: str, if_changed_since: str = "") -> dict:
     p = Path(log_dir).expanduser().resolve()
     if not p.exists():
         return {"error": f"log_dir does not exist: {p}"}
-    return parse_kernel_info(p)
+    return await _offload_versioned("get_kernel_info", p, if_changed_since, (), parse_kernel_info, p)
 
 
 
 @mcp.tool(name="get_distribution_info")
-def get_distribution_info(ctx: Context, log_dir: str) -> dict:
+async def get_distribution_info(ctx: Context, log_dir: str, if_changed_since: str = "") -> dict:
     try:
-        return parse_distribution(resolve_log_dir(log_dir))
+        p = resolve_log_dir(log_dir)
+        return await _offload_versioned("get_distribution_info", p, if_changed_since, (), parse_distribution, p)
     except Exception as e:
         return {"error": str(e), "confidence": "error"}
 
 
 
 @mcp.tool(name="get_bootloader_info")
-def get_bootloader_info(ctx: Context, log_dir: str) -> dict:
-    return _safe(parse_bootloader_info, resolve_log_dir(log_dir))
+async def get_bootloader_info(ctx: Context, log_dir: str, if_changed_since: str = "") -> dict:
+    p = resolve_log_dir(log_dir)
+    return await _offload_versioned("get_bootloader_info", p, if_changed_since, (), _safe, parse_bootloader_info, p)
 
 
 
 @mcp.tool(name="get_sbom")
-def get_sbom(ctx: Context, log_dir: str) -> dict:
-    return _safe(parse_sbom, resolve_log_dir(log_dir))
+async def get_sbom(
+    ctx: Context,
+    log_dir: str,
+    limit: int = 0,
+    cursor: str = "",
+    path_prefix: str = "",
+    fields: str = "",
+    absolute_paths: bool = False,
+    if_changed_since: str = "",
+) -> dict:
+    p = resolve_log_dir(log_dir)
+    q = make_query(limit, cursor, fields, absolute_paths=absolute_paths, path_prefix=path_prefix)
+    return await _offload_versioned(
+        "get_sbom", p, if_changed_since, q,
+        _safe, _paged, "get_sbom", q, parse_sbom, p,
+    )
 
 
 
 
 @mcp.tool(name="get_filesystem_overview")
-def get_filesystem_overview(ctx: Context, log_dir: str) -> dict:
-    return _safe(basic_filesystem_summary, resolve_log_dir(log_dir))
+async def get_filesystem_overview(ctx: Context, log_dir: str, if_changed_since: str = "") -> dict:
+    p = resolve_log_dir(log_dir)
+    return await _offload_versioned(
+        "get_filesystem_overview", p, if_changed_since, (),
+        _safe, basic_filesystem_summary, p,
+    )
 
 
 @mcp.tool(name="get_interesting_files")
-def get_interesting_files(ctx: Context, log_dir: str) -> dict:
-    return _safe(parse_interesting_files, resolve_log_dir(log_dir))
+async def get_interesting_files(
+    ctx: Context,
+    log_dir: str,
+    limit: int = 0,
+    cursor: str = "",
+    path_prefix: str = "",
+    fields: str = "",
+    absolute_paths: bool = False,
+    if_changed_since: str = "",
+) -> dict:
+    p = resolve_log_dir(log_dir)
+    q = make_query(limit, cursor, fields, absolute_paths=absolute_paths, path_prefix=path_prefix)
+    return await _offload_versioned(
+        "get_interesting_files", p, if_changed_since, q,
+        _safe, _paged, "get_interesting_files", q, parse_interesting_files, p,
+    )
 
 
 
 @mcp.tool(name="get_credentials_and_secrets")
-def get_credentials_and_secrets(ctx: Context, log_dir: str) -> dict:
+async def get_credentials_and_secrets(
+    ctx: Context,
+    log_dir: str,
+    limit: int = 0,
+    cursor: str = "",
+    path_prefix: str = "",
+    fields: str = "",
+    absolute_paths: bool = False,
+    if_changed_since: str = "",
+) -> dict:
     try:
         p = resolve_log_dir(log_dir)
-        fs_root = find_filesystem_root(p)
-        return parse_credentials(p, fs_root)
+        q = make_query(limit, cursor, fields, absolute_paths=absolute_paths, path_prefix=path_prefix)
+        return await _offload_versioned(
+            "get_credentials_and_secrets", p, if_changed_since, q,
+            _paged, "get_credentials_and_secrets", q, _rooted(parse_credentials), p,
+        )
     except Exception as e:
         return {"error": str(e), "confidence": "error"}
 
 
 
 @mcp.tool(name="get_permissions_issues")
-def get_permissions_issues(ctx: Context, log_dir: str) -> dict:
+async def get_permissions_issues(
+    ctx: Context,
+    log_dir: str,
+    limit: int = 0,
+    cursor: str = "",
+    path_prefix: str = "",
+    absolute_paths: bool = False,
+    if_changed_since: str = "",
+) -> dict:
     log_path = resolve_log_dir(log_dir)
-    fs_root = find_filesystem_root(log_path)
-    return _safe(parse_permissions, log_path, fs_root)
+    q = make_query(limit, cursor, absolute_paths=absolute_paths, path_prefix=path_prefix)
+    return await _offload_versioned(
+        "get_permissions_issues", log_path, if_changed_since, q,
+        _safe, _paged, "get_permissions_issues", q, _rooted(parse_permissions), log_path,
+    )
 
 
 
 @mcp.tool(name="get_network_services")
-def get_network_services(ctx: Context, log_dir: str) -> dict:
+async def get_network_services(
+    ctx: Context,
+    log_dir: str,
+    limit: int = 0,
+    cursor: str = "",
+    path_prefix: str = "",
+    absolute_paths: bool = False,
+    if_changed_since: str = "",
+) -> dict:
     try:
         log_path = resolve_log_dir(log_dir)
-        fs_root = find_filesystem_root(log_path)
-        return parse_network_services(log_path, fs_root)
+        q = make_query(limit, cursor, absolute_paths=absolute_paths, path_prefix=path_prefix)
+        return await _offload_versioned(
+            "get_network_services", log_path, if_changed_since, q,
+            _paged, "get_network_services", q, _rooted(parse_network_services), log_path,
+        )
     except Exception as e:
         log.exception("Network services tool failed")
         return {"error": str(e), "confidence": "error"}
@@ -157,84 +307,299 @@ def get_network_services(ctx: Context, log_dir: str) -> dict:
 
 
 @mcp.tool(name="get_weak_crypto_and_keys")
-def get_weak_crypto_and_keys(ctx: Context, log_dir: str) -> dict:
+async def get_weak_crypto_and_keys(
+    ctx: Context,
+    log_dir: str,
+    limit: int = 0,
+    cursor: str = "",
+    path_prefix: str = "",
+    absolute_paths: bool = False,
+    if_changed_since: str = "",
+) -> dict:
     log_path = resolve_log_dir(log_dir)
-    fs_root = find_filesystem_root(log_path)
-    return _safe(parse_weak_crypto, log_path, fs_root)
+    q = make_query(limit, cursor, absolute_paths=absolute_paths, path_prefix=path_prefix)
+    return await _offload_versioned(
+        "get_weak_crypto_and_keys", log_path, if_changed_since, q,
+        _safe, _paged, "get_weak_crypto_and_keys", q, _rooted(parse_weak_crypto), log_path,
+    )
 
 
 @mcp.tool(name="get_binary_protection_mechanisms")
-def get_binary_protection_mechanisms(ctx: Context, log_dir: str) -> dict:
-    return _safe(parse_binary_protections, resolve_log_dir(log_dir))
+async def get_binary_protection_mechanisms(
+    ctx: Context,
+    log_dir: str,
+    limit: int = 0,
+    cursor: str = "",
+    path_prefix: str = "",
+    fields: str = "",
+    absolute_paths: bool = False,
+    if_changed_since: str = "",
+) -> dict:
+    p = resolve_log_dir(log_dir)
+    q = make_query(limit, cursor, fields, absolute_paths=absolute_paths, path_prefix=path_prefix)
+    return await _offload_versioned(
+        "get_binary_protection_mechanisms", p, if_changed_since, q,
+        _safe, _paged, "get_binary_protection_mechanisms", q, parse_binary_protections, p,
+    )
 
 
 @mcp.tool(name="get_weak_functions")
-def get_weak_functions(ctx: Context, log_dir: str) -> dict:
+async def get_weak_functions(
+    ctx: Context,
+    log_dir: str,
+    limit: int = 0,
+    cursor: str = "",
+    path_prefix: str = "",
+    mode: str = "",
+    fields: str = "",
+    absolute_paths: bool = False,
+    if_changed_since: str = "",
+) -> dict:
     try:
-        return parse_weak_functions(resolve_log_dir(log_dir))
+        p = resolve_log_dir(log_dir)
+        q = make_query(limit, cursor, fields, absolute_paths=absolute_paths, path_prefix=path_prefix, mode=mode)
+        return await _offload_versioned(
+            "get_weak_functions", p, if_changed_since, q,
+            _paged, "get_weak_functions", q, parse_weak_functions, p,
+        )
     except Exception as e:
         return {"error": str(e), "confidence": "error"}
 
 
 
 @mcp.tool(name="search_password_files")
-def search_password_files(ctx: Context, log_dir: str) -> dict:
-    return _safe(parse_password_files, resolve_log_dir(log_dir))
+async def search_password_files(
+    ctx: Context,
+    log_dir: str,
+    limit: int = 0,
+    cursor: str = "",
+    path_prefix: str = "",
+    fields: str = "",
+    absolute_paths: bool = False,
+    if_changed_since: str = "",
+) -> dict:
+    p = resolve_log_dir(log_dir)
+    q = make_query(limit, cursor, fields, absolute_paths=absolute_paths, path_prefix=path_prefix)
+    return await _offload_versioned(
+        "search_password_files", p, if_changed_since, q,
+        _safe, _paged, "search_password_files", q, parse_password_files, p,
+    )
 
 
 
 @mcp.tool(name="get_high_risk_findings")
-def get_high_risk_findings_tool(ctx: Context, log_dir: str) -> dict:
-    return _safe(get_high_risk_findings, resolve_log_dir(log_dir))
+async def get_high_risk_findings_tool(
+    ctx: Context,
+    log_dir: str,
+    limit: int = 0,
+    cursor: str = "",
+    severity: str = "",
+    fields: str = "",
+    if_changed_since: str = "",
+) -> dict:
+    p = resolve_log_dir(log_dir)
+    q = make_query(limit, cursor, fields, severity=severity)
+    return await _offload_versioned(
+        "get_high_risk_findings", p, if_changed_since, q,
+        _safe, _paged, "get_high_risk_findings", q, get_high_risk_findings, p,
+    )
+
+
+
+@mcp.tool(name="get_finding_evidence")
+async def get_finding_evidence_tool(
+    ctx: Context,
+    log_dir: str,
+    finding_id: str,
+    parser: str = "",
+    offset: int = 0,
+    limit: int = 100,
+    if_changed_since: str = "",
+) -> dict:
+    p = resolve_log_dir(log_dir)
+    return await _offload_versioned(
+        "get_finding_evidence", p, if_changed_since, (finding_id, parser, offset, limit),
+        _safe, get_finding_evidence, p, finding_id, parser, offset, limit,
+    )
 
 
 
 @mcp.tool(name="explain_attack_path")
-def explain_attack_path_tool(
+async def explain_attack_path_tool(
     ctx: Context,
     log_dir: str,
     finding_index: int = 0,
+    finding_id: str = "",
+    if_changed_since: str = "",
 ) -> dict:
-    return _safe(
-        explain_attack_path,
-        resolve_log_dir(log_dir),
-        finding_index,
+    p = resolve_log_dir(log_dir)
+    finding = finding_id or finding_index
+    return await _offload_versioned(
+        "explain_attack_path", p, if_changed_since, finding,
+        _safe, explain_attack_path, p, finding,
+    )
+
+
+@mcp.tool(name="explain_all_attack_paths")
+async def explain_all_attack_paths_tool(
+    ctx: Context,
+    log_dir: str,
+    limit: int = 0,
+    cursor: str = "",
+    severity: str = "",
+    fields: str = "",
+    if_changed_since: str = "",
+) -> dict:
+    p = resolve_log_dir(log_dir)
+    q = make_query(limit, cursor, fields, severity=severity)
+    return await _offload_versioned(
+        "explain_all_attack_paths", p, if_changed_since, q,
+        _safe, _paged, "explain_all_attack_paths", q, explain_all_attack_paths, p,
     )
 
 
 @mcp.tool(name="get_php_vulnerabilities")
-def get_php_vulnerabilities(ctx: Context,log_dir: str) -> dict:
-    return _safe(parse_php_vulnerabilities, resolve_log_dir(log_dir))
+async def get_php_vulnerabilities(
+    ctx: Context,
+    log_dir: str,
+    limit: int = 0,
+    cursor: str = "",
+    severity: str = "",
+    engine: str = "",
+    path_prefix: str = "",
+    fields: str = "",
+    absolute_paths: bool = False,
+    if_changed_since: str = "",
+) -> dict:
+    p = resolve_log_dir(log_dir)
+    q = make_query(limit, cursor, fields, absolute_paths=absolute_paths, severity=severity, engine=engine, path_prefix=path_prefix)
+    return await _offload_versioned(
+        "get_php_vulnerabilities", p, if_changed_since, q,
+        _safe, _paged, "get_php_vulnerabilities", q, parse_php_vulnerabilities, p,
+    )
+
+
+@mcp.tool(name="get_cache_stats")
+async def get_cache_stats(ctx: Context) -> dict:
+    return cache_stats()
 
 
 
 # -------------------------------------------------
 # Scan lifecycle tools
 # --------------------------------------------------
+# Registry queries are cheap and answered directly on the event loop,
+# even while analysis tools are busy on the executor. Starting a scan
+# (admission checks, process spawn) runs on the executor.
 
 @mcp.tool(name="run_emba_scan")
-def run_emba_scan(ctx: Context, firmware_path: str, log_base_dir: str, force_overwrite: bool = False) -> dict:
-    return start_emba_scan(
-        firmware_path=Path(firmware_path),
-        base_log_dir=Path(log_base_dir),
-        force_overwrite=force_overwrite,
+async def run_emba_scan(
+    ctx: Context,
+    firmware_path: str,
+    log_base_dir: str,
+    force_overwrite: bool = False,
+    priority: int = 0,
+) -> dict:
+    # Registry flock, admission checks and the EMBA spawn all block
+    return await _offload(
+        "run_emba_scan",
+        functools.partial(
+            start_emba_scan,
+            firmware_path=Path(firmware_path),
+            base_log_dir=Path(log_base_dir),
+            force_overwrite=force_overwrite,
+            priority=priority,
+        ),
     )
 
 
 @mcp.tool(name="get_emba_scan_status")
-def get_emba_scan_status(ctx: Context, scan_id: str) -> dict:
+async def get_emba_scan_status(ctx: Context, scan_id: str) -> dict:
+    """
+    Scan state. While running, "progress" holds percent complete, the
+    current module, per-module durations and estimated_finish_at.
+    """
     return get_scan(scan_id)
 
 
 @mcp.tool(name="list_emba_scans")
-def list_emba_scans_tool(ctx: Context) -> dict:
+async def list_emba_scans_tool(ctx: Context) -> dict:
     return list_scans()
 
 
 @mcp.tool(name="stop_emba_scan")
-def stop_emba_scan_tool(ctx: Context, scan_id: str) -> dict:
+async def stop_emba_scan_tool(ctx: Context, scan_id: str) -> dict:
     return stop_scan(scan_id)
 
+
+@mcp.tool(name="get_emba_scan_queue")
+async def get_emba_scan_queue(ctx: Context) -> dict:
+    return queue_snapshot()
+
+
+# Long polls block a thread each: they get their own pool so they can
+# never hold up analysis tools.
+WAIT_WORKERS = int(os.getenv("EMBA_MCP_WAIT_WORKERS", "16"))
+
+_WAIT_EXECUTOR = ThreadPoolExecutor(
+    max_workers=WAIT_WORKERS,
+    thread_name_prefix="emba-wait",
+)
+
+
+@mcp.tool(name="wait_for_emba_scan")
+async def wait_for_emba_scan(
+    ctx: Context,
+    scan_id: str,
+    timeout: float = 60.0,
+    until_status: str = "",
+) -> dict:
+    """
+    Long poll: returns as soon as the scan's status or progress changes
+    (or, with until_status e.g. "finished,failed", once it reaches one of
+    those statuses or ends), else after timeout seconds (capped by
+    EMBA_MCP_MAX_WAIT_SECONDS).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _WAIT_EXECUTOR,
+        functools.partial(wait_for_scan, scan_id, timeout, until_status or None),
+    )
+
+
+@mcp.tool(name="tail_emba_scan_output")
+async def tail_emba_scan_output(
+    ctx: Context,
+    scan_id: str,
+    offset: int = -1,
+    limit: int = 200,
+) -> dict:
+    """
+    EMBA console output of a scan (stderr lines prefixed "[stderr] ").
+    offset < 0 returns the last `limit` lines; pass next_offset back to
+    read incrementally. Only the most recent lines are held in memory:
+    older ones are counted in "missed" and remain in log_file.
+    """
+    # Rebuilding another process's buffer reads its log file
+    return await _offload("tail_emba_scan_output", _tail_output, scan_id, offset, limit)
+
+
+def _tail_output(scan_id: str, offset: int, limit: int) -> dict:
+    scan = get_scan(scan_id)
+    if "error" in scan and "scan_id" not in scan:
+        return scan
+
+    output = get_output(scan_id)
+    if output is None:
+        return {"scan_id": scan_id, "status": scan["status"], "error": "no output captured yet"}
+
+    return {
+        "scan_id": scan_id,
+        "status": scan["status"],
+        **output.tail(offset, max(1, limit)),
+    }
+
 # --------------------------------------------------
 if __name__ == "__main__":
+    SCHEDULER.start()     # resume scans left queued by an earlier run
     mcp.run()
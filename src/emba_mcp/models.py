@@ -1,13 +1,64 @@
-from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass, field, fields
+from typing import Any, ClassVar, Dict, Iterator, List, Optional, Tuple, Union
+
+
+# -----------------------------
+# Base
+# -----------------------------
+
+class Record:
+    """
+    Base for result models: slotted dataclasses with read-only mapping
+    access, so a cached model instance and its decoded dict form (from
+    the persistent store) are interchangeable for consumers.
+    Serialization lives in emba_mcp.serialize.
+    """
+    __slots__ = ()
+
+    # Omit None-valued fields when serializing (records whose variants
+    # carry different fields)
+    SPARSE: ClassVar[bool] = False
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in record_fields(type(self)):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        # Sparse records hold a None field only in their object form
+        if key not in record_fields(type(self)):
+            return False
+        return not self.SPARSE or getattr(self, key) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in record_fields(type(self)):
+            return default
+        return getattr(self, key)
+
+    def keys(self) -> Iterator[str]:
+        return (k for k in record_fields(type(self)) if k in self)
+
+
+_FIELDS: Dict[type, Tuple[str, ...]] = {}
+
+
+def record_fields(cls: type) -> Tuple[str, ...]:
+    """
+    Data field names of a record class, in order (ClassVars such as
+    SPARSE excluded).
+    """
+    names = _FIELDS.get(cls)
+    if names is None:
+        names = _FIELDS[cls] = tuple(f.name for f in fields(cls))
+    return names
 
 
 # -----------------------------
 # Core Identification Models
 # -----------------------------
 
-@dataclass
-class DistributionInfo:
+@dataclass(slots=True)
+class DistributionInfo(Record):
     vendor: Optional[str] = None
     device: Optional[str] = None
     name: Optional[str] = None
@@ -18,8 +69,8 @@ class DistributionInfo:
     raw: Optional[str] = None
 
 
-@dataclass
-class KernelInfo:
+@dataclass(slots=True)
+class KernelInfo(Record):
     kernel_version: Optional[str] = None
     architecture: Optional[str] = None
     compiler: Optional[str] = None
@@ -30,8 +81,8 @@ class KernelInfo:
     raw: Optional[str] = None
 
 
-@dataclass
-class BootloaderInfo:
+@dataclass(slots=True)
+class BootloaderInfo(Record):
     name: Optional[str] = None
     version: Optional[str] = None
     type: Optional[str] = None   # u-boot, barebox, redboot, etc
@@ -44,8 +95,8 @@ class BootloaderInfo:
 # Filesystem / SBOM
 # -----------------------------
 
-@dataclass
-class FilesystemSummary:
+@dataclass(slots=True)
+class FilesystemSummary(Record):
     root: Optional[str]
     file_count: int
     directory_count: int
@@ -53,15 +104,15 @@ class FilesystemSummary:
     confidence: str = "unknown"
 
 
-@dataclass
-class SBOMPackage:
+@dataclass(slots=True)
+class SBOMPackage(Record):
     name: str
     version: Optional[str] = None
     source: Optional[str] = None
 
 
-@dataclass
-class SBOMSummary:
+@dataclass(slots=True)
+class SBOMSummary(Record):
     package_count: int
     packages: List[SBOMPackage] = field(default_factory=list)
     confidence: str = "unknown"
@@ -72,57 +123,88 @@ class SBOMSummary:
 # Security Findings
 # -----------------------------
 
-@dataclass
-class CredentialFinding:
+@dataclass(slots=True)
+class CredentialFinding(Record):
     path: str
     type: str                 # passwd, shadow, ssh_key, config, etc
     detail: Optional[str] = None
 
 
-@dataclass
-class PermissionIssue:
+@dataclass(slots=True)
+class PermissionIssue(Record):
     path: str
     issue: str                # suid, sgid, world-writable
     severity: str = "medium"
 
 
-@dataclass
-class NetworkService:
+@dataclass(slots=True)
+class NetworkService(Record):
     service: str              # http, ssh, telnet
     port: Optional[int]
     config_path: Optional[str] = None
 
 
-@dataclass
-class WeakCryptoFinding:
+@dataclass(slots=True)
+class WeakCryptoFinding(Record):
     path: str
     issue: str                # hardcoded key, weak cert, md5, etc
     severity: str = "high"
 
 
-@dataclass
-class BinaryProtection:
+@dataclass(slots=True)
+class BinaryProtection(Record):
     binary: str
-    nx: Optional[bool]
-    pie: Optional[bool]
-    relro: Optional[str]
-    canary: Optional[bool]
+    nx: Union[bool, str] = "unknown"
+    pie: Union[bool, str] = "unknown"
+    relro: str = "unknown"               # full | none | unknown
+    stack_canary: Union[bool, str] = "unknown"
 
 
-@dataclass
-class WeakFunctionFinding:
-    binary: str
+@dataclass(slots=True)
+class WeakFunctionFinding(Record):
+    SPARSE: ClassVar[bool] = True
+
     function: str
-    count: int
-    analysis: str             # intense | radare
+    binary: str
+    mode: str                 # intense | radare
+    confidence: str = "raw"   # EMBA confidence, unmodified
+    source: str = ""
+    truncated: Optional[bool] = None    # source line cut at the rule line cap
+
+
+@dataclass(slots=True)
+class InterestingFile(Record):
+    file: str
+    reason: str
+    confidence: str = "medium"
+
+
+@dataclass(slots=True)
+class PasswordFileHit(Record):
+    file: str
+    reason: str
+    source: str = ""
+
+
+@dataclass(slots=True, kw_only=True)
+class PHPFinding(Record):
+    SPARSE: ClassVar[bool] = True
+
+    type: str                 # code_vulnerability | configuration_issue | ...
+    engine: str               # semgrep | progpilot | php_ini | phpinfo
+    rule: Optional[str] = None
+    file: Optional[str] = None
+    setting: Optional[str] = None
+    evidence: Optional[str] = None
+    severity: str
 
 
 # -----------------------------
 # Phase 2 – Correlation Layer
 # -----------------------------
 
-@dataclass
-class HighRiskFinding:
+@dataclass(slots=True)
+class HighRiskFinding(Record):
     title: str
     description: str
     severity: str             # critical / high
@@ -131,8 +213,8 @@ class HighRiskFinding:
     confidence: str = "medium"
 
 
-@dataclass
-class AttackPath:
+@dataclass(slots=True)
+class AttackPath(Record):
     entry_point: str
     preconditions: List[str]
     exploitation_steps: List[str]
@@ -0,0 +1,37 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+import os
+
+# --------------------------------------------------
+# Worker pools for rootfs walk-and-scan
+# --------------------------------------------------
+
+def _available_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Worker count for both the I/O thread pool and the CPU process pool
+WORKERS = max(1, int(os.getenv("EMBA_MCP_WORKERS", str(_available_cpus()))))
+
+# Below this many candidate files a process pool costs more than it saves
+PROCESS_POOL_MIN_FILES = int(os.getenv("EMBA_MCP_PROCESS_POOL_MIN_FILES", "512"))
+
+
+def io_pool(workers: int = WORKERS) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="emba-io")
+
+
+def cpu_pool(workers: int = WORKERS) -> ProcessPoolExecutor:
+    """
+    Process pool for regex work. Uses forkserver where available: the MCP
+    server is multi-threaded, and forking it directly is unsafe.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    method = "forkserver" if "forkserver" in methods else "spawn"
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(method),
+    )
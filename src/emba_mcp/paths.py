@@ -0,0 +1,36 @@
+from pathlib import Path
+from typing import Optional
+
+# --------------------------------------------------
+# Compact path notation
+# --------------------------------------------------
+# Parser outputs never repeat long absolute prefixes. Two forms are used:
+#   "/etc/passwd"                    rootfs path, relative to filesystem_root
+#   "s13_weak_func_check/s13.txt"    EMBA artifact, relative to log_dir
+#                                    (Artifact.rel, see emba_mcp.catalog)
+# Absolute paths are rebuilt on request only (expand_path).
+
+
+def expand_path(p: str, log_dir: Path, fs_root: Optional[Path]) -> str:
+    """
+    Absolute form of a compact path.
+    """
+    if not p:
+        return p
+    if p.startswith("/"):
+        if fs_root is None or p.startswith(str(fs_root) + "/"):
+            return p
+        return str(fs_root).rstrip("/") + p
+    return str(log_dir / p)
+
+
+def rootfs_path(p: str, fs_root: Optional[str]) -> str:
+    """
+    Rootfs form of a path EMBA reported either way: "/bin/busybox" or
+    "<fs_root>/bin/busybox". Only the exact extraction root is removed.
+    """
+    if fs_root:
+        root = str(fs_root).rstrip("/")
+        if p.startswith(root + "/"):
+            return p[len(root):]
+    return p
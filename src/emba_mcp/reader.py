@@ -0,0 +1,267 @@
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any, Callable, Generator, Iterable, Iterator, List, Optional, Tuple
+import mmap
+import os
+import re
+
+# --------------------------------------------------
+# Size-capped, memory-mapped file access
+# --------------------------------------------------
+
+# Per-file budget for content scans; larger files only get their head
+# and tail scanned.
+SCAN_BYTES_BUDGET = int(os.getenv("EMBA_MCP_SCAN_BYTES_BUDGET", str(4 * 1024 * 1024)))
+
+# Cap for files that are decoded into str (passwd and similar)
+TEXT_READ_LIMIT = int(os.getenv("EMBA_MCP_TEXT_READ_LIMIT", str(1024 * 1024)))
+
+
+def scan_windows(size: int, budget: int = SCAN_BYTES_BUDGET) -> Tuple[List[Tuple[int, int]], bool]:
+    """
+    Byte ranges to scan for a file of the given size, and whether the
+    file is truncated (only head and tail windows are covered).
+    """
+    if size <= budget:
+        return [(0, size)], False
+
+    head = budget // 2
+    tail = budget - head
+    return [(0, head), (size - tail, size)], True
+
+
+@contextmanager
+def mapped(path: Path) -> Iterator[bytes]:
+    """
+    Map a file read-only. Empty files yield b"" (mmap rejects them).
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            yield b""
+            return
+
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+
+def read_text_capped(path: Path, limit: int = TEXT_READ_LIMIT) -> str:
+    """
+    Decode at most `limit` bytes of a file. Never raises.
+    """
+    try:
+        with open(path, "rb") as f:
+            return f.read(limit).decode(errors="ignore")
+    except Exception:
+        return ""
+
+
+# --------------------------------------------------
+# Streaming line reader
+# --------------------------------------------------
+# EMBA logs (s13/s14 in particular) can run to hundreds of MB. They are
+# read one line at a time and fed to extractors: generators that receive
+# lines with `line = yield`, get None at end of input, and return their
+# result. An extractor may return early once it has its answer; reading
+# stops as soon as no extractor wants more lines.
+
+# Longest line handed to extractors; the rest of a longer line is skipped
+LINE_LIMIT = int(os.getenv("EMBA_MCP_LINE_LIMIT", str(64 * 1024)))
+
+Extractor = Generator[None, Optional[str], Any]
+
+
+def iter_lines(path: Path, limit: int = LINE_LIMIT) -> Iterator[str]:
+    """
+    Decoded lines of a file without line endings, in constant memory.
+    Unreadable files yield nothing.
+    """
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return
+
+    with f:
+        while True:
+            line = f.readline(limit)
+            if not line:
+                return
+
+            if not line.endswith(b"\n"):
+                # Over-long line: drop the remainder
+                while True:
+                    rest = f.readline(limit)
+                    if not rest or rest.endswith(b"\n"):
+                        break
+
+            yield line.decode(errors="ignore").rstrip("\r\n")
+
+
+def feed_lines(lines: Iterable[str], *extractors: Extractor) -> List[Any]:
+    """
+    Run extractors over one pass of `lines`; returns their results in
+    order. Stops consuming lines once every extractor has returned.
+    """
+    results: List[Any] = [None] * len(extractors)
+    live = []
+    for i, gen in enumerate(extractors):
+        try:
+            next(gen)
+            live.append((i, gen))
+        except StopIteration as done:
+            results[i] = done.value
+
+    for line in lines if live else ():
+        finished = None
+        for i, gen in live:
+            try:
+                gen.send(line)
+            except StopIteration as done:
+                results[i] = done.value
+                finished = (finished or set()) | {i}
+        if finished:
+            live = [(i, gen) for i, gen in live if i not in finished]
+            if not live:
+                break
+
+    # End of input
+    for i, gen in live:
+        try:
+            gen.send(None)
+        except StopIteration as done:
+            results[i] = done.value
+        else:
+            gen.close()
+            raise RuntimeError("Line extractor did not finish at end of input")
+
+    return results
+
+
+def _chain_lines(paths: Iterable[Path]) -> Iterator[str]:
+    for path in paths:
+        with closing(iter_lines(path)) as lines:
+            yield from lines
+
+
+def extract_files(paths: Iterable[Path], *extractors: Extractor) -> List[Any]:
+    """
+    feed_lines() over the files in order, as one stream; files are
+    closed on early stop.
+    """
+    with closing(_chain_lines(paths)) as lines:
+        return feed_lines(lines, *extractors)
+
+
+def collect(parse: Callable[[str], Any]) -> Extractor:
+    """
+    Extractor collecting parse(line) for every line where it is not None.
+    """
+    items = []
+    while (line := (yield)) is not None:
+        item = parse(line)
+        if item is not None:
+            items.append(item)
+    return items
+
+
+def first(parse: Callable[[str], Any]) -> Extractor:
+    """
+    Extractor for the first non-None parse(line); returns right away.
+    """
+    while (line := (yield)) is not None:
+        item = parse(line)
+        if item is not None:
+            return item
+    return None
+
+
+def best_match(patterns: List[Tuple[str, re.Pattern]]) -> Extractor:
+    """
+    Extractor for the name of the highest-ranked (earliest-listed)
+    pattern found on any line. Returns as soon as the first one is seen.
+    """
+    best = len(patterns)
+    while best and (line := (yield)) is not None:
+        for rank in range(best):
+            if patterns[rank][1].search(line):
+                best = rank
+                break
+    return patterns[best][0] if best < len(patterns) else None
+
+
+# --------------------------------------------------
+# Content sniffing (magic numbers / text heuristics)
+# --------------------------------------------------
+
+SNIFF_BYTES = 4096
+
+# Checked in order; first prefix match wins
+MAGIC_NUMBERS = [
+    (b"\x7fELF", "elf"),
+    (b"\x1f\x8b", "gzip"),
+    (b"hsqs", "squashfs"),
+    (b"sqsh", "squashfs"),
+    (b"\x85\x19", "jffs2"),
+    (b"\x19\x85", "jffs2"),
+    (b"UBI#", "ubi"),
+    (b"\x45\x3d\xcd\x28", "cramfs"),
+    (b"\x28\xcd\x3d\x45", "cramfs"),
+    (b"\x27\x05\x19\x56", "uimage"),
+    (b"\xd0\x0d\xfe\xed", "device_tree"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"BZh", "bzip2"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+    (b"\x04\x22\x4d\x18", "lz4"),
+    (b"7z\xbc\xaf\x27\x1c", "7z"),
+    (b"PK\x03\x04", "zip"),
+    (b"070701", "cpio"),
+    (b"070702", "cpio"),
+    (b"070707", "cpio"),
+    (b"SQLite format 3\x00", "sqlite"),
+    (b"\x89PNG", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"GIF8", "gif"),
+]
+
+# Bytes that may appear in text files (printable ASCII, common control
+# characters, and anything >= 0x80 so UTF-8 passes).
+_TEXT_BYTES = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
+
+
+def classify_bytes(head: bytes) -> str:
+    """
+    Classify a file from its first bytes: a magic-number name, "text",
+    "binary" or "empty".
+    """
+    if not head:
+        return "empty"
+
+    for magic, name in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return name
+
+    if b"\x00" in head:
+        return "binary"
+
+    # More than 10% non-text bytes -> binary
+    if len(head.translate(None, _TEXT_BYTES)) * 10 > len(head):
+        return "binary"
+
+    return "text"
+
+
+def sniff_file(path: str) -> str:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return "unreadable"
+
+    try:
+        return classify_bytes(os.read(fd, SNIFF_BYTES))
+    except OSError:
+        return "unreadable"
+    finally:
+        os.close(fd)
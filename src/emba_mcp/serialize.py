@@ -0,0 +1,94 @@
+from pathlib import Path
+from typing import Any, Dict
+import json
+
+from emba_mcp.models import Record, record_fields
+
+# --------------------------------------------------
+# Single serialization path for results
+# --------------------------------------------------
+# Parsers return plain containers holding Record instances. They are
+# turned into JSON types here, and only here: for the persistent store
+# (dumps) and at the MCP tool boundary (to_plain).
+
+def record_to_dict(obj: Record) -> Dict[str, Any]:
+    names = record_fields(type(obj))
+    if obj.SPARSE:
+        out = {}
+        for n in names:
+            v = getattr(obj, n)
+            if v is not None:
+                out[n] = v
+        return out
+    return {n: getattr(obj, n) for n in names}
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Record):
+        return record_to_dict(obj)
+    if isinstance(obj, Path):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(value: Any) -> str:
+    """
+    Compact JSON; records are expanded by the C encoder's default hook,
+    so plain data never goes through Python code.
+    """
+    return json.dumps(value, default=_default, separators=(",", ":"))
+
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def to_plain(value: Any) -> Any:
+    """
+    JSON-ready form of a result (records -> dicts), for the tool
+    boundary. Containers holding no records are returned unchanged.
+    """
+    if isinstance(value, _SCALARS):
+        return value
+
+    if isinstance(value, Record):
+        out = record_to_dict(value)
+        for k, v in out.items():
+            if not isinstance(v, _SCALARS):
+                out[k] = to_plain(v)
+        return out
+
+    if isinstance(value, dict):
+        out = None
+        for k, v in value.items():
+            if isinstance(v, _SCALARS):
+                continue
+            pv = to_plain(v)
+            if pv is not v:
+                if out is None:
+                    out = dict(value)
+                out[k] = pv
+        return value if out is None else out
+
+    if isinstance(value, (list, tuple)):
+        # Every item is checked: a list may start with scalars or None
+        # and hold records further on. Converted tuples become lists.
+        out = None
+        for i, v in enumerate(value):
+            if isinstance(v, _SCALARS):
+                continue
+            pv = to_plain(v)
+            if pv is not v:
+                if out is None:
+                    out = list(value)
+                out[i] = pv
+        return value if out is None else out
+
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+
+    if isinstance(value, Path):
+        return str(value)
+
+    return value
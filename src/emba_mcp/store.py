@@ -0,0 +1,154 @@
+from pathlib import Path
+from typing import Any, Iterable, Optional, Tuple
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+from emba_mcp.emba_runner.config import STATE_DIR
+from emba_mcp.serialize import dumps
+
+# --------------------------------------------------
+# Persistent parse-result store
+# --------------------------------------------------
+# One SQLite file shared by every emba-mcp process (one stdio server per
+# MCP client). WAL mode lets readers proceed while another process writes.
+
+STORE_FILE = STATE_DIR / "parse_cache.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    log_dir     TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    payload     BLOB NOT NULL,
+    created_at  REAL NOT NULL,
+    PRIMARY KEY (log_dir, name)
+);
+CREATE TABLE IF NOT EXISTS inventories (
+    root        TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    payload     BLOB NOT NULL,
+    created_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS content_scans (
+    digest      TEXT NOT NULL,
+    scanner     TEXT NOT NULL,
+    payload     BLOB NOT NULL,
+    PRIMARY KEY (digest, scanner)
+);
+"""
+
+
+def _encode_sized(value: Any) -> Tuple[bytes, int]:
+    """
+    Compressed payload plus the length of its JSON encoding.
+    """
+    raw = dumps(value).encode()
+    return zlib.compress(raw, 1), len(raw)
+
+
+def _encode(value: Any) -> bytes:
+    return _encode_sized(value)[0]
+
+
+def _decode(blob: bytes) -> Any:
+    return json.loads(zlib.decompress(blob))
+
+
+class ResultStore:
+    """
+    Small key/value store on top of SQLite.
+    Every entry carries the fingerprint it was computed from; a lookup
+    with a different fingerprint is a miss.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # ---- parser results ----
+
+    # Both return the JSON-encoded size, which the in-process LRU charges
+
+    def get_result(
+        self, log_dir: str, name: str, fingerprint: str,
+    ) -> Optional[Tuple[Any, int]]:
+        row = self._conn().execute(
+            "SELECT fingerprint, payload FROM results WHERE log_dir = ? AND name = ?",
+            (log_dir, name),
+        ).fetchone()
+        if not row or row[0] != fingerprint:
+            return None
+        raw = zlib.decompress(row[1])
+        return json.loads(raw), len(raw)
+
+    def put_result(self, log_dir: str, name: str, fingerprint: str, value: Any) -> int:
+        payload, size = _encode_sized(value)
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (log_dir, name, fingerprint, payload, time.time()),
+            )
+        return size
+
+    # ---- rootfs inventories ----
+
+    def get_inventory(self, root: str, fingerprint: str) -> Optional[Any]:
+        row = self._conn().execute(
+            "SELECT fingerprint, payload FROM inventories WHERE root = ?",
+            (root,),
+        ).fetchone()
+        if not row or row[0] != fingerprint:
+            return None
+        return _decode(row[1])
+
+    def put_inventory(self, root: str, fingerprint: str, value: Any):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO inventories VALUES (?, ?, ?, ?)",
+                (root, fingerprint, _encode(value), time.time()),
+            )
+
+    # ---- content scans (shared across firmware images) ----
+
+    def get_content_scan(self, digest: str, scanner: str) -> Optional[Any]:
+        row = self._conn().execute(
+            "SELECT payload FROM content_scans WHERE digest = ? AND scanner = ?",
+            (digest, scanner),
+        ).fetchone()
+        return _decode(row[0]) if row else None
+
+    def put_content_scans(self, scanner: str, items: Iterable[Tuple[str, Any]]):
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO content_scans VALUES (?, ?, ?)",
+                ((digest, scanner, _encode(value)) for digest, value in items),
+            )
+
+
+_STORE: Optional[ResultStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> ResultStore:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = ResultStore(STORE_FILE)
+        return _STORE
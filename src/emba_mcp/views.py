@@ -0,0 +1,358 @@
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+import base64
+import hashlib
+import json
+import os
+import sys
+import threading
+
+from emba_mcp.cache import memoized
+from emba_mcp.models import Record
+from emba_mcp.paths import expand_path
+from emba_mcp.serialize import to_plain
+
+# --------------------------------------------------
+# List views: pagination, filtering, field projection
+# --------------------------------------------------
+# Tool results are cached whole; list tools serve pages out of them.
+# Each list is indexed once per (tool, log_dir, fingerprint): sorted where
+# that helps prefix lookups, and filtered selections are kept per query,
+# so paging never re-runs a parser or re-filters.
+
+DEFAULT_PAGE_SIZE = int(os.getenv("EMBA_MCP_PAGE_SIZE", "200"))
+MAX_PAGE_SIZE = int(os.getenv("EMBA_MCP_MAX_PAGE_SIZE", "5000"))
+
+FILTERS = ("severity", "path_prefix", "engine", "mode")
+
+# Filtered selections kept per list index
+_MAX_SELECTIONS = 32
+
+
+class ListSpec(NamedTuple):
+    path: Tuple[str, ...]       # keys leading to the list (or dict) in the result
+    key: str = ""               # item field for path_prefix / sorting ("" = the item itself)
+    sort: bool = False          # pre-sort by key (else keep parser order)
+    filters: Tuple[str, ...] = ("path_prefix",)
+    paths: str = ""             # compact paths held by the list: "item", "key", "values" or ""
+
+
+class Query(NamedTuple):
+    limit: int
+    cursor: str
+    filters: Dict[str, str]     # only the filters that were set
+    fields: Tuple[str, ...]     # item fields to keep (empty = all)
+    absolute_paths: bool        # expand compact paths on the served page
+
+
+def make_query(
+    limit: int = 0,
+    cursor: str = "",
+    fields: str = "",
+    absolute_paths: bool = False,
+    **filters: str,
+) -> Query:
+    if limit <= 0:
+        limit = DEFAULT_PAGE_SIZE
+    return Query(
+        limit=min(limit, MAX_PAGE_SIZE),
+        cursor=cursor or "",
+        filters={k: v for k, v in filters.items() if v},
+        fields=tuple(f.strip() for f in fields.split(",") if f.strip()),
+        absolute_paths=bool(absolute_paths),
+    )
+
+
+# Lists each tool pages over. Dicts (e.g. weak_algorithms: path -> algos)
+# are paged as (key, value) pairs and rebuilt as dicts. `paths` marks
+# lists holding compact paths (see emba_mcp.paths), expanded when the
+# query asks for absolute_paths.
+VIEWS: Dict[str, List[ListSpec]] = {
+    "get_sbom": [
+        ListSpec(("packages",), key="source"),
+        ListSpec(("sources",), sort=True, paths="item"),
+    ],
+    "get_interesting_files": [
+        ListSpec(("findings",), key="file", sort=True),
+        ListSpec(("sources",), sort=True, paths="item"),
+    ],
+    "get_credentials_and_secrets": [
+        ListSpec(("sources",), sort=True, paths="item"),
+        ListSpec(("summary", "config_files"), sort=True, paths="item"),
+        ListSpec(("summary", "backup_files"), sort=True, paths="item"),
+        ListSpec(("summary", "ssh_keys"), sort=True, paths="item"),
+        ListSpec(("summary", "users"), key="user", filters=()),
+        ListSpec(("truncated_scans",), sort=True, paths="item"),
+    ],
+    "get_permissions_issues": [
+        ListSpec(("summary", "suid_binaries"), sort=True, paths="item"),
+        ListSpec(("summary", "sgid_binaries"), sort=True, paths="item"),
+        ListSpec(("summary", "world_writable_files"), sort=True, paths="item"),
+        ListSpec(("summary", "world_writable_dirs"), sort=True, paths="item"),
+    ],
+    "get_network_services": [
+        ListSpec(("evidence",), filters=(), paths="values"),
+        ListSpec(("truncated_scans",), sort=True, paths="item"),
+    ],
+    "get_weak_crypto_and_keys": [
+        ListSpec(("sources",), sort=True, paths="item"),
+        ListSpec(("summary", "weak_algorithms"), sort=True, paths="key"),
+        ListSpec(("summary", "private_keys"), sort=True, paths="item"),
+        ListSpec(("summary", "certificates"), sort=True, paths="item"),
+        ListSpec(("summary", "hardcoded_secrets"), sort=True, paths="item"),
+        ListSpec(("truncated_scans",), sort=True, paths="item"),
+    ],
+    "get_binary_protection_mechanisms": [
+        ListSpec(("binaries",), key="binary", sort=True),
+        ListSpec(("sources",), sort=True, paths="item"),
+    ],
+    "get_weak_functions": [
+        ListSpec(("intense",), key="binary", sort=True, filters=("path_prefix", "mode")),
+        ListSpec(("radare",), key="binary", sort=True, filters=("path_prefix", "mode")),
+        ListSpec(("sources",), sort=True, paths="item"),
+    ],
+    "search_password_files": [
+        ListSpec(("files",), key="file", sort=True),
+        ListSpec(("sources",), sort=True, paths="item"),
+    ],
+    "get_php_vulnerabilities": [
+        ListSpec(("findings",), key="file", filters=("path_prefix", "severity", "engine")),
+        ListSpec(("sources",), sort=True, paths="item"),
+    ],
+    "get_high_risk_findings": [
+        # Rule order is meaningful; never re-sorted
+        ListSpec(("findings",), filters=("severity",)),
+    ],
+    "explain_all_attack_paths": [
+        ListSpec(("attack_paths",), filters=("severity",)),
+    ],
+}
+
+
+# --------------------------------------------------
+# Per-list index
+# --------------------------------------------------
+
+def _item_value(item: Any, field: str) -> Any:
+    if isinstance(item, tuple):         # (key, value) pair of a paged dict
+        return item[0] if not field else _item_value(item[1], field)
+    if not field:
+        return item
+    return item.get(field) if isinstance(item, (dict, Record)) else None
+
+
+_PAIR_BYTES = sys.getsizeof(("", None))
+
+
+class ListIndex:
+    """
+    One list of a tool result, pre-sorted when its spec asks for it.
+    Filtered selections are memoized per filter set.
+    """
+
+    def __init__(self, spec: ListSpec, container: Any):
+        self.spec = spec
+        self.is_dict = isinstance(container, dict)
+
+        items = list(container.items()) if self.is_dict else list(container or [])
+        if spec.sort:
+            items.sort(key=lambda i: str(_item_value(i, spec.key) or ""))
+            self.keys: Optional[List[str]] = [str(_item_value(i, spec.key) or "") for i in items]
+        else:
+            self.keys = None
+
+        self.items = items
+        self._selections: Dict[Tuple, List] = {}
+        self._lock = threading.Lock()
+
+    def approx_bytes(self) -> int:
+        """
+        Own memory only: items are shared with the cached result. Dict
+        lists add one (key, value) tuple per item.
+        """
+        size = sys.getsizeof(self.items)
+        if self.keys is not None:
+            size += sys.getsizeof(self.keys)
+        if self.is_dict:
+            size += len(self.items) * _PAIR_BYTES
+        return size
+
+    def select(self, filters: Dict[str, str]) -> List:
+        applicable = tuple(sorted(
+            (k, v) for k, v in filters.items() if k in self.spec.filters
+        ))
+        if not applicable:
+            return self.items
+
+        with self._lock:
+            selection = self._selections.get(applicable)
+        if selection is not None:
+            return selection
+
+        items = self.items
+        wanted = dict(applicable)
+
+        prefix = wanted.pop("path_prefix", None)
+        if prefix is not None:
+            if self.keys is not None:
+                # Sorted: the prefix range is contiguous
+                lo = bisect_left(self.keys, prefix)
+                hi = lo
+                while hi < len(items) and self.keys[hi].startswith(prefix):
+                    hi += 1
+                items = items[lo:hi]
+            else:
+                items = [
+                    i for i in items
+                    if str(_item_value(i, self.spec.key) or "").startswith(prefix)
+                ]
+
+        for field, value in wanted.items():
+            items = [i for i in items if _item_value(i, field) == value]
+
+        with self._lock:
+            if len(self._selections) >= _MAX_SELECTIONS:
+                self._selections.pop(next(iter(self._selections)))
+            self._selections[applicable] = items
+        return items
+
+
+def _lookup(result: Dict, path: Tuple[str, ...]) -> Any:
+    node: Any = result
+    for key in path:
+        if not isinstance(node, dict):
+            return None
+        node = node.get(key)
+    return node
+
+
+def _build_indexes(tool: str, result: Dict) -> Dict[Tuple[str, ...], ListIndex]:
+    indexes = {}
+    for spec in VIEWS.get(tool, []):
+        container = _lookup(result, spec.path)
+        if isinstance(container, (list, dict)):
+            indexes[spec.path] = ListIndex(spec, container)
+    return indexes
+
+
+# --------------------------------------------------
+# Cursors
+# --------------------------------------------------
+
+def _query_hash(tool: str, query: Query) -> str:
+    h = hashlib.blake2b(digest_size=6)
+    h.update(repr((tool, sorted(query.filters.items()))).encode())
+    return h.hexdigest()
+
+
+def _encode_cursor(offsets: Dict[str, int], qhash: str) -> str:
+    raw = json.dumps({"o": offsets, "q": qhash}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, qhash: str) -> Dict[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError("Malformed cursor")
+
+    if data.get("q") != qhash:
+        raise ValueError("Cursor does not belong to this query (filters changed)")
+    return {k: int(v) for k, v in data.get("o", {}).items()}
+
+
+# --------------------------------------------------
+# Page assembly
+# --------------------------------------------------
+
+def _project(item: Any, fields: Tuple[str, ...]) -> Any:
+    if not fields:
+        return item
+    if isinstance(item, tuple):
+        return (item[0], _project(item[1], fields))
+    if isinstance(item, Record):
+        # Same keys as the decoded dict form of a store hit
+        item = to_plain(item)
+    if isinstance(item, dict):
+        return {k: item[k] for k in fields if k in item}
+    return item
+
+
+def _expand(item: Any, mode: str, expand: Callable[[str], str]) -> Any:
+    if mode == "item":
+        return expand(item) if isinstance(item, str) else item
+    if mode == "key":
+        return (expand(item[0]), item[1])
+    if mode == "values":
+        return (item[0], [expand(p) for p in item[1]])
+    return item
+
+
+def _replace(result: Dict, path: Tuple[str, ...], value: Any) -> Dict:
+    """
+    Copy-on-write along `path`: the cached result is never mutated.
+    """
+    head, rest = path[0], path[1:]
+    out = dict(result)
+    out[head] = _replace(result[head], rest, value) if rest else value
+    return out
+
+
+def apply_view(tool: str, log_dir: Path, result: Any, query: Query) -> Any:
+    """
+    Page, filter and project the lists of a tool result.
+    Every list declared for the tool is cut to `limit` items from its own
+    offset; one cursor carries all offsets. Adds a "page" block.
+    Compact paths are expanded on the served page only, on request.
+    """
+    if not isinstance(result, dict) or "error" in result or tool not in VIEWS:
+        return result
+
+    if result.get("partial"):
+        indexes = _build_indexes(tool, result)     # not cached: see cached_result
+    else:
+        indexes = memoized(
+            f"view:{tool}", log_dir, lambda: _build_indexes(tool, result),
+            size=lambda built: sum(i.approx_bytes() for i in built.values()),
+        )
+
+    qhash = _query_hash(tool, query)
+    offsets = _decode_cursor(query.cursor, qhash) if query.cursor else {}
+
+    page = result
+    totals: Dict[str, int] = {}
+    next_offsets: Dict[str, int] = {}
+
+    expand = None
+    if query.absolute_paths:
+        fs_root = result.get("filesystem_root")
+        fs_root = Path(fs_root) if fs_root else None
+        expand = lambda p: expand_path(p, log_dir, fs_root)
+
+    for path, index in indexes.items():
+        name = ".".join(path)
+        selection = index.select(query.filters)
+        if query.cursor and name not in offsets:
+            start = len(selection)          # exhausted on an earlier page
+        else:
+            start = max(0, offsets.get(name, 0))
+        end = start + query.limit
+
+        items = [_project(i, query.fields) for i in selection[start:end]]
+        if expand is not None and index.spec.paths:
+            items = [_expand(i, index.spec.paths, expand) for i in items]
+        page = _replace(page, path, dict(items) if index.is_dict else items)
+
+        totals[name] = len(selection)
+        if end < len(selection):
+            next_offsets[name] = end
+
+    page = dict(page)
+    page["page"] = {
+        "limit": query.limit,
+        "totals": totals,
+        "next_cursor": _encode_cursor(next_offsets, qhash) if next_offsets else None,
+    }
+    return page
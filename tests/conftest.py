@@ -0,0 +1,22 @@
+import os
+import tempfile
+
+import pytest
+
+# Registry, result store and timings go to a throwaway state dir; set
+# before any emba_mcp import reads it.
+os.environ.setdefault("EMBA_MCP_STATE_DIR", tempfile.mkdtemp(prefix="emba-mcp-test-"))
+
+
+@pytest.fixture
+def state(tmp_path, monkeypatch):
+    """
+    An empty scan registry of its own.
+    """
+    from emba_mcp.emba_runner import registry
+
+    monkeypatch.setattr(registry, "REGISTRY_FILE", tmp_path / "scan_registry.json")
+    monkeypatch.setattr(registry, "REGISTRY_LOCK_FILE", tmp_path / "scan_registry.lock")
+    monkeypatch.setattr(registry, "_LOADED_STAT", None)
+    monkeypatch.setattr(registry, "_SCAN_REGISTRY", {})
+    return tmp_path
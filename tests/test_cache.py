@@ -0,0 +1,42 @@
+from emba_mcp import cache
+from emba_mcp.serialize import dumps
+
+
+def test_result_is_encoded_once_per_computation(tmp_path, monkeypatch):
+    result = {"findings": [{"file": f"/etc/f{i}"} for i in range(100)]}
+    calls = []
+
+    @cache.cached_result("test_encoded_once")
+    def parse(log_dir):
+        calls.append(log_dir)
+        return result
+
+    def no_dumps(value):
+        raise AssertionError("re-serialized for the size estimate")
+
+    monkeypatch.setattr(cache, "dumps", no_dumps)
+    before = cache.cache_stats()["bytes"]
+
+    assert parse(tmp_path) == result
+    assert cache.cache_stats()["bytes"] - before == len(dumps(result))
+
+    # A store hit is charged the decoded payload's size, again without dumps()
+    cache._MEMORY.clear()
+    assert parse(tmp_path) == result
+    assert cache.cache_stats()["bytes"] == len(dumps(result))
+    assert len(calls) == 1
+
+
+def test_result_version_follows_the_log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "FINGERPRINT_TTL", 0)
+    module = tmp_path / "s24_kernel_bin_identifier"
+    module.mkdir()
+    (module / "s24.txt").write_text("Linux version 4.9")
+
+    version = cache.result_version("get_kernel_info", tmp_path)
+    assert cache.result_version("get_kernel_info", tmp_path) == version
+    assert cache.result_version("get_kernel_info", tmp_path, ("page", 2)) != version
+    assert cache.result_version("get_sbom", tmp_path) != version
+
+    (module / "s24.txt").write_text("Linux version 4.9.118")
+    assert cache.result_version("get_kernel_info", tmp_path) != version
@@ -0,0 +1,54 @@
+from emba_mcp import cache
+from emba_mcp import catalog as catalog_module
+from emba_mcp.catalog import get_log_catalog
+
+
+def _log_dir(path, files):
+    for rel in files:
+        (path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (path / rel).write_text("x")
+    return path
+
+
+def test_modules_and_directories(tmp_path):
+    log_dir = _log_dir(tmp_path, [
+        "s13_weak_func_check/s13.txt",
+        "csv_logs/s95_interesting_files_check.csv",
+        "emba.log",
+    ])
+
+    catalog = get_log_catalog(log_dir)
+
+    assert len(catalog) == 3
+    assert catalog.file("emba.log").module == ""
+    assert catalog.file("csv_logs/s95_interesting_files_check.csv").module == "s95"
+    assert catalog.file("s13_weak_func_check/s13.txt").suffix == ".txt"
+    assert get_log_catalog(log_dir) is catalog
+
+
+def test_catalog_counts_against_the_cache_ceiling(tmp_path):
+    log_dir = _log_dir(tmp_path, [f"s13_weak_func_check/f{i}.txt" for i in range(50)])
+
+    before = cache.cache_stats()["bytes"]
+    catalog = get_log_catalog(log_dir)
+
+    assert catalog.approx_bytes() > 50 * 100
+    assert cache.cache_stats()["bytes"] - before == catalog.approx_bytes()
+
+
+def test_recursive_lookups_reach_below_the_catalog_depth(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_module, "MAX_DEPTH", 2)
+    log_dir = _log_dir(tmp_path, [
+        "s22_php_check/semgrep.log",
+        "s22_php_check/semgrep/www/html/admin/index.php.txt",
+    ])
+
+    catalog = catalog_module.build_log_catalog(log_dir)
+
+    assert [a.rel for a in catalog.artifacts] == ["s22_php_check/semgrep.log"]
+    assert catalog.uncataloged("s22_php_check") == ["s22_php_check/semgrep"]
+    assert [a.rel for a in catalog.in_dir("s22_php_check", recursive=True)] == [
+        "s22_php_check/semgrep.log",
+        "s22_php_check/semgrep/www/html/admin/index.php.txt",
+    ]
+    assert catalog.in_dir("s22_php_check", recursive=True)[1].module == "s22"
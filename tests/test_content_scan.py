@@ -0,0 +1,120 @@
+import threading
+
+from emba_mcp import content_scan
+from emba_mcp.filesystem import get_filesystem_index
+
+
+def _index(path, text):
+    (path / "etc").mkdir(parents=True)
+    (path / "etc" / "app.conf").write_text(text)
+    return get_filesystem_index(path)
+
+
+def test_scan_is_keyed_by_rootfs_path(tmp_path):
+    index = _index(tmp_path / "r", "cipher = md5\npassword = admin\n")
+
+    scan = content_scan.scan_rootfs(index, workers=1)
+
+    matches = scan.matches_for("/etc/app.conf")
+    assert "md5" in content_scan.match_names(matches, "weak_algorithm")
+    assert content_scan.scan_rootfs(index, workers=1) is scan
+
+
+def test_scan_of_one_image_does_not_block_another(tmp_path, monkeypatch):
+    slow = _index(tmp_path / "a", "md5\n")
+    fast = _index(tmp_path / "b", "sha1\n")
+    cached = content_scan.scan_rootfs(fast, workers=1)
+
+    entered, release = threading.Event(), threading.Event()
+    scan_chunk = content_scan._scan_chunk
+
+    def blocking_chunk(paths):
+        if any(p.startswith(slow.root_str) for p in paths):
+            entered.set()
+            release.wait(10)
+        return scan_chunk(paths)
+
+    monkeypatch.setattr(content_scan, "_scan_chunk", blocking_chunk)
+    worker = threading.Thread(target=content_scan.scan_rootfs, args=(slow, 1))
+    worker.start()
+    try:
+        assert entered.wait(5)
+        assert content_scan.scan_rootfs(fast, workers=1) is cached
+
+        other = _index(tmp_path / "c", "des\n")
+        done = threading.Event()
+        threading.Thread(target=lambda: (content_scan.scan_rootfs(other, 1), done.set())).start()
+        assert done.wait(5), "scan of another image waited for the running one"
+    finally:
+        release.set()
+        worker.join()
+
+
+def test_scanner_prefers_longer_literals_and_honours_word_boundaries():
+    scanner = content_scan.SignatureScanner([
+        content_scan.Signature("service", "ftpd", "ftpd", True),
+        content_scan.Signature("service", "busybox_ftpd", "busybox ftpd", True),
+        content_scan.Signature("weak_algorithm", "des", "des", True),
+        content_scan.Signature("secret", "passwd", "PASSWD", False),
+    ])
+
+    hits = scanner.scan(b"exec BusyBox ftpd; mode=desktop; db_passwd=1")
+
+    assert [(h.name, h.offset) for h in hits] == [("busybox_ftpd", 5), ("passwd", 36)]
+    assert scanner.scan_grouped(b"des des", 1) == {"weak_algorithm:des": [4]}
+
+
+def test_identical_content_is_scanned_once_across_images(tmp_path):
+    text = f"cipher = 3des-cbc md5 # {tmp_path.name}\n"
+    (tmp_path / "a.conf").write_text(text)
+    (tmp_path / "b.conf").write_text(text)
+
+    first, hit, digest = content_scan.scan_file_cached(tmp_path / "a.conf")
+    assert not hit and digest
+    content_scan.get_store().put_content_scans(
+        content_scan.SCANNER.version, [(digest, content_scan._to_row(first))],
+    )
+
+    again, hit, digest = content_scan.scan_file_cached(tmp_path / "b.conf")
+    assert hit and digest is None
+    assert again == first
+
+
+def test_rootfs_scan_reports_cache_hits(tmp_path):
+    text = f"hash = md5 # {tmp_path.name}\n"    # not cached by other tests
+    _index(tmp_path / "one", text)
+    _index(tmp_path / "two", text)
+
+    first = content_scan.scan_rootfs(get_filesystem_index(tmp_path / "one"), workers=1)
+    second = content_scan.scan_rootfs(get_filesystem_index(tmp_path / "two"), workers=1)
+
+    assert first.cache_report()["misses"] == 1
+    assert second.cache_report()["hits"] == 1
+
+
+def test_process_pool_scan_matches_the_serial_scan(tmp_path, monkeypatch):
+    root = tmp_path / "rootfs"
+    for d in ("etc", "etc/init.d", "www"):
+        (root / d).mkdir(parents=True)
+    (root / "etc" / "a.conf").write_text(f"md5 # {tmp_path.name}\n")
+    (root / "etc" / "init.d" / "telnetd").write_text(f"telnetd -l /bin/sh # {tmp_path.name}\n")
+    (root / "www" / "x.php").write_text(f"$k = 'sha1'; # {tmp_path.name}\n")
+    index = get_filesystem_index(root)
+
+    serial = content_scan.scan_rootfs(index, workers=1)
+    content_scan._ROOTFS_SCANS.clear()
+    monkeypatch.setattr(content_scan, "PROCESS_POOL_MIN_FILES", 1)
+    pooled = content_scan.scan_rootfs(index, workers=2)
+
+    assert pooled is not serial
+    assert pooled.files == serial.files
+    assert list(pooled.files) == list(serial.files)
+
+
+def test_chunks_keep_directories_together():
+    paths = ["/r/a/1", "/r/a/2", "/r/a/3", "/r/b/1", "/r/b/2"]
+
+    chunks = content_scan._chunk_by_directory(paths, 2)
+
+    assert [p for chunk in chunks for p in chunk] == paths
+    assert all(len({p.rpartition("/")[0] for p in chunk}) == 1 for chunk in chunks)
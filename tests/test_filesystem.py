@@ -0,0 +1,103 @@
+import gc
+import threading
+
+from emba_mcp import cache, content_scan, filesystem
+
+
+def _rootfs(path, *files):
+    for rel in files:
+        f = path / rel
+        f.parent.mkdir(parents=True, exist_ok=True)
+        f.write_text("x")
+    return path
+
+
+def test_index_uses_rootfs_relative_paths(tmp_path):
+    root = _rootfs(tmp_path / "squashfs-root", "etc/passwd", "bin/busybox")
+
+    index = filesystem.get_filesystem_index(root)
+
+    assert sorted(e.path for e in index.files()) == ["/bin/busybox", "/etc/passwd"]
+    assert index.abspath(next(iter(index.files()))).startswith(str(root))
+
+
+def test_walk_of_one_root_does_not_block_another(tmp_path, monkeypatch):
+    slow = _rootfs(tmp_path / "a", "etc/passwd")
+    fast = _rootfs(tmp_path / "b", "etc/passwd")
+    filesystem.get_filesystem_index(fast)
+
+    entered, release = threading.Event(), threading.Event()
+    build = filesystem.build_filesystem_index
+
+    def blocking_build(root):
+        if root == slow:
+            entered.set()
+            release.wait(10)
+        return build(root)
+
+    monkeypatch.setattr(filesystem, "build_filesystem_index", blocking_build)
+    worker = threading.Thread(target=filesystem.get_filesystem_index, args=(slow,))
+    worker.start()
+    try:
+        assert entered.wait(5)
+        done = threading.Event()
+        threading.Thread(target=lambda: (filesystem.get_filesystem_index(fast), done.set())).start()
+        assert done.wait(2), "cached lookup waited for another root's walk"
+    finally:
+        release.set()
+        worker.join()
+
+
+def test_concurrent_requests_for_one_root_build_once(tmp_path, monkeypatch):
+    root = _rootfs(tmp_path / "c", "etc/passwd")
+    calls = []
+    build = filesystem.build_filesystem_index
+
+    def counting_build(r):
+        calls.append(r)
+        return build(r)
+
+    monkeypatch.setattr(filesystem, "build_filesystem_index", counting_build)
+    threads = [threading.Thread(target=filesystem.get_filesystem_index, args=(root,)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == [root]
+
+
+def test_indexes_and_their_scans_are_evicted_under_the_ceiling(tmp_path, monkeypatch):
+    first = _rootfs(tmp_path / "one", "etc/app.conf")
+    second = _rootfs(tmp_path / "two", "etc/app.conf")
+
+    index = filesystem.get_filesystem_index(first)
+    monkeypatch.setattr(cache, "_MEMORY", cache.LRUCache(index.approx_bytes() * 3 // 2))
+    index = filesystem.get_filesystem_index(first)
+    assert filesystem.get_filesystem_index(first) is index
+    content_scan.scan_rootfs(index, workers=1)
+    scans = len(content_scan._ROOTFS_SCANS)
+
+    filesystem.get_filesystem_index(second)
+    assert cache.cache_stats()["evictions"] == 1
+
+    del index
+    gc.collect()
+    assert len(content_scan._ROOTFS_SCANS) == scans - 1
+
+
+def test_rootfs_search_runs_once_per_fingerprint(tmp_path, monkeypatch):
+    _rootfs(tmp_path / "firmware" / "_fw.extracted" / "squashfs-root", "etc/passwd")
+    calls = []
+    search = filesystem._search_filesystem_root
+    monkeypatch.setattr(
+        filesystem, "_search_filesystem_root",
+        lambda log_dir: calls.append(log_dir) or search(log_dir),
+    )
+
+    root = filesystem.find_filesystem_root(tmp_path)
+
+    assert root == tmp_path / "firmware" / "_fw.extracted" / "squashfs-root"
+    assert filesystem.find_filesystem_root(tmp_path) == root
+    assert calls == [tmp_path]
+    assert filesystem.find_filesystem_root(tmp_path / "missing") is None
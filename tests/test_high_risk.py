@@ -0,0 +1,189 @@
+import threading
+
+from emba_mcp.emba_analyzers import high_risk
+from emba_mcp.emba_analyzers.high_risk import RULES, Rule, _rule_suid_weak_funcs
+
+ROOT = "/logs/firmware/_fw.extracted/squashfs-root"
+
+
+def _inputs(*binaries):
+    return {
+        "permissions": {
+            "filesystem_root": ROOT,
+            "summary": {"suid_binaries": ["/bin/busybox"]},
+        },
+        "weak_funcs": {
+            "intense": [{"function": "strcpy", "binary": b} for b in binaries],
+            "radare": [],
+        },
+    }
+
+
+def test_same_name_in_other_directory_is_not_privileged():
+    assert _rule_suid_weak_funcs(_inputs("/usr/bin/busybox")) is None
+    assert _rule_suid_weak_funcs(_inputs(ROOT + "/usr/bin/busybox")) is None
+
+
+def test_suid_binary_matches_in_rootfs_and_extraction_form():
+    for binary in ("/bin/busybox", ROOT + "/bin/busybox"):
+        finding = _rule_suid_weak_funcs(_inputs(binary, "/usr/bin/busybox"))
+        assert finding["severity"] == "critical"
+        assert [c["binary"] for c in finding["evidence"]["weak_funcs"]] == [binary]
+        assert finding["evidence"]["permissions"] == ["/bin/busybox"]
+
+
+def test_only_the_exact_extraction_root_is_stripped():
+    assert _rule_suid_weak_funcs(_inputs("/other" + ROOT + "/bin/busybox")) is None
+
+
+def _old_kernel_gate(version, nx=False):
+    rule = next(r for r in RULES if r.name == "outdated_kernel_no_nx")
+    return rule.gates["kernel"]({"kernel_version": version, "hardening": {"nx": nx}})
+
+
+def test_old_kernel_gate_uses_the_parsed_major():
+    assert _old_kernel_gate("3.10.14")
+    assert _old_kernel_gate("0.99")
+    assert not _old_kernel_gate("4.9.0")
+    assert not _old_kernel_gate("3.10.14", nx=True)
+
+
+def test_unparsable_kernel_version_is_not_old():
+    assert not _old_kernel_gate("unknown")
+    assert not _old_kernel_gate(None)
+
+
+# ---- parser fan-out ----
+
+def test_failing_and_slow_parsers_degrade_to_empty_results():
+    release = threading.Event()
+    try:
+        results, meta = high_risk.run_parsers({
+            "ok": lambda: {"found": True},
+            "broken": lambda: 1 / 0,
+            "slow": lambda: release.wait(5) and {},
+        }, timeout=0.2)
+    finally:
+        release.set()
+
+    assert results == {"ok": {"found": True}, "broken": {}, "slow": {}}
+    assert [meta[n]["status"] for n in ("ok", "broken", "slow")] == ["ok", "error", "timeout"]
+
+
+# ---- lazy rule evaluation ----
+
+def _fake_inputs(monkeypatch, **outputs):
+    calls = []
+
+    def parser(name):
+        def run(log_dir, fs_root):
+            calls.append(name)
+            return outputs[name]
+        return run
+
+    monkeypatch.setattr(high_risk, "INPUTS", {name: parser(name) for name in outputs})
+    return calls
+
+
+def _rule(name="suid_rule", gate=lambda cheap: cheap.get("hit")):
+    return Rule(
+        name=name,
+        requires=("cheap", "costly"),
+        gates={"cheap": gate},
+        build=lambda inputs: {
+            "components": ["/bin/busybox"],
+            "evidence": {"costly": inputs["costly"]["items"]},
+        },
+    )
+
+
+def test_failed_gate_skips_the_remaining_inputs(tmp_path, monkeypatch):
+    calls = _fake_inputs(monkeypatch, cheap={"hit": False}, costly={"items": []})
+
+    result = high_risk.evaluate_rules(tmp_path, [_rule()])
+
+    assert calls == ["cheap"]
+    assert result["meta"]["parsers_skipped"] == ["costly"]
+    assert result["meta"]["rules"]["suid_rule"].startswith("skipped: cheap")
+    assert result["findings"] == []
+
+
+def test_inputs_resolve_in_waves(tmp_path, monkeypatch):
+    calls = _fake_inputs(monkeypatch, cheap={"hit": True}, costly={"items": [1]})
+
+    result = high_risk.evaluate_rules(tmp_path, [_rule()])
+
+    assert calls == ["cheap", "costly"]
+    assert result["meta"]["waves"] == [["cheap"], ["costly"]]
+    assert result["meta"]["rules"]["suid_rule"] == "fired"
+
+
+# ---- materialized findings and evidence references ----
+
+def test_finding_ids_depend_on_rule_and_components_only():
+    a = high_risk.finding_id("suid_rule", {"components": ["/bin/busybox"], "severity": "high"})
+    b = high_risk.finding_id("suid_rule", {"components": ["/bin/busybox"], "severity": "low"})
+
+    assert a == b and a.startswith("HR-")
+    assert a != high_risk.finding_id("suid_rule", {"components": ["/bin/login"]})
+    assert a != high_risk.finding_id("other_rule", {"components": ["/bin/busybox"]})
+
+
+def test_evidence_is_referenced_and_paged(tmp_path, monkeypatch):
+    _fake_inputs(monkeypatch, cheap={"hit": True}, costly={"items": list(range(10))})
+    evaluate = high_risk.evaluate_rules
+    monkeypatch.setattr(high_risk, "evaluate_rules", lambda log_dir: evaluate(log_dir, [_rule()]))
+
+    finding = high_risk.get_high_risk_findings(tmp_path)["findings"][0]
+    ref = finding["evidence"][0]
+    assert ref == {
+        "finding_id": finding["id"],
+        "parser": "costly",
+        "count": 10,
+        "items": [0, 1, 2],
+    }
+
+    page = high_risk.get_finding_evidence(tmp_path, finding["id"], offset=8, limit=5)
+    assert [e["item"] for e in page["items"]] == [8, 9]
+    assert page["total"] == 10 and page["next_offset"] is None
+    assert "available_findings" in high_risk.get_finding_evidence(tmp_path, "HR-missing")
+
+
+def test_a_rule_chain_does_not_wait_for_other_rules_parsers(tmp_path, monkeypatch):
+    release = threading.Event()
+    second_started = threading.Event()
+
+    def slow(log_dir, fs_root):
+        release.wait(5)
+        return {}
+
+    def second(log_dir, fs_root):
+        second_started.set()
+        return {"items": []}
+
+    monkeypatch.setattr(high_risk, "INPUTS", {
+        "slow": slow,
+        "cheap": lambda log_dir, fs_root: {"hit": True},
+        "costly": second,
+    })
+    rules = [
+        Rule(name="slow_rule", requires=("slow",), build=lambda inputs: None),
+        _rule(),
+    ]
+
+    worker = threading.Thread(target=high_risk.evaluate_rules, args=(tmp_path, rules))
+    worker.start()
+    try:
+        assert second_started.wait(5), "second input waited for an unrelated parser"
+    finally:
+        release.set()
+        worker.join()
+
+
+def test_credentials_gate_needs_actual_evidence():
+    gate = next(r for r in RULES if r.name == "weak_crypto_credentials").gates["creds"]
+    empty = {"users": [], "config_files": [], "ssh_keys": [], "backup_files": ["/etc/a.bak"]}
+
+    assert not gate({"found": True, "summary": empty})
+    assert not gate({"found": False})
+    assert gate({"found": True, "summary": {**empty, "ssh_keys": ["/root/.ssh/id_rsa"]}})
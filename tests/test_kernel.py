@@ -0,0 +1,62 @@
+from emba_mcp.emba_parsers.kernel import parse_kernel_info
+
+
+def _log(tmp_path, files):
+    for rel, text in files.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return tmp_path
+
+
+def test_architecture_precedence_within_a_source(tmp_path):
+    log_dir = _log(tmp_path, {
+        "s24_kernel_bin_identifier/s24.txt": (
+            "some line about x86 tooling\n"
+            "Linux version 2.6.36 (gcc version 4.3.6)\n"
+            "Architecture: mipsel\n"
+        ),
+    })
+
+    info = parse_kernel_info(log_dir)
+
+    assert info["architecture"] == "mipsel"
+    assert info["confidence"] == "high"
+    assert info["provenance"]["architecture"] == "s24_kernel_bin_identifier/s24.txt"
+
+
+def test_nx_enabled_outranks_disabled(tmp_path):
+    log_dir = _log(tmp_path, {
+        "s24_kernel_bin_identifier/s24.txt": "NX disabled in config A\nNX enabled\nASLR disabled\n",
+    })
+
+    hardening = parse_kernel_info(log_dir)["hardening"]
+
+    assert hardening["nx"] is True
+    assert hardening["aslr"] is False
+    assert hardening["stack_canary"] == "unknown"
+
+
+def test_earlier_module_wins_and_fallback_is_skipped(tmp_path):
+    log_dir = _log(tmp_path, {
+        "s24_kernel_bin_identifier/s24.txt": "Linux version 4.9.1\narch: arm\n",
+        "s25_kernel_check/s25.txt": "Linux version 2.6.0\nmips\n",
+        "html-report/index.html": "Linux version 3.0.0 x86\n",
+    })
+
+    info = parse_kernel_info(log_dir)
+
+    assert (info["kernel_version"], info["architecture"]) == ("4.9.1", "arm")
+    assert "html-report/index.html" not in info["sources"]
+
+
+def test_html_report_fills_missing_primary_fields(tmp_path):
+    log_dir = _log(tmp_path, {
+        "s24_kernel_bin_identifier/s24.txt": "Linux version 4.9.1\n",
+        "html-report/index.html": "<p>aarch64</p>\n",
+    })
+
+    info = parse_kernel_info(log_dir)
+
+    assert info["architecture"] == "aarch64"
+    assert info["provenance"]["architecture"] == "html-report/index.html"
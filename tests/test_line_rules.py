@@ -0,0 +1,43 @@
+from emba_mcp.emba_parsers.php_vulns import _parse_php_line
+from emba_mcp.line_rules import LineRule, LineRules
+
+RULES = [
+    LineRule("late", r"alpha (?P<word>\w+)"),
+    LineRule("early", r"beta (?P<word>\w+)"),
+    LineRule("pair", r"(?P<ch>[xyz])(?P=ch)"),
+]
+
+
+def test_leftmost_match_wins_by_default():
+    m = LineRules("t", RULES).match("beta one alpha two")
+    assert (m.rule.name, m.fields) == ("early", {"word": "one"})
+
+
+def test_first_listed_rule_wins_when_asked():
+    m = LineRules("t", RULES, first_listed=True).match("beta one alpha two")
+    assert (m.rule.name, m.fields) == ("late", {"word": "two"})
+
+
+def test_named_groups_and_backreferences_are_per_rule():
+    m = LineRules("t", RULES).match("--zz--")
+    assert (m.rule.name, m.fields) == ("pair", {"ch": "z"})
+    assert LineRules("t", RULES).match("nothing here") is None
+
+
+def test_lines_are_capped():
+    rules = LineRules("t", RULES, max_line=10)
+    assert rules.match("-" * 20 + " alpha late") is None
+    assert len(rules.match("alpha word" + "!" * 50).line) == 10
+
+
+def test_php_line_matching_several_rules_keeps_baseline_priority():
+    line = "phpinfo() display_errors = On Found possible PHP vulnerability xss in /www/a.php"
+
+    finding = _parse_php_line(line)
+
+    assert finding.engine == "semgrep"
+    assert (finding.rule, finding.file) == ("xss", "/www/a.php")
+
+
+def test_php_ini_beats_earlier_phpinfo_mention():
+    assert _parse_php_line("phpinfo() enabled, allow_url_include = On").engine == "php_ini"
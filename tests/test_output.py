@@ -0,0 +1,72 @@
+import io
+
+from emba_mcp.emba_runner import output as output_module
+from emba_mcp.emba_runner.output import STDERR_PREFIX, ScanOutput
+
+
+def _output(tmp_path, max_lines=5):
+    output = ScanOutput(tmp_path / "scan.log", max_lines=max_lines)
+    output.open()
+    return output
+
+
+def test_tail_reads_incrementally_by_offset(tmp_path):
+    output = _output(tmp_path)
+    for i in range(3):
+        output.write(f"line {i}")
+
+    first = output.tail(offset=0, limit=2)
+    assert first["lines"] == ["line 0", "line 1"] and first["next_offset"] == 2
+
+    output.write("line 3")
+    rest = output.tail(offset=first["next_offset"])
+    assert rest["lines"] == ["line 2", "line 3"] and rest["next_offset"] == 4
+
+
+def test_lines_dropped_from_the_ring_are_counted(tmp_path):
+    output = _output(tmp_path, max_lines=3)
+    for i in range(10):
+        output.write(f"line {i}")
+
+    tail = output.tail(offset=2)
+    assert tail["missed"] == 5
+    assert tail["lines"] == ["line 7", "line 8", "line 9"]
+    assert output.tail(limit=2)["lines"] == ["line 8", "line 9"]
+
+
+def test_stderr_is_prefixed_and_logged(tmp_path):
+    output = _output(tmp_path)
+    output.pump(io.BytesIO(b"starting\r\n"), "stdout")
+    output.pump(io.BytesIO(b"warning: disk\n"), "stderr")
+    output.close()
+
+    assert output.last_stderr(5) == ["warning: disk"]
+    assert (tmp_path / "scan.log").read_text() == f"starting\n{STDERR_PREFIX}warning: disk\n"
+
+
+def test_finished_scan_is_rebuilt_from_its_log(tmp_path):
+    output = _output(tmp_path)
+    for i in range(4):
+        output.write(f"line {i}")
+    output.close()
+
+    rebuilt = ScanOutput.from_file(tmp_path / "scan.log")
+    assert rebuilt.tail(offset=3)["lines"] == ["line 3"]
+    assert rebuilt.tail()["total_lines"] == 4
+
+
+def test_other_process_snapshots_follow_the_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(output_module, "OUTPUT_DIR", tmp_path)
+    path = output_module.output_log_path("emba-other")
+    path.write_text("line 0\nline 1\n")
+
+    snapshot = output_module.get_output("emba-other")
+    assert snapshot.tail()["lines"] == ["line 0", "line 1"]
+
+    with open(path, "a") as f:
+        f.write("line 2\npartial")
+    tail = output_module.get_output("emba-other").tail(offset=2)
+    assert tail["lines"] == ["line 2"] and tail["total_lines"] == 3
+
+    path.write_text("restarted\n")
+    assert output_module.get_output("emba-other").tail()["lines"] == ["restarted"]
@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from emba_mcp.paths import expand_path, rootfs_path
+
+LOG_DIR = Path("/logs/run1")
+FS_ROOT = Path("/logs/run1/firmware/_fw.extracted/squashfs-root")
+
+
+def test_expand_compact_paths():
+    assert expand_path("/etc/passwd", LOG_DIR, FS_ROOT) == f"{FS_ROOT}/etc/passwd"
+    assert expand_path("s13_weak_func_check/s13.txt", LOG_DIR, FS_ROOT) == "/logs/run1/s13_weak_func_check/s13.txt"
+    assert expand_path("/etc/passwd", LOG_DIR, None) == "/etc/passwd"
+    assert expand_path("", LOG_DIR, FS_ROOT) == ""
+
+
+def test_already_absolute_paths_are_not_expanded_twice():
+    absolute = f"{FS_ROOT}/bin/busybox"
+
+    assert expand_path(absolute, LOG_DIR, FS_ROOT) == absolute
+
+
+def test_rootfs_path_round_trips_expand_path():
+    for p in ("/bin/busybox", "/usr/sbin/telnetd"):
+        assert rootfs_path(expand_path(p, LOG_DIR, FS_ROOT), str(FS_ROOT)) == p
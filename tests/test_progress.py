@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from emba_mcp.emba_runner import progress
+
+MODULES = ["s06_distribution_identification", "s13_weak_func_check", "s24_kernel_bin_identifier"]
+
+
+@pytest.fixture
+def timings(tmp_path, monkeypatch):
+    monkeypatch.setattr(progress, "TIMINGS_FILE", tmp_path / "module_timings.json")
+    monkeypatch.setattr(progress, "TIMINGS_LOCK_FILE", tmp_path / "module_timings.lock")
+
+
+def _tracker(log_dir):
+    return progress.ProgressTracker("emba-test", log_dir, MODULES)
+
+
+def _log(log_dir, *lines):
+    with open(log_dir / progress.MAIN_LOG, "a") as f:
+        f.writelines(line + "\n" for line in lines)
+
+
+def test_only_emba_markers_count(tmp_path, timings):
+    _log(tmp_path,
+         "[*] Tue Oct 15 10:00:00 UTC 2024 - s06_distribution_identification starting",
+         "[+] s24_kernel_bin_identifier finished earlier in a previous run",
+         "[*] note - s24_kernel_bin_identifier finished reading /proc",
+         "\x1b[33m[*] Tue Oct 15 10:01:00 UTC 2024 - s06_distribution_identification finished\x1b[0m",
+         "[*] Tue Oct 15 10:01:01 UTC 2024 - s13_weak_func_check starting")
+
+    snap = _tracker(tmp_path).poll()
+
+    assert snap["modules_finished"] == 1
+    assert list(snap["module_seconds"]) == ["s06_distribution_identification"]
+    assert snap["current_module"] == "s13_weak_func_check"
+    assert snap["modules_total"] == 3
+    assert snap["percent"] == pytest.approx(33.3)
+
+
+def test_incremental_reads_and_partial_lines(tmp_path, timings):
+    tracker = _tracker(tmp_path)
+    _log(tmp_path, "[*] d - s06_distribution_identification starting")
+    with open(tmp_path / progress.MAIN_LOG, "a") as f:
+        f.write("[*] d - s06_distribution_identification fini")
+
+    assert tracker.poll()["modules_finished"] == 0
+
+    with open(tmp_path / progress.MAIN_LOG, "a") as f:
+        f.write("shed (12 seconds)\n")
+    assert tracker.poll()["modules_finished"] == 1
+
+
+def test_output_files_mark_modules_started(tmp_path, timings):
+    (tmp_path / "s13_weak_func_check").mkdir()
+    (tmp_path / "html-report").mkdir()
+
+    assert _tracker(tmp_path).poll()["running_modules"] == ["s13_weak_func_check"]
+
+
+def test_successful_scan_feeds_the_timing_history(tmp_path, timings):
+    tracker = _tracker(tmp_path)
+    _log(tmp_path, "[*] d - s06_distribution_identification starting")
+    tracker.poll()
+
+    final = tracker.complete(success=True)
+
+    assert final["percent"] == 100.0 and final["estimated_finish_at"] is None
+    assert "s06_distribution_identification" in progress.load_timings()
+    assert "s06_distribution_identification" in _tracker(tmp_path).timings
+
+
+def test_expected_modules_skip_blacklisted(tmp_path):
+    (tmp_path / "modules").mkdir()
+    for name in ("s06_a.sh", "s99_b.sh", "l10_emulation.sh", "helpers.sh"):
+        (tmp_path / "modules" / name).write_text("")
+    profile = tmp_path / "default-scan.emba"
+    profile.write_text('export MODULE_BLACKLIST+=( "s99_b" )\n')
+
+    assert progress.expected_modules(tmp_path, profile) == ["s06_a"]
+
+
+_RECORDER = """
+import sys
+from pathlib import Path
+from emba_mcp.emba_runner import progress
+progress.TIMINGS_FILE = Path(sys.argv[1]) / "module_timings.json"
+progress.TIMINGS_LOCK_FILE = Path(sys.argv[1]) / "module_timings.lock"
+for _ in range(25):
+    progress.record_timings({"s13_weak_func_check": 10.0})
+"""
+
+
+def test_concurrent_processes_never_lose_a_run(tmp_path, timings):
+    env = {**os.environ, "EMBA_MCP_STATE_DIR": str(tmp_path),
+           "PYTHONPATH": str(Path(progress.__file__).parents[2])}
+    procs = [
+        subprocess.Popen([sys.executable, "-c", _RECORDER, str(tmp_path)], env=env)
+        for _ in range(3)
+    ]
+    assert [p.wait(60) for p in procs] == [0, 0, 0]
+
+    assert progress.load_timings()["s13_weak_func_check"] == (10.0, 75)
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,90 @@
+from emba_mcp import reader
+
+
+# ---- capped reads ----
+
+def test_small_files_are_scanned_whole():
+    assert reader.scan_windows(100, budget=1000) == ([(0, 100)], False)
+
+
+def test_large_files_get_head_and_tail_windows():
+    windows, truncated = reader.scan_windows(10_000, budget=1000)
+    assert truncated
+    assert windows == [(0, 500), (9_500, 10_000)]
+
+
+def test_capped_text_read(tmp_path):
+    path = tmp_path / "passwd"
+    path.write_bytes(b"root:x:0:0\n" * 10)
+
+    assert reader.read_text_capped(path, limit=4) == "root"
+    assert reader.read_text_capped(tmp_path / "missing") == ""
+
+
+def test_mapped_files(tmp_path):
+    (tmp_path / "data.bin").write_bytes(b"\x7fELF...")
+    (tmp_path / "empty.bin").touch()
+
+    with reader.mapped(tmp_path / "data.bin") as data:
+        assert data[:4] == b"\x7fELF"
+    with reader.mapped(tmp_path / "empty.bin") as data:
+        assert data == b""
+
+
+# ---- sniffing ----
+
+def test_magic_numbers_win_over_heuristics():
+    assert reader.classify_bytes(b"\x7fELF\x02\x01") == "elf"
+    assert reader.classify_bytes(b"hsqs" + b"\x00" * 16) == "squashfs"
+    assert reader.classify_bytes(b"SQLite format 3\x00") == "sqlite"
+
+
+def test_text_and_binary_heuristics():
+    assert reader.classify_bytes(b"") == "empty"
+    assert reader.classify_bytes("password = héllo\n".encode()) == "text"
+    assert reader.classify_bytes(b"abc\x00def") == "binary"
+    assert reader.classify_bytes(b"\x01\x02\x03" + b"a" * 10) == "binary"
+
+
+def test_sniff_file(tmp_path):
+    (tmp_path / "app.conf").write_text("port = 80\n")
+
+    assert reader.sniff_file(str(tmp_path / "app.conf")) == "text"
+    assert reader.sniff_file(str(tmp_path / "missing")) == "unreadable"
+
+
+# ---- streaming lines ----
+
+def test_over_long_lines_are_cut(tmp_path):
+    path = tmp_path / "s13.txt"
+    path.write_bytes(b"short\r\n" + b"x" * 100 + b"\nlast")
+
+    assert list(reader.iter_lines(path, limit=10)) == ["short", "x" * 10, "last"]
+    assert list(reader.iter_lines(tmp_path / "missing")) == []
+
+
+def test_extractors_share_one_pass():
+    numbers = reader.collect(lambda l: int(l) if l.isdigit() else None)
+    word = reader.first(lambda l: l if l.isalpha() else None)
+
+    assert reader.feed_lines(["1", "two", "3", "four"], numbers, word) == [[1, 3], "two"]
+
+
+def test_reading_stops_once_every_extractor_is_done():
+    consumed = []
+
+    def lines():
+        for line in ["a", "b", "c"]:
+            consumed.append(line)
+            yield line
+
+    assert reader.feed_lines(lines(), reader.first(lambda l: l)) == ["a"]
+    assert consumed == ["a"]
+
+
+def test_extract_files_chains_files(tmp_path):
+    (tmp_path / "a.txt").write_text("1\n2\n")
+    (tmp_path / "b.txt").write_text("3\n")
+    numbers = reader.collect(int)
+
+    assert reader.extract_files([tmp_path / "a.txt", tmp_path / "b.txt"], numbers) == [[1, 2, 3]]
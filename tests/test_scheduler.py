@@ -0,0 +1,147 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from emba_mcp.emba_runner import registry, scheduler
+
+
+def _queue(tmp_path, priority=0):
+    return registry.create_scan(tmp_path / "fw.bin", tmp_path / "log", priority)
+
+
+def _claim_all(admit):
+    claimed = []
+    while True:
+        scan = registry.claim_next(admit, scheduler._queue_order)
+        if scan is None:
+            return claimed
+        claimed.append(scan["scan_id"])
+
+
+# ---- admission ----
+
+def test_admission_enforces_slots(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler, "max_concurrent_scans", lambda: 2)
+    monkeypatch.setattr(scheduler, "MIN_FREE_DISK_BYTES", 0)
+    monkeypatch.setattr(scheduler, "MIN_FREE_MEMORY_BYTES", 0)
+    monkeypatch.setattr(scheduler, "_load_per_cpu", lambda: 0.0)
+
+    assert scheduler.admission(tmp_path, 1) is None
+    assert scheduler.admission(tmp_path, 2).startswith("concurrency limit")
+
+
+def test_load_only_delays_when_something_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler, "max_concurrent_scans", lambda: 4)
+    monkeypatch.setattr(scheduler, "MIN_FREE_DISK_BYTES", 0)
+    monkeypatch.setattr(scheduler, "MIN_FREE_MEMORY_BYTES", 0)
+    monkeypatch.setattr(scheduler, "_load_per_cpu", lambda: 50.0)
+
+    assert scheduler.admission(tmp_path, 0) is None
+    assert scheduler.admission(tmp_path, 1).startswith("high load")
+
+
+# ---- queue ----
+
+def test_claims_follow_priority_then_fifo(state):
+    low1 = _queue(state)
+    low2 = _queue(state)
+    high = _queue(state, priority=5)
+
+    assert _claim_all(lambda scan, running: None) == [high, low1, low2]
+
+
+def test_blocked_head_records_reason_on_whole_queue(state):
+    ids = [_queue(state) for _ in range(3)]
+
+    claimed = _claim_all(lambda scan, running: "full" if running >= 1 else None)
+
+    assert claimed == ids[:1]
+    assert [registry.get_scan(i)["waiting_for"] for i in ids[1:]] == ["full", "full"]
+
+
+def test_running_count_includes_other_processes(state):
+    first = _queue(state)
+    _queue(state)
+
+    # Another server process claimed `first`: only the file knows
+    data = json.loads(registry.REGISTRY_FILE.read_text())
+    data[first].update(status="running", owner={"pid": 1, "token": "elsewhere"})
+    registry.REGISTRY_FILE.write_text(json.dumps(data))
+
+    assert _claim_all(lambda scan, running: "full" if running >= 1 else None) == []
+
+
+def test_queue_snapshot_positions(state):
+    a = _queue(state)
+    b = _queue(state, priority=1)
+
+    snapshot = scheduler.queue_snapshot()
+
+    assert [e["scan_id"] for e in snapshot["queue"]] == [b, a]
+    assert [e["queue_position"] for e in snapshot["queue"]] == [1, 2]
+
+
+def test_cancelled_scan_is_never_claimed(state):
+    scan_id = _queue(state)
+    assert registry.stop_scan(scan_id) == {"status": "cancelled"}
+    assert _claim_all(lambda scan, running: None) == []
+
+
+# ---- across processes ----
+
+_CLAIMER = """
+import sys, time
+from emba_mcp.emba_runner import registry, scheduler
+time.sleep(float(sys.argv[1]) - time.time())
+got = []
+while True:
+    scan = registry.claim_next(
+        lambda s, running: "full" if running >= 2 else None, scheduler._queue_order)
+    if scan is None:
+        break
+    got.append(scan["scan_id"])
+print(" ".join(got))
+"""
+
+
+def test_processes_never_claim_the_same_scan_or_exceed_the_cap(state):
+    ids = {_queue(state) for _ in range(6)}
+
+    env = {**os.environ, "EMBA_MCP_STATE_DIR": str(state),
+           "PYTHONPATH": str(Path(registry.__file__).parents[2])}
+    start = str(time.time() + 1.0)
+    procs = [
+        subprocess.Popen([sys.executable, "-c", _CLAIMER, start], env=env,
+                         stdout=subprocess.PIPE, text=True)
+        for _ in range(3)
+    ]
+    claimed = [i for p in procs for i in p.communicate(timeout=30)[0].split()]
+
+    assert len(claimed) == 2
+    assert len(set(claimed)) == 2 and set(claimed) <= ids
+
+
+def test_orphaned_running_scans_are_failed(state):
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead_token = registry._process_token(dead.pid)
+    dead.wait()
+
+    alive = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        orphan, owned, legacy = (_queue(state) for _ in range(3))
+        data = json.loads(registry.REGISTRY_FILE.read_text())
+        data[orphan].update(status="running", owner={"pid": dead.pid, "token": dead_token})
+        data[owned].update(status="running",
+                           owner={"pid": alive.pid, "token": registry._process_token(alive.pid)})
+        data[legacy].update(status="stopping")
+        registry.REGISTRY_FILE.write_text(json.dumps(data))
+
+        assert sorted(registry.reconcile_orphans()) == sorted([orphan, legacy])
+        assert registry.get_scan(orphan)["status"] == "failed"
+        assert registry.get_scan(owned)["status"] == "running"
+    finally:
+        alive.kill()
+        alive.wait()
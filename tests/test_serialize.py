@@ -0,0 +1,38 @@
+import json
+from pathlib import Path
+
+from emba_mcp.models import KernelInfo, PHPFinding
+from emba_mcp.serialize import dumps, to_plain
+
+
+def test_records_match_their_serialized_form():
+    finding = PHPFinding(type="code_vulnerability", engine="semgrep", file="/www/a.php", severity="high")
+    result = {"findings": [finding], "kernel": KernelInfo(kernel_version="4.9")}
+
+    plain = to_plain(result)
+
+    assert plain == json.loads(dumps(result))
+    assert plain["findings"][0] == {
+        "type": "code_vulnerability", "engine": "semgrep", "file": "/www/a.php", "severity": "high",
+    }
+    assert plain["kernel"]["architecture"] is None      # not sparse: every field kept
+    assert list(finding.keys()) == list(plain["findings"][0])
+
+
+def test_record_free_containers_are_returned_as_is():
+    result = {"sources": ["s24.txt"], "counts": {"a": 1}}
+
+    assert to_plain(result) is result
+    assert to_plain({"root": Path("/rootfs"), "set": {"b", "a"}}) == {"root": "/rootfs", "set": ["a", "b"]}
+
+
+def test_records_anywhere_in_lists_and_tuples_are_converted():
+    kernel = KernelInfo(kernel_version="4.9")
+    result = {"mixed": [None, "s24.txt", kernel], "pair": ("kernel", kernel)}
+
+    plain = to_plain(result)
+
+    assert plain["mixed"][:2] == [None, "s24.txt"]
+    assert plain["mixed"][2]["kernel_version"] == "4.9"
+    assert plain["pair"] == ["kernel", to_plain(kernel)]
+    assert plain == json.loads(dumps(result))
@@ -0,0 +1,27 @@
+from emba_mcp.store import ResultStore
+
+
+def test_results_are_keyed_by_fingerprint(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    value = {"findings": [{"file": "/etc/shadow"}], "count": 1}
+
+    store.put_result("/logs/a", "parse", "fp1", value)
+
+    assert store.get_result("/logs/a", "parse", "fp1")[0] == value
+    assert store.get_result("/logs/a", "parse", "fp2") is None
+    assert store.get_result("/logs/b", "parse", "fp1") is None
+
+
+def test_a_new_fingerprint_replaces_the_entry(tmp_path):
+    store = ResultStore(tmp_path / "results.db")
+    store.put_result("/logs/a", "parse", "fp1", {"v": 1})
+    store.put_result("/logs/a", "parse", "fp2", {"v": 2})
+
+    assert store.get_result("/logs/a", "parse", "fp1") is None
+    assert store.get_result("/logs/a", "parse", "fp2")[0] == {"v": 2}
+
+
+def test_entries_are_shared_between_connections(tmp_path):
+    ResultStore(tmp_path / "results.db").put_inventory("/rootfs", "fp", [["etc", 1]])
+
+    assert ResultStore(tmp_path / "results.db").get_inventory("/rootfs", "fp") == [["etc", 1]]
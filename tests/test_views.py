@@ -0,0 +1,76 @@
+import pytest
+
+from emba_mcp import cache
+from emba_mcp.models import PHPFinding
+from emba_mcp.serialize import to_plain
+from emba_mcp.views import apply_view, make_query
+
+
+def _result(n):
+    return {
+        "intense": [{"binary": f"/usr/bin/b{i:03d}", "function": "strcpy"} for i in range(n)],
+        "radare": [],
+        "sources": [],
+    }
+
+
+def test_pages_follow_the_cursor(tmp_path):
+    result = _result(5)
+
+    first = apply_view("get_weak_functions", tmp_path, result, make_query(limit=2))
+    assert [i["binary"] for i in first["intense"]] == ["/usr/bin/b000", "/usr/bin/b001"]
+    assert first["page"]["totals"]["intense"] == 5
+
+    seen = []
+    page = first
+    while page["page"]["next_cursor"]:
+        seen += [i["binary"] for i in page["intense"]]
+        page = apply_view(
+            "get_weak_functions", tmp_path, result,
+            make_query(limit=2, cursor=page["page"]["next_cursor"]),
+        )
+    seen += [i["binary"] for i in page["intense"]]
+    assert seen == [i["binary"] for i in result["intense"]]
+
+
+def test_prefix_filter_and_projection(tmp_path):
+    result = _result(12)
+
+    page = apply_view(
+        "get_weak_functions", tmp_path, result,
+        make_query(path_prefix="/usr/bin/b01", fields="binary"),
+    )
+    assert page["intense"] == [{"binary": "/usr/bin/b010"}, {"binary": "/usr/bin/b011"}]
+
+
+def test_cursor_is_bound_to_its_filters(tmp_path):
+    page = apply_view("get_weak_functions", tmp_path, _result(5), make_query(limit=2))
+
+    with pytest.raises(ValueError):
+        apply_view(
+            "get_weak_functions", tmp_path, _result(5),
+            make_query(limit=2, cursor=page["page"]["next_cursor"], path_prefix="/usr"),
+        )
+
+
+def test_indexes_count_against_the_cache_ceiling(tmp_path):
+    before = cache.cache_stats()["bytes"]
+    apply_view("get_weak_functions", tmp_path, _result(1000), make_query())
+    assert cache.cache_stats()["bytes"] - before >= 1000 * 8
+
+
+def test_projection_matches_the_stored_form(tmp_path):
+    finding = PHPFinding(
+        type="configuration_issue", engine="php_ini", setting="allow_url_include",
+        severity="high",
+    )
+    query = make_query(fields="file,setting,severity")
+
+    pages = [
+        apply_view("get_php_vulnerabilities", tmp_path / name, {"findings": [item], "sources": []}, query)
+        for name, item in (("record", finding), ("stored", to_plain(finding)))
+    ]
+
+    assert pages[0]["findings"] == pages[1]["findings"] == [
+        {"setting": "allow_url_include", "severity": "high"},
+    ]
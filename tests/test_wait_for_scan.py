@@ -0,0 +1,69 @@
+import threading
+import time
+
+from emba_mcp.emba_runner import registry
+
+
+def _scan(state):
+    return registry.create_scan(state / "fw.bin", state / "log")
+
+
+def _later(delay, fn, *args):
+    timer = threading.Timer(delay, fn, args)
+    timer.start()
+    return timer
+
+
+def test_times_out_without_a_change(state):
+    scan_id = _scan(state)
+
+    started = time.monotonic()
+    result = registry.wait_for_scan(scan_id, timeout=0.2)
+
+    assert result["timed_out"] and not result["changed"]
+    assert result["status"] == "queued"
+    assert time.monotonic() - started >= 0.2
+
+
+def test_wakes_on_a_status_change(state):
+    scan_id = _scan(state)
+    _later(0.1, registry.claim_next, lambda scan, running: None, lambda scan: 0)
+
+    result = registry.wait_for_scan(scan_id, timeout=10)
+
+    assert result["changed"] and not result["timed_out"]
+    assert result["status"] == "running"
+
+
+def test_refreshed_timestamps_are_not_a_change(state):
+    scan_id = _scan(state)
+    registry.set_progress(scan_id, {"modules_finished": 1, "updated_at": 1.0})
+    _later(0.1, registry.set_progress, scan_id, {"modules_finished": 1, "updated_at": 2.0})
+
+    result = registry.wait_for_scan(scan_id, timeout=0.5)
+
+    assert result["timed_out"]
+    assert result["progress"]["updated_at"] == 2.0
+
+
+def test_until_status_skips_other_changes(state):
+    scan_id = _scan(state)
+    _later(0.1, registry.claim_next, lambda scan, running: None, lambda scan: 0)
+    _later(0.3, registry.mark_finished, scan_id)
+
+    result = registry.wait_for_scan(scan_id, timeout=10, until_status="finished")
+
+    assert result["status"] == "finished" and not result["timed_out"]
+
+
+def test_terminal_scan_returns_at_once(state):
+    scan_id = _scan(state)
+    registry.stop_scan(scan_id)
+
+    result = registry.wait_for_scan(scan_id, timeout=10, until_status="running")
+
+    assert result["status"] == "cancelled" and not result["timed_out"]
+
+
+def test_unknown_scan(state):
+    assert registry.wait_for_scan("emba-missing", timeout=0) == {"error": "unknown scan_id"}
@@ -0,0 +1,47 @@
+from emba_mcp.emba_parsers.weak_functions import _parse_weak_function_line, parse_weak_functions
+from emba_mcp.line_rules import MAX_LINE_CHARS
+
+
+def test_names_inside_plain_words_do_not_count():
+    assert _parse_weak_function_line("filesystem check of /bin/httpd", "intense") is None
+    assert _parse_weak_function_line("3 targets in /bin/httpd", "intense") is None
+
+
+def test_names_inside_symbol_identifiers_count():
+    for symbol, function in [
+        ("__strcpy_chk", "strcpy"),
+        ("imp_strcpy", "strcpy"),
+        ("_system", "system"),
+        ("__GI_memcpy", "memcpy"),
+    ]:
+        hit = _parse_weak_function_line(f"{symbol} in /bin/httpd", "intense")
+        assert (hit.function, hit.binary) == (function, "/bin/httpd"), symbol
+
+
+def test_plain_function_lines():
+    hit = _parse_weak_function_line("[+] system in /usr/sbin/httpd (3 calls)", "radare")
+    assert (hit.function, hit.binary, hit.mode) == ("system", "/usr/sbin/httpd", "radare")
+    assert hit.truncated is None
+
+
+def test_path_beyond_the_line_cap_is_kept_and_flagged():
+    line = "strcpy " + "." * (MAX_LINE_CHARS + 100) + " in /bin/busybox"
+
+    hit = _parse_weak_function_line(line, "intense")
+
+    assert hit.binary == "/bin/busybox"
+    assert hit.truncated is True
+    assert len(hit.source) <= MAX_LINE_CHARS
+
+
+def test_modes_come_from_their_module(tmp_path):
+    (tmp_path / "s13_weak_func_check").mkdir()
+    (tmp_path / "s13_weak_func_check" / "s13.txt").write_text("strcpy in /bin/a\n")
+    (tmp_path / "s14_weak_func_radare_check").mkdir()
+    (tmp_path / "s14_weak_func_radare_check" / "s14.txt").write_text("gets in /bin/b\nnothing\n")
+
+    result = parse_weak_functions(tmp_path)
+
+    assert [f.binary for f in result["intense"]] == ["/bin/a"]
+    assert [f.binary for f in result["radare"]] == ["/bin/b"]
+    assert result["count"] == 2